@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+benchmarks.run
+==============
+
+Benchmarks for the serialization hot paths of Flask-HAL: ``Link.to_dict``,
+``Collection.to_dict``, ``Document.to_json``, nested ``Embedded`` trees and
+the full ``HALResponse`` round trip through the Flask test client.
+
+Each benchmark is run for a range of sizes (number of links or embedded
+items) and reports operations per second and the peak memory allocated by
+a single operation.
+
+Example:
+    $ python benchmarks/run.py
+    $ python benchmarks/run.py --sizes 10 1000 --save results.json
+    $ python benchmarks/run.py --compare benchmarks/baseline.json
+
+``--compare`` exits with a non zero status when a benchmark is slower than
+the baseline by more than ``--tolerance``. Baselines are machine specific,
+regenerate ``benchmarks/baseline.json`` with ``--save`` on the machine the
+comparison runs on.
+"""
+
+# Standard Libs
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Third Party Libs
+from flask import Flask, url_for
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# First Party Libs
+from flask_hal import HAL  # noqa
+from flask_hal.document import Document, Embedded  # noqa
+from flask_hal.link import Collection, Link, LinkTemplate  # noqa
+
+
+SIZES = [10, 100, 1000, 10000, 100000]
+
+# Maximum depth of the nested embedded benchmark
+MAX_DEPTH = 100
+
+
+def make_app():
+    app = Flask(__name__)
+    HAL(app)
+    return app
+
+
+def make_links(size):
+    return [
+        Link('item', '/items/{0}'.format(i), title='Item {0}'.format(i))
+        for i in range(size)
+    ]
+
+
+def make_items(size):
+    return [
+        Embedded(
+            data={'id': i, 'name': 'Item {0}'.format(i), 'total': i * 1.5},
+            links=Collection(
+                Link('self', '/items/{0}'.format(i)),
+                Link('order', '/orders/{0}'.format(i // 10))))
+        for i in range(size)
+    ]
+
+
+def make_nested(size):
+    depth = min(size, MAX_DEPTH)
+    width = max(1, size // depth)
+    node = Embedded(data={'depth': depth})
+    for level in range(depth - 1, -1, -1):
+        node = Embedded(
+            data={'depth': level, 'items': list(range(width))},
+            links=Collection(Link('up', '/levels/{0}'.format(level))),
+            embedded={'child': node})
+    return node
+
+
+def bench_link_to_dict(app, size):
+    links = make_links(size)
+
+    def run():
+        for link in links:
+            link.to_dict()
+
+    return run
+
+
+def bench_collection_to_dict(app, size):
+    collection = Collection(*make_links(size))
+    return collection.to_dict
+
+
+def bench_document_to_json(app, size):
+    with app.test_request_context('/items'):
+        document = Document(
+            data={'count': size},
+            embedded={'items': Embedded(data=make_items(size))})
+    return document.to_json
+
+
+def bench_nested_embedded_to_json(app, size):
+    with app.test_request_context('/levels'):
+        document = Document(embedded={'child': make_nested(size)})
+    return document.to_json
+
+
+def make_rows_app():
+    app = make_app()
+    app.add_url_rule('/items/<int:id>', 'item')
+    app.add_url_rule('/orders/<int:order>', 'order')
+    return app
+
+
+def make_rows(size):
+    return [
+        {'id': i, 'order': i // 10, 'name': 'Item {0}'.format(i)}
+        for i in range(size)
+    ]
+
+
+def bench_embedded_by_hand(app, size):
+    app = make_rows_app()
+    rows = make_rows(size)
+    context = app.test_request_context('/items')
+    context.push()
+
+    def run():
+        Embedded(data=[
+            Embedded(data=row, links=Collection(
+                Link('self', url_for('item', id=row['id'])),
+                Link('order', url_for('order', order=row['order']))))
+            for row in rows
+        ]).to_json()
+
+    return run
+
+
+def bench_embedded_from_rows(app, size):
+    app = make_rows_app()
+    rows = make_rows(size)
+    specs = [LinkTemplate('order', 'order')]
+    context = app.test_request_context('/items')
+    context.push()
+
+    def run():
+        Embedded.from_rows(rows, self_endpoint='item', link_specs=specs).to_json()
+
+    return run
+
+
+def bench_response_round_trip(app, size):
+    app = make_app()
+    items = make_items(size)
+
+    @app.route('/items')
+    def view():
+        return Document(
+            data={'count': size},
+            embedded={'items': Embedded(data=items)})
+
+    client = app.test_client()
+
+    def run():
+        response = client.get('/items')
+        assert response.status_code == 200
+
+    return run
+
+
+BENCHMARKS = [
+    ('link_to_dict', bench_link_to_dict),
+    ('collection_to_dict', bench_collection_to_dict),
+    ('document_to_json', bench_document_to_json),
+    ('nested_embedded_to_json', bench_nested_embedded_to_json),
+    ('embedded_by_hand', bench_embedded_by_hand),
+    ('embedded_from_rows', bench_embedded_from_rows),
+    ('response_round_trip', bench_response_round_trip),
+]
+
+
+def measure(run, min_time, repeat):
+    """Returns the best operations per second of ``repeat`` rounds, each
+    running for at least ``min_time`` seconds, and the peak memory in bytes
+    allocated by one operation.
+    """
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = 0.0
+    for _ in range(repeat):
+        ops = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            run()
+            ops += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, ops / elapsed)
+
+    return best, peak
+
+
+def run_benchmarks(sizes, names, min_time, repeat):
+    app = make_app()
+    results = {}
+
+    for name, factory in BENCHMARKS:
+        if names and name not in names:
+            continue
+        for size in sizes:
+            ops, peak = measure(factory(app, size), min_time, repeat)
+            key = '{0}[{1}]'.format(name, size)
+            results[key] = {'ops': ops, 'peak_memory': peak}
+            print('{0:<40} {1:>14,.1f} ops/s {2:>14,d} B'.format(key, ops, peak))
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints the change against the baseline and returns the keys of the
+    benchmarks which regressed by more than ``tolerance``.
+    """
+
+    regressions = []
+
+    print('\n{0:<40} {1:>14} {2:>14}'.format('benchmark', 'ops/s', 'memory'))
+    for key, result in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+
+        speed = result['ops'] / base['ops'] - 1
+        memory = result['peak_memory'] / float(base['peak_memory'] or 1) - 1
+        flag = ''
+        if speed < -tolerance:
+            regressions.append(key)
+            flag = ' REGRESSION'
+        print('{0:<40} {1:>+13.1%} {2:>+13.1%}{3}'.format(key, speed, memory, flag))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all by default')
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds per round')
+    parser.add_argument('--repeat', type=int, default=3, help='rounds per benchmark')
+    parser.add_argument('--save', help='write the results to a JSON file')
+    parser.add_argument('--compare', help='compare against a baseline JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.names, args.min_time, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print('\n{0} benchmark(s) regressed'.format(len(regressions)))
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,11 +11,29 @@ you to build ``REST`` API responses which fulfil this specification.
 Read more at the `Official Draft <https://tools.ietf.org/html/draft-kelly-json-hal-07>`_
 """
 
+# Standard Libs
+import functools
+import hashlib
+import itertools
+import zlib
+
 # Third Party Libs
-from flask import Response
+from flask import (
+    Response,
+    current_app,
+    has_app_context,
+    has_request_context,
+    request,
+    stream_with_context
+)
+from werkzeug.http import parse_accept_header, parse_etags
 
 # First Party Libs
+from flask_hal import link, loader, pool, signals
+from flask_hal.cache import ResponseCache
 from flask_hal.document import Document
+from flask_hal.encoder import create_encoder
+from flask_hal.fieldset import current_embeds, current_fieldset
 
 
 class HAL(object):
@@ -28,7 +46,7 @@ class HAL(object):
     view into it's ``JSON`` representation.
     """
 
-    def __init__(self, app=None, response_class=None):
+    def __init__(self, app=None, response_class=None, encoder=None):
         """Initialise Flask-HAL with a Flask Application. Acts as a proxy
         to :meth:`flask_hal.HAL.init_app`.
 
@@ -41,12 +59,17 @@ class HAL(object):
         Keyword Args:
             app (flask.app.Flask): Optional Flask application instance
             response_class (class): Optional custom ``response_class``
+            encoder: Optional encoder backend name or
+                :class:`flask_hal.encoder.Encoder` instance
         """
 
+        # CURIE definitions shared by the applications of the extension
+        self.curies = link.Curies()
+
         if app is not None:
-            self.init_app(app, response_class=response_class)
+            self.init_app(app, response_class=response_class, encoder=encoder)
 
-    def init_app(self, app, response_class=None):
+    def init_app(self, app, response_class=None, encoder=None):
         """Initialise Flask-HAL with a Flask Application. This is designed to
         be used with the Flask Application Factory Pattern.
 
@@ -61,14 +84,205 @@ class HAL(object):
 
         Keyword Args:
             response_class (class): Optional custom ``response_class``
+            encoder: Optional encoder backend name or
+                :class:`flask_hal.encoder.Encoder` instance, overrides the
+                ``HAL_JSON_ENCODER`` configuration
         """
 
+        # JSON encoder backend, the fastest installed backend by default
+        app.config.setdefault('HAL_JSON_ENCODER', 'auto')
+        app.config.setdefault('HAL_JSON_COMPACT', False)
+        app.config.setdefault('HAL_JSON_DEFAULT', None)
+
+        # Decode RawJSON texts when they are created, for example in debug mode
+        app.config.setdefault('HAL_VALIDATE_RAW_JSON', False)
+
+        # Stream documents to the client as they are encoded
+        app.config.setdefault('HAL_STREAMING', False)
+        app.config.setdefault('HAL_STREAMING_BUFFER_SIZE', 8192)
+
+        # Resolve awaitables and async iterables held by documents, reading
+        # at most HAL_ASYNC_BUFFER_SIZE items of an async iterable ahead
+        app.config.setdefault('HAL_ASYNC', False)
+        app.config.setdefault('HAL_ASYNC_BUFFER_SIZE', 64)
+
+        # fields / links query parameters select what is serialized
+        app.config.setdefault('HAL_SPARSE_FIELDSETS', False)
+
+        # Query parameter selecting the lazy embedded resources to load
+        app.config.setdefault('HAL_EMBED_PARAM', 'embed')
+
+        # Threads loading lazy embedded resources in parallel, 0 to load them
+        # while serializing, and the seconds allowed per document
+        app.config.setdefault('HAL_EMBED_WORKERS', 0)
+        app.config.setdefault('HAL_EMBED_TIMEOUT', None)
+
+        # Embedded lists of at least HAL_PARALLEL_THRESHOLD items are encoded
+        # in chunks by a 'process' or 'thread' pool, None to stay serial.
+        # Worker processes are started with HAL_PARALLEL_START_METHOD, such
+        # as 'fork' or 'spawn', None for the platform default
+        app.config.setdefault('HAL_PARALLEL_THRESHOLD', None)
+        app.config.setdefault('HAL_PARALLEL_CHUNK_SIZE', 5000)
+        app.config.setdefault('HAL_PARALLEL_EXECUTOR', 'process')
+        app.config.setdefault('HAL_PARALLEL_WORKERS', None)
+        app.config.setdefault('HAL_PARALLEL_START_METHOD', None)
+
+        # Conditional GET support: False, 'strong' or 'weak' ETags
+        app.config.setdefault('HAL_ETAG', False)
+
+        # gzip / deflate compression negotiated through Accept-Encoding
+        app.config.setdefault('HAL_COMPRESS', False)
+        app.config.setdefault('HAL_COMPRESS_MIN_SIZE', 500)
+        app.config.setdefault('HAL_COMPRESS_LEVEL', 6)
+
+        # document_serialized signal and Server-Timing header
+        app.config.setdefault('HAL_INSTRUMENTATION', False)
+        app.config.setdefault('HAL_SERVER_TIMING', False)
+        if app.config['HAL_INSTRUMENTATION'] or app.config['HAL_SERVER_TIMING']:
+            signals.instrumented = True
+
+        # Encoded document cache used by HAL.cached views
+        app.config.setdefault('HAL_CACHE_MAX_SIZE', 16 * 1024 * 1024)
+        app.config.setdefault('HAL_CACHE_TTL', 300)
+
+        app.extensions['hal'] = _State(
+            encoder=create_encoder(
+                encoder or app.config['HAL_JSON_ENCODER'],
+                compact=app.config['HAL_JSON_COMPACT'],
+                default=app.config['HAL_JSON_DEFAULT']),
+            cache=ResponseCache(
+                max_size=app.config['HAL_CACHE_MAX_SIZE'],
+                ttl=app.config['HAL_CACHE_TTL']),
+            pool=pool.create_pool(app.config['HAL_EMBED_WORKERS']),
+            serializer=pool.create_serializer(
+                app.config['HAL_PARALLEL_EXECUTOR'],
+                app.config['HAL_PARALLEL_WORKERS'],
+                app.config['HAL_PARALLEL_THRESHOLD'] is not None,
+                app.config['HAL_PARALLEL_START_METHOD']),
+            curies=self.curies)
+
         # Set the response class
         if response_class is None:
             app.response_class = HALResponse
         else:
             app.response_class = response_class
 
+    @property
+    def cache(self):
+        """The :class:`flask_hal.cache.ResponseCache` of the current
+        application, for example to export its ``stats()``.
+        """
+
+        return current_app.extensions['hal'].cache
+
+    def curie(self, name, href):
+        """Registers a CURIE definition. Link relations starting with the
+        URI of the definition are compacted to ``name:rel`` form, and the
+        definition is emitted in the ``curies`` links of every
+        :class:`flask_hal.document.Document`.
+
+        Example:
+            >>> hal = HAL(app)
+            >>> hal.curie('acme', 'https://docs.acme.com/rels/{rel}')
+
+        Args:
+            name (str): The CURIE prefix
+            href (str): The URI template of the relation documentation,
+                with a ``{rel}`` placeholder
+
+        Raises:
+            ValueError: If ``href`` has no ``{rel}`` placeholder
+        """
+
+        self.curies.add(name, href)
+
+    def cached(self, key, ttl=None):
+        """Decorates a view returning a :class:`flask_hal.document.Document`
+        so its encoded ``JSON`` is cached. On a hit the view is not called,
+        so neither the document nor its links are built. Only ``GET`` and
+        ``HEAD`` requests use the cache, the view is called for other
+        methods.
+
+        Example:
+            >>> @app.route('/orders/<int:id>')
+            >>> @hal.cached(lambda id: (id, Order.version(id)))
+            >>> def order(id):
+            ...     return Document(data=Order.get(id).to_dict())
+
+        Args:
+            key (callable): Called with the view arguments, returns the cache
+                key such as the resource id and version, or ``None`` to skip
+                the cache. Keys are scoped to the endpoint, the path and the
+                query string, so the view arguments need not be repeated
+
+        Keyword Args:
+            ttl (float): Time to live in seconds, defaults to ``HAL_CACHE_TTL``
+
+        Returns:
+            callable: The decorator
+        """
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return view(*args, **kwargs)
+
+                cache_key = key(*args, **kwargs)
+                if cache_key is None:
+                    return view(*args, **kwargs)
+
+                cache = current_app.extensions['hal'].cache
+                cache_key = (
+                    request.endpoint, request.path, request.query_string, cache_key)
+
+                entry = cache.get_entry(cache_key)
+                if entry is None:
+                    rv = view(*args, **kwargs)
+                    if not isinstance(rv, Document):
+                        return rv
+
+                    _resolve_async(rv)
+                    _resolve_deferred(rv)
+                    _resolve_embeds(rv)
+
+                    body = rv.to_json(current_fieldset()).encode('utf-8')
+                    entry = (body, _etag(body))
+                    cache.set(cache_key, body, ttl=ttl, etag=entry[1])
+
+                return _body_response(entry[0], entry[1], request.environ)
+
+            return wrapper
+
+        return decorator
+
+
+class _State(object):
+    """Holds the per application Flask-HAL state, stored in the application
+    ``extensions`` under ``hal``.
+    """
+
+    def __init__(self, encoder, cache, pool=None, serializer=None, curies=None):
+        """Initialise the application state.
+
+        Args:
+            encoder (flask_hal.encoder.Encoder): The ``JSON`` encoder
+            cache (flask_hal.cache.ResponseCache): The encoded document cache
+
+        Keyword Args:
+            pool (concurrent.futures.Executor): Pool loading lazy embedded
+                resources
+            serializer (concurrent.futures.Executor): Pool encoding chunks
+                of large embedded lists
+            curies (flask_hal.link.Curies): CURIE definitions
+        """
+
+        self.encoder = encoder
+        self.cache = cache
+        self.pool = pool
+        self.serializer = serializer
+        self.curies = curies
+
 
 class HALResponse(Response):
     """A custom response class which overrides the default Response class
@@ -96,10 +310,485 @@ class HALResponse(Response):
         """
 
         if isinstance(rv, Document):
-            return Response(
-                rv.to_json(),
-                headers={
-                    'Content-Type': 'application/hal+json'
-                })
+            etag_mode = _config('HAL_ETAG', False)
+            fieldset = current_fieldset()
+
+            # A version key answers conditional requests before serializing
+            if (etag_mode and rv.version is not None and
+                    env.get('REQUEST_METHOD') in ('GET', 'HEAD')):
+                version = u'{0}'.format(rv.version)
+                if fieldset is not None:
+                    version += u'?' + fieldset.key
+                embeds = current_embeds()
+                if embeds:
+                    version += u'&embed=' + u','.join(sorted(embeds))
+                etag = _etag(version.encode('utf-8'))
+
+                # Bodies below HAL_COMPRESS_MIN_SIZE are sent uncompressed
+                # and tagged without the variant, either tag is current
+                for tag in (_variant_etag(etag, _content_encoding(env)), etag):
+                    if _not_modified(env, tag):
+                        return _not_modified_response(tag, etag_mode == 'weak')
+            else:
+                etag = None
+
+            streams = _resolve_async(rv)
+            _resolve_deferred(rv)
+            _resolve_embeds(rv)
+
+            instrument = signals.instrumented and (
+                _config('HAL_INSTRUMENTATION', False) or
+                _config('HAL_SERVER_TIMING', False))
+
+            streaming = _config('HAL_STREAMING', False)
+            if streaming:
+                chunks = rv.iter_json(fieldset=fieldset)
+                if instrument:
+                    chunks = _timed_stream(chunks, rv)
+                body = _buffered(
+                    chunks,
+                    _config('HAL_STREAMING_BUFFER_SIZE', 8192))
+                if has_request_context():
+                    body = stream_with_context(body)
+            elif instrument:
+                start = signals._clock()
+                body = rv.to_json(fieldset)
+                signals.record('serialize', signals._clock() - start)
+            else:
+                body = rv.to_json(fieldset)
+
+            response = _body_response(body, etag, env)
+
+            # Stop consuming async iterables a closed stream no longer reads
+            for stream in streams:
+                response.call_on_close(stream.close)
+
+            if instrument:
+                timings = signals.timings()
+                if _config('HAL_SERVER_TIMING', False):
+                    response.headers['Server-Timing'] = signals.server_timing(timings)
+                if not streaming:
+                    _send_serialized(rv, timings, len(body.encode('utf-8')), False)
+
+            return response
 
         return Response.force_type(rv, env)
+
+
+def _config(key, default=None):
+    """Returns a configuration value of the current application, falling
+    back to ``default`` outside of an application context.
+
+    Args:
+        key (str): Configuration key
+        default: Value used when the key is not configured
+
+    Returns:
+        The configured value
+    """
+
+    if not has_app_context():
+        return default
+
+    return current_app.config.get(key, default)
+
+
+def _resolve_async(document):
+    """Resolves the awaitables and async iterables of a document with
+    :func:`flask_hal.aio.resolve` when ``HAL_ASYNC`` is enabled.
+
+    Args:
+        document (flask_hal.document.Document): The document
+
+    Returns:
+        list: The iterables of the async iterables consumed in the
+            background, to close with the response
+    """
+
+    streams = []
+    if _config('HAL_ASYNC', False):
+        # Python 3 only, imported on first use
+        from flask_hal import aio
+        aio.resolve(document, streams)
+
+    return streams
+
+
+def _resolve_deferred(document):
+    """Batch loads the :class:`flask_hal.loader.Deferred` placeholders of a
+    document when any were created during the request.
+
+    Args:
+        document (flask_hal.document.Document): The document
+    """
+
+    if loader.has_pending():
+        loader.resolve(document)
+
+
+def _resolve_embeds(document):
+    """Loads the lazy embedded resources of a document in parallel when
+    ``HAL_EMBED_WORKERS`` is set, see :func:`flask_hal.pool.resolve`.
+
+    Args:
+        document (flask_hal.document.Document): The document
+    """
+
+    if not has_app_context():
+        return
+
+    state = current_app.extensions.get('hal')
+    if state is None or state.pool is None:
+        return
+
+    timeout = document.embed_timeout
+    if timeout is None:
+        timeout = current_app.config.get('HAL_EMBED_TIMEOUT')
+
+    if signals.instrumented:
+        start = signals._clock()
+        pool.resolve(document, state.pool, timeout)
+        signals.record('embeds', signals._clock() - start)
+    else:
+        pool.resolve(document, state.pool, timeout)
+
+
+def _body_response(body, etag, env):
+    """Returns the response for an encoded document.
+
+    When ``HAL_ETAG`` is enabled for a ``GET`` or ``HEAD`` request the
+    response is tagged, with a hash of a whole body when no ``etag`` is
+    given, and a matching ``If-None-Match`` is answered with
+    ``304 Not Modified``.
+
+    When ``HAL_COMPRESS`` is enabled the body is compressed with the encoding
+    negotiated through ``Accept-Encoding``.
+
+    Args:
+        body: The encoded document, a ``str``, ``bytes`` or iterable of chunks
+        etag (str): Optional unquoted entity tag
+        env (dict): Request environment
+
+    Returns:
+        flask.wrappers.Response
+    """
+
+    headers = {
+        'Content-Type': 'application/hal+json'
+    }
+
+    encoding = None
+    if _config('HAL_COMPRESS', False):
+        headers['Vary'] = 'Accept-Encoding'
+        encoding = _content_encoding(env)
+    min_size = _config('HAL_COMPRESS_MIN_SIZE', 500)
+    streamed = not isinstance(body, (bytes, type(u'')))
+
+    etag_mode = _config('HAL_ETAG', False)
+    if etag_mode and env.get('REQUEST_METHOD') in ('GET', 'HEAD'):
+        weak = etag_mode == 'weak'
+
+        # Whole bodies are tagged and matched before they are compressed,
+        # streamed bodies are only tagged through a version key once it is
+        # known whether they are compressed
+        if not streamed:
+            if not isinstance(body, bytes):
+                body = body.encode('utf-8')
+            if etag is None:
+                etag = _etag(body)
+            if len(body) >= min_size:
+                etag = _variant_etag(etag, encoding)
+            if _not_modified(env, etag):
+                return _not_modified_response(etag, weak)
+    else:
+        etag = None
+
+    if encoding is not None:
+        if signals.instrumented:
+            start = signals._clock()
+        body = _compress(
+            body,
+            encoding,
+            headers,
+            min_size,
+            _config('HAL_COMPRESS_LEVEL', 6))
+        if signals.instrumented and isinstance(body, bytes):
+            signals.record('compress', signals._clock() - start)
+
+    response = Response(body, headers=headers)
+    if etag is not None:
+        if streamed:
+            etag = _variant_etag(etag, headers.get('Content-Encoding'))
+        response.set_etag(etag, weak)
+
+    return response
+
+
+def _send_serialized(document, timings, size, streamed):
+    """Sends :data:`flask_hal.signals.document_serialized` when
+    ``HAL_INSTRUMENTATION`` is enabled.
+
+    Args:
+        document (flask_hal.document.Document): The document
+        timings (dict): Seconds per phase
+        size (int): Size of the encoded document in bytes
+        streamed (bool): Whether the document was streamed
+    """
+
+    if not _config('HAL_INSTRUMENTATION', False):
+        return
+
+    links, embedded = signals.count(document)
+    signals.document_serialized.send(
+        current_app._get_current_object(),
+        document=document,
+        timings=timings,
+        links=links,
+        embedded=embedded,
+        bytes=size,
+        streamed=streamed)
+
+
+def _timed_stream(chunks, document):
+    """Times the serialization of a streamed document, sending
+    :data:`flask_hal.signals.document_serialized` once it is complete.
+
+    Args:
+        chunks (iterable): Encoded ``JSON`` chunks
+        document (flask_hal.document.Document): The document
+
+    Yields:
+        str: The chunks
+    """
+
+    clock = signals._clock
+    chunks = iter(chunks)
+    elapsed = 0.0
+    size = 0
+
+    while True:
+        start = clock()
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            break
+        elapsed += clock() - start
+        size += len(chunk.encode('utf-8'))
+        yield chunk
+
+    signals.record('serialize', elapsed)
+    _send_serialized(document, signals.timings(), size, True)
+
+
+def _content_encoding(env):
+    """Returns the content encoding negotiated with ``Accept-Encoding``
+    when ``HAL_COMPRESS`` is enabled.
+
+    Args:
+        env (dict): Request environment
+
+    Returns:
+        str: ``gzip``, ``deflate`` or ``None``
+    """
+
+    if not _config('HAL_COMPRESS', False):
+        return None
+
+    header = env.get('HTTP_ACCEPT_ENCODING')
+    if not header:
+        return None
+
+    return parse_accept_header(header).best_match(['gzip', 'deflate'])
+
+
+def _variant_etag(etag, encoding):
+    """Returns the entity tag of the ``encoding`` variant of a document, so
+    compressed and uncompressed representations are tagged differently.
+
+    Args:
+        etag (str): The unquoted entity tag of the document
+        encoding (str): The content encoding or ``None``
+
+    Returns:
+        str: The unquoted entity tag
+    """
+
+    if encoding is None:
+        return etag
+
+    return etag + '-' + encoding
+
+
+def _compress(body, encoding, headers, min_size, level):
+    """Compresses a document body, setting ``Content-Encoding`` when it is
+    compressed. Bodies smaller than ``min_size`` are sent uncompressed.
+
+    Streamed bodies are compressed incrementally as chunks are produced,
+    only the chunks up to ``min_size`` are read ahead to decide whether to
+    compress.
+
+    Args:
+        body: The encoded document, a ``str``, ``bytes`` or iterable of chunks
+        encoding (str): ``gzip`` or ``deflate``
+        headers (dict): Response headers
+        min_size (int): Minimum size of a compressed body
+        level (int): Compression level
+
+    Returns:
+        The compressed body
+    """
+
+    if not isinstance(body, (bytes, type(u''))):
+        chunks = iter(body)
+        head = []
+        size = 0
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size >= min_size:
+                break
+        else:
+            body = ''.join(head)
+
+        if size >= min_size:
+            headers['Content-Encoding'] = encoding
+            return _compress_stream(
+                itertools.chain(head, chunks), body, encoding, level)
+
+    if not isinstance(body, bytes):
+        body = body.encode('utf-8')
+
+    if len(body) < min_size:
+        return body
+
+    headers['Content-Encoding'] = encoding
+    compressor = _compressor(encoding, level)
+
+    return compressor.compress(body) + compressor.flush()
+
+
+def _compressor(encoding, level):
+    """Returns a ``zlib`` compressor producing the ``gzip`` or ``deflate``
+    (``zlib`` format) content encoding.
+
+    Args:
+        encoding (str): ``gzip`` or ``deflate``
+        level (int): Compression level
+
+    Returns:
+        A ``zlib`` compression object
+    """
+
+    wbits = zlib.MAX_WBITS
+    if encoding == 'gzip':
+        wbits += 16
+
+    return zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+
+def _compress_stream(chunks, source, encoding, level):
+    """Compresses streamed chunks incrementally.
+
+    Args:
+        chunks (iterable): Encoded ``JSON`` chunks
+        source: The original body, closed when the stream ends
+        encoding (str): ``gzip`` or ``deflate``
+        level (int): Compression level
+
+    Yields:
+        bytes: Compressed data
+    """
+
+    compressor = _compressor(encoding, level)
+
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        close = getattr(source, 'close', None)
+        if close is not None:
+            close()
+
+
+def _etag(value):
+    """Returns an entity tag for a document version key or encoded body.
+
+    Args:
+        value (bytes): Encoded version key or body
+
+    Returns:
+        str: The unquoted entity tag
+    """
+
+    return hashlib.sha1(value).hexdigest()
+
+
+def _not_modified(env, etag):
+    """Returns whether the ``If-None-Match`` header of the request matches
+    ``etag``, using the weak comparison required for ``If-None-Match``.
+
+    Args:
+        env (dict): Request environment
+        etag (str): The unquoted entity tag
+
+    Returns:
+        bool
+    """
+
+    header = env.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+
+    return parse_etags(header).contains_weak(etag)
+
+
+def _not_modified_response(etag, weak):
+    """Returns a ``304 Not Modified`` response without a body, varying on
+    ``Accept-Encoding`` as the full response when ``HAL_COMPRESS`` is
+    enabled.
+
+    Args:
+        etag (str): The unquoted entity tag
+        weak (bool): Whether the entity tag is weak
+
+    Returns:
+        flask.wrappers.Response
+    """
+
+    response = Response(status=304)
+    response.set_etag(etag, weak)
+    del response.headers['Content-Type']
+    if _config('HAL_COMPRESS', False):
+        response.headers['Vary'] = 'Accept-Encoding'
+
+    return response
+
+
+def _buffered(chunks, size):
+    """Coalesces small encoded chunks into blocks of at least ``size``
+    characters so a streamed response is not written one token at a time.
+
+    Args:
+        chunks (iterable): Encoded ``JSON`` chunks
+        size (int): Minimum block size
+
+    Yields:
+        str: Coalesced ``JSON`` blocks
+    """
+
+    buf = []
+    length = 0
+
+    for chunk in chunks:
+        buf.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buf)
+            buf = []
+            length = 0
+
+    if buf:
+        yield ''.join(buf)
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+flask_hal.aio
+=============
+
+Resolves the awaitables and async iterables held by ``HAL`` documents, so
+documents returned by ``async`` views can fetch their data and embedded
+resources concurrently. Enabled for responses with ``HAL_ASYNC``, this
+module requires Python 3 and is only imported when it is used.
+
+Awaitables in ``data``, in the values of a ``data`` dict, in the items of an
+embedded list and in ``embedded`` are awaited together. Async iterables used
+as the ``data`` of an :class:`flask_hal.document.Embedded` or as an
+``embedded`` value are consumed in the background while the document is
+serialized, so with ``HAL_STREAMING`` their items are streamed to the client
+as they arrive. Consumption pauses once ``HAL_ASYNC_BUFFER_SIZE`` items wait
+to be serialized, so a slow client does not buffer the whole iterable.
+
+Example:
+    >>> @app.route('/orders/<int:id>')
+    >>> async def order(id):
+    ...     return Document(
+    ...         data=orders.get(id),
+    ...         embedded={
+    ...             'customer': customers.document(id),
+    ...             'items': Embedded(data=items.stream(id)),
+    ...         })
+
+Awaitables run on an event loop in a background thread, coroutines must not
+be bound to the event loop of the view, such as a task created by the view.
+"""
+
+# Standard Libs
+import asyncio
+import functools
+import inspect
+import os
+import queue
+import threading
+
+# Third Party Libs
+from flask import current_app, has_app_context
+
+# First Party Libs
+from flask_hal.document import BaseDocument, Embedded
+
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+# Items of an async iterable consumed ahead of the serializer
+_BUFFER_SIZE = 64
+
+
+def _get_loop():
+    """Returns the background event loop of the process, starting it on
+    first use and again in forked processes.
+
+    Returns:
+        asyncio.AbstractEventLoop
+    """
+
+    global _loop, _loop_pid
+
+    pid = os.getpid()
+    if _loop is not None and _loop_pid == pid:
+        return _loop
+
+    with _loop_lock:
+        if _loop is None or _loop_pid != pid:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name='flask-hal-aio')
+            thread.daemon = True
+            thread.start()
+            _loop, _loop_pid = loop, pid
+
+    return _loop
+
+
+def is_async(value):
+    """Returns whether ``value`` is an awaitable or an async iterable.
+
+    Args:
+        value: Any value
+
+    Returns:
+        bool
+    """
+
+    return inspect.isawaitable(value) or hasattr(value, '__aiter__')
+
+
+def resolve(document, streams=None):
+    """Resolves the awaitables of ``document`` and its embedded documents in
+    place, waiting until they have all completed. Async iterables are
+    replaced by iterables of their items which are consumed in the
+    background.
+
+    Example:
+        >>> resolve(document).to_json()
+
+    Args:
+        document (flask_hal.document.BaseDocument): The document
+
+    Keyword Args:
+        streams (list): Appended with the iterables of the async iterables
+            consumed in the background, whose ``close`` method cancels the
+            consumption, for example when the response is closed
+
+    Returns:
+        flask_hal.document.BaseDocument: The document
+    """
+
+    found = []
+    _scan(document, found)
+    if found:
+        size = _BUFFER_SIZE
+        if has_app_context():
+            size = current_app.config.get('HAL_ASYNC_BUFFER_SIZE', size)
+        future = asyncio.run_coroutine_threadsafe(
+            _resolve(document, found, size, streams), _get_loop())
+        future.result()
+
+    return document
+
+
+def _scan(document, found):
+    """Finds the awaitables and async iterables of ``document`` and its
+    embedded documents. Values which do not hold documents, such as plain
+    data items, are not searched.
+
+    Args:
+        document (flask_hal.document.BaseDocument): The document
+        found (list): Appended with ``(value, setter, stream)`` tuples,
+            ``stream`` is set for async iterables which are streamed
+    """
+
+    stack = [document]
+
+    while stack:
+        doc = stack.pop()
+
+        # Frozen documents are already encoded
+        if doc._json is not None:
+            continue
+
+        data = doc.data
+        if is_async(data):
+            found.append((
+                data, functools.partial(setattr, doc, 'data'),
+                isinstance(doc, Embedded)))
+        elif isinstance(data, dict):
+            for key, value in data.items():
+                if is_async(value):
+                    found.append((
+                        value, functools.partial(data.__setitem__, key), False))
+        elif isinstance(data, (list, tuple)):
+            for i, item in enumerate(data):
+                if isinstance(item, BaseDocument):
+                    stack.append(item)
+                elif is_async(item):
+                    if not isinstance(data, list):
+                        data = doc.data = list(data)
+                    found.append((
+                        item, functools.partial(data.__setitem__, i), False))
+
+        for name, value in doc.embedded.items():
+            if isinstance(value, BaseDocument):
+                stack.append(value)
+            elif is_async(value):
+                found.append((
+                    value, functools.partial(_set_embedded, doc.embedded, name), True))
+
+
+async def _resolve(document, found, size=_BUFFER_SIZE, streams=None):
+    """Awaits the values found by :func:`_scan` concurrently, searching
+    the resolved documents again for further awaitables.
+
+    Args:
+        document (flask_hal.document.BaseDocument): The document
+        found (list): Values found by :func:`_scan`
+
+    Keyword Args:
+        size (int): Items of an async iterable consumed ahead of the
+            serializer
+        streams (list): Appended with the iterables consuming async
+            iterables in the background
+    """
+
+    while found:
+        awaitables = []
+        setters = []
+
+        for value, setter, stream in found:
+            if hasattr(value, '__aiter__'):
+                if stream:
+                    items = _AsyncItems(value, size)
+                    items.start()
+                    setter(items)
+                    if streams is not None:
+                        streams.append(items)
+                    continue
+                value = _to_list(value)
+            awaitables.append(value)
+            setters.append(setter)
+
+        results = await asyncio.gather(*awaitables)
+        for setter, result in zip(setters, results):
+            setter(result)
+
+        # Resolved values may hold awaitables of their own
+        found = []
+        _scan(document, found)
+
+
+def _set_embedded(embedded, name, value):
+    # Lists and async iterables of items are embedded as an Embedded list
+    if not isinstance(value, BaseDocument):
+        value = Embedded(data=value)
+    embedded[name] = value
+
+
+async def _to_list(iterable):
+    return [item async for item in iterable]
+
+
+async def _resolve_item(item):
+    """Resolves an awaitable item or the awaitables of a document item of an
+    async iterable.
+    """
+
+    if inspect.isawaitable(item):
+        item = await item
+
+    if isinstance(item, BaseDocument):
+        found = []
+        _scan(item, found)
+        if found:
+            await _resolve(item, found)
+
+    return item
+
+
+# Marks the end of an async iterable in the queue of _AsyncItems
+_END = object()
+
+
+class _AsyncItems(object):
+    """Iterable of the items of an async iterable, which is consumed by a
+    task on the background event loop as soon as it is started. Items are
+    passed to the serializing thread through a bounded queue, the task
+    waits for a free slot before reading the next item so it stays at most
+    ``size`` items ahead of the serializer.
+    """
+
+    def __init__(self, iterable, size=_BUFFER_SIZE):
+        """Initialise a new ``_AsyncItems``.
+
+        Args:
+            iterable: The async iterable
+
+        Keyword Args:
+            size (int): Items consumed ahead of the serializer
+        """
+
+        self._iterable = iterable
+        self._queue = queue.Queue(max(size, 1))
+        self._slots = None
+        self._loop = None
+        self._future = None
+
+    def start(self):
+        """Starts consuming the async iterable, must be called on the event
+        loop.
+        """
+
+        # Free slots of the queue, released by the serializing thread
+        self._slots = asyncio.Semaphore(self._queue.maxsize)
+        self._loop = asyncio.get_event_loop()
+        self._future = asyncio.ensure_future(self._consume())
+
+    async def _consume(self):
+        # A slot is taken before each read, the end of the iterable and
+        # errors are put in the slot of the read which found them
+        put = self._queue.put_nowait
+        acquire = self._slots.acquire
+        iterator = self._iterable.__aiter__()
+        try:
+            while True:
+                await acquire()
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                put((True, await _resolve_item(item)))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            # Raised to the serializing thread instead of the event loop
+            put((False, e))
+        else:
+            put((False, _END))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        ok, item = self._queue.get()
+        if ok:
+            self._loop.call_soon_threadsafe(self._slots.release)
+            return item
+
+        # Keep the final state for later reads
+        self._queue.put_nowait((ok, item))
+        if item is _END:
+            raise StopIteration
+        raise item
+
+    next = __next__
+
+    def close(self):
+        """Cancels the consumption of the async iterable, called when the
+        response streaming the items is closed, for example by a client
+        disconnecting before the items are all serialized.
+        """
+
+        future = self._future
+        if future is not None and not future.done():
+            future.get_loop().call_soon_threadsafe(future.cancel)
+
+    __del__ = close
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+flask_hal.cache
+===============
+
+A bounded in memory cache of encoded ``HAL`` documents with LRU eviction
+and a time to live. Views are cached with :meth:`flask_hal.HAL.cached`.
+
+Example:
+    >>> from flask_hal.cache import ResponseCache
+    >>> cache = ResponseCache(max_size=1024, ttl=60)
+    >>> cache.set('order:1:v3', b'{"_links": {}}')
+    >>> cache.get('order:1:v3')
+    ... b'{"_links": {}}'
+"""
+
+# Standard Libs
+import threading
+from collections import OrderedDict
+
+try:
+    from time import monotonic as _clock
+except ImportError:  # pragma: no cover
+    from time import time as _clock
+
+
+class ResponseCache(object):
+    """Thread safe LRU cache of encoded documents. Memory is bounded by the
+    total size of the cached bodies, the least recently used entries are
+    evicted once ``max_size`` is exceeded.
+    """
+
+    def __init__(self, max_size=16 * 1024 * 1024, ttl=300, clock=_clock):
+        """Initialise a new ``ResponseCache``.
+
+        Keyword Args:
+            max_size (int): Maximum total size of cached bodies in bytes
+            ttl (float): Default time to live of an entry in seconds, ``None``
+                for entries which only expire through eviction
+            clock (callable): Returns the current time in seconds
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> (expires, body, etag), least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns a cached body, counting a hit or a miss.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            bytes: The cached body or ``None``
+        """
+
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+
+        return entry[0]
+
+    def get_entry(self, key):
+        """Returns a cached body and its entity tag, counting a hit or a miss.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            tuple: The cached body and entity tag, or ``None``
+        """
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is not None and (
+                    entry[0] is None or entry[0] > self.clock()):
+                # Move to the most recently used end
+                self._entries[key] = entry
+                self.hits += 1
+                return entry[1], entry[2]
+
+            if entry is not None:
+                self.size -= len(entry[1])
+
+            self.misses += 1
+            return None
+
+    def set(self, key, body, ttl=None, etag=None):
+        """Caches an encoded body, evicting the least recently used entries
+        when the cache is full. Bodies larger than ``max_size`` are not
+        cached.
+
+        Args:
+            key: The cache key
+            body (bytes): The encoded document
+
+        Keyword Args:
+            ttl (float): Time to live in seconds, defaults to ``ttl``
+            etag (str): Optional entity tag of the body
+        """
+
+        if len(body) > self.max_size:
+            return
+
+        if ttl is None:
+            ttl = self.ttl
+
+        expires = None if ttl is None else self.clock() + ttl
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+
+            self._entries[key] = (expires, body, etag)
+            self.size += len(body)
+
+            while self.size > self.max_size:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Removes an entry from the cache.
+
+        Args:
+            key: The cache key
+        """
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= len(entry[1])
+
+    def clear(self):
+        """Removes all entries from the cache, counters are kept.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """Returns the cache counters for export to monitoring.
+
+        Returns:
+            dict: ``hits``, ``misses``, ``evictions``, ``entries`` and
+                ``size`` in bytes
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size': self.size,
+            }
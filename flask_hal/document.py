@@ -14,16 +14,180 @@ Example:
 """
 
 # Standard Libs
-import json
+import itertools
+from collections import deque
+
+# Third Party Libs
+from flask import (
+    copy_current_request_context,
+    current_app,
+    has_app_context,
+    has_request_context
+)
 
 # First Party Libs
 from flask_hal import link
+from flask_hal.encoder import RawJSON, get_encoder
+from flask_hal.fieldset import current_embeds, current_fieldset
+
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+try:
+    from contextvars import Context
+except ImportError:  # pragma: no cover
+    Context = None
+
+
+# Plain embedded items encoded per encoder call
+_ITEMS_BATCH = 256
+
+
+def _is_items(data):
+    """Returns whether ``data`` is an iterable of items, such as a ``list``,
+    a generator or a database cursor, rather than a single object.
+
+    Args:
+        data: Document data
+
+    Returns:
+        bool
+    """
+
+    if data is None or type(data) is dict:
+        return False
+
+    return (
+        hasattr(data, '__iter__') and
+        not isinstance(data, (Mapping, str, bytes, type(u''))))
+
+
+def _columns_to_rows(columns):
+    """Converts columnar data to a list of ``dict`` rows. Array-like columns
+    with a ``tolist`` method, such as ``numpy`` arrays, are converted to
+    Python values first.
+
+    Args:
+        columns (dict): Column name -> sequence of values
+
+    Returns:
+        list: The rows
+    """
+
+    names = list(columns)
+    values = [
+        column.tolist() if hasattr(column, 'tolist') else column
+        for column in columns.values()
+    ]
+
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+class Lazy(object):
+    """An embedded resource which is only loaded when it is selected, by the
+    client through the ``embed`` query parameter or by default. Otherwise
+    only a link to the resource is emitted, so expensive lookups are kept
+    off the default path.
+
+    Example:
+        >>> Document(embedded={
+        ...     'customer': Lazy(
+        ...         lambda: Embedded(data=customers.get(order.customer_id)),
+        ...         link='/customers/{0}'.format(order.customer_id)),
+        ... })
+
+    ``embedded`` also accepts zero argument callables, loaded only when
+    selected, and loader objects with a ``load`` method and optional
+    ``link`` and ``default`` attributes.
+    """
+
+    def __init__(self, loader, link=None, default=False):
+        """Initialise a new ``Lazy`` embedded resource.
+
+        Args:
+            loader (callable): Returns the embedded document, or a ``list``
+                or ``dict`` embedded as an :class:`.Embedded`
+
+        Keyword Args:
+            link: A :class:`flask_hal.link.Link` or ``href`` emitted under the
+                embedded name when the resource is not loaded
+            default (bool): Load the resource when the client selects none,
+                defaults to False
+        """
+
+        self.loader = loader
+        self.link = link
+        self.default = default
+
+    def load(self):
+        """Loads the embedded resource.
+
+        Returns:
+            The embedded document
+        """
+
+        return self.loader()
+
+
+class _Fallback(object):
+    """Replaces a lazy embedded resource which was not loaded in time, only
+    its link is emitted.
+    """
+
+    __slots__ = ('link',)
+
+    def __init__(self, link):
+        self.link = link
+
+
+def _is_selected(name, loader, selected):
+    """Returns whether a lazy embedded resource is loaded.
+
+    Args:
+        name (str): The embedded name
+        loader: The lazy resource
+        selected (frozenset): The embedded names selected by the client
+
+    Returns:
+        bool
+    """
+
+    if isinstance(loader, _Fallback):
+        return False
+
+    return name in selected or (not selected and getattr(loader, 'default', False))
+
+
+def _loaded(value):
+    """Returns a loaded lazy embedded resource as a document.
+
+    Args:
+        value: The loaded document, ``list``, ``dict`` or
+            :class:`flask_hal.encoder.RawJSON`, or ``None``
+
+    Returns:
+        BaseDocument: The document, or ``None``
+    """
+
+    if value is None or isinstance(value, BaseDocument):
+        return value
+
+    if isinstance(value, RawJSON):
+        return _RawDocument(value)
+
+    return Embedded(data=value)
 
 
 class BaseDocument(object):
     """Constructs a ``HAL`` document.
     """
 
+    # Encoded document of a frozen document
+    _json = None
+
     def __init__(self, data=None, links=None, embedded=None):
         """Base ``HAL`` Document. If no arguments are provided a minimal viable
         ``HAL`` Document is created.
@@ -63,6 +227,11 @@ class BaseDocument(object):
     def embedded(self, value):
         if not isinstance(value, dict):
             raise TypeError('embedded must be a {0} instance'.format(dict))
+        # RawJSON values are wrapped in a copy, the given dict is not changed
+        if any(isinstance(document, RawJSON) for document in value.values()):
+            value = dict(
+                (name, _RawDocument(document) if isinstance(document, RawJSON) else document)
+                for name, document in value.items())
         self._embedded = value
 
     def to_dict(self):
@@ -76,38 +245,436 @@ class BaseDocument(object):
         document = {}
 
         # Add Data to the Document
-        if isinstance(self.data, dict):
-            document.update(self.data)
+        data = self.data
+        if isinstance(data, dict):
+            document.update(data)
+            for key, value in data.items():
+                if isinstance(value, RawJSON):
+                    document[key] = value.loads()
+        elif isinstance(data, RawJSON):
+            document.update(data.loads())
+
+        embedded, lazy_links = self._resolve_embedded()
 
         # Add Links
-        if self.links:
-            document.update(self.links.to_dict())
+        links = self.links
+        if lazy_links:
+            links = link.Collection._trusted(list(links) + lazy_links)
+        if links:
+            document.update(links.to_dict())
 
         # Add Embedded: Embedded API TBC
-        if self.embedded:
+        if embedded:
             document.update({
                 '_embedded': dict(
-                    (n, v.to_dict()) for n, v in self.embedded.items()
+                    (n, v.to_dict()) for n, v in embedded.items()
                 )
             })
 
         return document
 
-    def to_json(self):
+    def _resolve_embedded(self):
+        """Loads the lazy embedded resources which are selected, see
+        :class:`.Lazy`.
+
+        Returns:
+            tuple: The ``embedded`` documents to serialize, and the links to
+                the lazy resources which are not loaded or ``None``
+        """
+
+        embedded = self.embedded
+        lazy = [
+            name for name, value in embedded.items()
+            if not isinstance(value, BaseDocument)
+        ]
+        if not lazy:
+            return embedded, None
+
+        selected = current_embeds()
+        embedded = dict(embedded)
+        links = []
+
+        for name in lazy:
+            loader = embedded.pop(name)
+            if _is_selected(name, loader, selected):
+                value = _loaded(getattr(loader, 'load', loader)())
+                if value is not None:
+                    embedded[name] = value
+            else:
+                href = getattr(loader, 'link', None)
+                if isinstance(href, link.Link):
+                    links.append(href)
+                elif href is not None:
+                    links.append(link.Link(name, href))
+
+        return embedded, links
+
+    def to_json(self, fieldset=None):
         """Converts :class:`.Document` to a ``JSON`` data structure.
 
+        Keyword Args:
+            fieldset (flask_hal.fieldset.Fieldset): Optional selection of the
+                fields and links to serialize
+
         Returns:
             str: ``JSON`` document
         """
 
-        return json.dumps(self.to_dict())
+        if self._json is not None and fieldset is None:
+            return self._json
+
+        return ''.join(self.iter_json(fieldset=fieldset))
+
+    def freeze(self, encoder=None):
+        """Makes the document, its links and embedded documents immutable
+        and caches the encoded document. Documents embedding a frozen
+        document splice the cached ``JSON`` in directly, so frozen documents
+        can be shared across requests and threads, for example for reused
+        author profiles or category stubs.
+
+        The ``data`` and ``embedded`` values are encoded when the document is
+        frozen, changes made to them later are not serialized.
+
+        Example:
+            >>> author = Embedded(data={'name': 'Dave'}).freeze()
+            >>> Document(embedded={'author': author}).to_json()
+
+        Keyword Args:
+            encoder (flask_hal.encoder.Encoder): Optional encoder, defaults to
+                the encoder of the current application
+
+        Returns:
+            flask_hal.document.BaseDocument: The frozen document
+        """
+
+        if isinstance(self, link._Frozen):
+            return self
+
+        encoder = encoder or get_encoder()
+
+        # Nested documents are frozen before the documents holding them,
+        # with an explicit stack so the depth is not limited by recursion
+        stack = [(self, False)]
+        seen = set()
+
+        while stack:
+            document, expanded = stack.pop()
+            if expanded:
+                document.links.freeze(encoder)
+                document._json = ''.join(_walk(document, encoder))
+                link._freeze(document)
+            elif not isinstance(document, link._Frozen) and id(document) not in seen:
+                seen.add(id(document))
+                stack.append((document, True))
+                stack.extend((nested, False) for nested in document._nested())
+
+        return self
+
+    def _nested(self):
+        """Returns the documents nested in the document, to freeze first.
+
+        Returns:
+            list: The embedded documents
+        """
+
+        return [
+            value for value in self.embedded.values()
+            if isinstance(value, BaseDocument)
+        ]
+
+    def iter_json(self, encoder=None, fieldset=None):
+        """Generates the ``JSON`` representation of the document in chunks,
+        encoding ``data``, ``links`` and ``_embedded`` as they are walked
+        rather than building the full ``dict`` and ``str`` up front.
+
+        Nested documents are walked with an explicit stack, so the depth of
+        the document is not limited by the Python recursion limit.
+
+        Example:
+            >>> d = Document(data={'foo': 'bar'})
+            >>> ''.join(d.iter_json()) == d.to_json()
+            ... True
+
+        Keyword Args:
+            encoder (flask_hal.encoder.Encoder): Optional encoder, defaults to
+                the encoder of the current application
+            fieldset (flask_hal.fieldset.Fieldset): Optional selection of the
+                fields and links to serialize, excluded fields and links are
+                not encoded
+
+        Returns:
+            generator: Encoded ``JSON`` chunks
+        """
+
+        return _walk(self, encoder or get_encoder(), fieldset)
+
+    def _tokens(self, encoder, fieldset=None):
+        """Generates the tokens of the document for :func:`_walk`: encoded
+        ``JSON`` chunks, and nested documents which the walker expands in
+        place.
+
+        Args:
+            encoder (flask_hal.encoder.Encoder): The encoder
+
+        Keyword Args:
+            fieldset (flask_hal.fieldset.Fieldset): The selection of the
+                document, embedded documents are then yielded with their own
+                selection as ``(document, fieldset)`` tuples
+
+        Yields:
+            str or BaseDocument: Encoded chunks and nested documents
+        """
+
+        embedded, lazy_links = self._resolve_embedded()
+        members = self._members(encoder, fieldset, lazy_links)
+
+        # Add Embedded
+        if embedded:
+            dumps = encoder.dumps
+            key_separator = encoder.key_separator
+            separator = '{'
+            if members:
+                yield '{' + members + encoder.item_separator + '"_embedded"' + key_separator
+            else:
+                yield '{"_embedded"' + key_separator
+            for name, value in embedded.items():
+                yield separator + dumps(name) + key_separator
+                if fieldset is None:
+                    yield value
+                else:
+                    yield value, fieldset.embedded(name)
+                separator = encoder.item_separator
+            yield '}}'
+        else:
+            yield '{' + members + '}'
+
+    def _members(self, encoder, fieldset=None, lazy_links=None):
+        """Returns the encoded ``data`` and ``_links`` members of the document
+        without the enclosing braces.
+
+        Args:
+            encoder (flask_hal.encoder.Encoder): The encoder
+
+        Keyword Args:
+            fieldset (flask_hal.fieldset.Fieldset): Selected fields and links
+            lazy_links (list): Links to lazy embedded resources not loaded
+
+        Returns:
+            str: The encoded members
+        """
+
+        dumps = encoder.dumps
+        members = ''
+        rels = None
+        if fieldset is not None:
+            rels = fieldset.links
+
+        # Add Data to the Document, encoded in one call unless it has keys
+        # the links or embedded documents override
+        data = self.data
+        if data and isinstance(data, dict):
+            if (('_links' in data and self.links) or
+                    ('_embedded' in data and self.embedded)):
+                data = dict(
+                    (k, v) for k, v in data.items()
+                    if not (k == '_links' and self.links) and
+                    not (k == '_embedded' and self.embedded))
+
+            if fieldset is not None and fieldset.fields is not None:
+                data = _select(data, fieldset.fields)
+
+            if data:
+                members = dumps(data)[1:-1]
+        elif isinstance(data, RawJSON):
+            members = _raw_members(data)
+
+        # Add Links
+        collection = self.links
+        if lazy_links:
+            collection = link.Collection._trusted(list(collection) + lazy_links)
+        if collection:
+            links = collection._links_json(encoder, rels)
+            if links == '{}':
+                return members
+            links = '"_links"' + encoder.key_separator + links
+            if members:
+                members += encoder.item_separator + links
+            else:
+                members = links
+
+        return members
+
+    def _flat_json(self, encoder, fieldset=None):
+        """Returns the encoded document when it has no nested documents, so
+        :func:`_walk` can encode it without expanding its tokens.
+
+        Args:
+            encoder (flask_hal.encoder.Encoder): The encoder
+
+        Keyword Args:
+            fieldset (flask_hal.fieldset.Fieldset): Selected fields and links
+
+        Returns:
+            str: The encoded document, or ``None`` if it has nested documents
+        """
+
+        if self.embedded:
+            return None
+
+        return '{' + self._members(encoder, fieldset) + '}'
+
+
+def _walk(document, encoder, fieldset=None):
+    """Returns a generator of the encoded ``JSON`` chunks of ``document``.
+
+    Args:
+        document (BaseDocument): The document to serialize
+        encoder (flask_hal.encoder.Encoder): The encoder
+
+    Keyword Args:
+        fieldset (flask_hal.fieldset.Fieldset): Optional selection of the
+            fields and links to serialize
+
+    Returns:
+        generator: Encoded ``JSON`` chunks
+    """
+
+    if fieldset is None:
+        return _walk_all(document, encoder)
+
+    return _walk_selected(document, encoder, fieldset)
+
+
+def _walk_all(document, encoder):
+    """Generates the encoded ``JSON`` chunks of ``document``. Nested
+    documents yielded by :meth:`BaseDocument._tokens` are pushed onto an
+    explicit stack instead of being serialized recursively.
+
+    Args:
+        document (BaseDocument): The document to serialize
+        encoder (flask_hal.encoder.Encoder): The encoder
+
+    Yields:
+        str: Encoded ``JSON`` chunks
+    """
+
+    if document._json is not None:
+        yield document._json
+        return
+
+    stack = [document._tokens(encoder)]
+
+    while stack:
+        for token in stack[-1]:
+            if isinstance(token, BaseDocument):
+                flat = token._json
+                if flat is None:
+                    flat = token._flat_json(encoder)
+                if flat is None:
+                    stack.append(token._tokens(encoder))
+                    break
+                token = flat
+            yield token
+        else:
+            stack.pop()
+
+
+def _walk_selected(document, encoder, fieldset):
+    """Generates the encoded ``JSON`` chunks of ``document`` pruned to the
+    fields and links selected by ``fieldset``, as :func:`_walk_all`. The
+    cached ``JSON`` of frozen documents is not used.
+
+    Args:
+        document (BaseDocument): The document to serialize
+        encoder (flask_hal.encoder.Encoder): The encoder
+        fieldset (flask_hal.fieldset.Fieldset): The selection of the document
+
+    Yields:
+        str: Encoded ``JSON`` chunks
+    """
+
+    stack = [(document._tokens(encoder, fieldset), fieldset)]
+
+    while stack:
+        tokens, selected = stack[-1]
+        for token in tokens:
+            if isinstance(token, tuple):
+                token, scope = token
+            elif isinstance(token, BaseDocument):
+                scope = selected
+            else:
+                yield token
+                continue
+            flat = token._flat_json(encoder, scope)
+            if flat is None:
+                stack.append((token._tokens(encoder, scope), scope))
+                break
+            yield flat
+        else:
+            stack.pop()
+
+
+def _raw_members(raw):
+    """Returns the members of a :class:`flask_hal.encoder.RawJSON` object
+    without the enclosing braces.
+
+    Args:
+        raw (flask_hal.encoder.RawJSON): Document data
+
+    Raises:
+        ValueError: If ``raw`` does not encode an object
+
+    Returns:
+        str: The encoded members
+    """
+
+    text = raw.json.strip()
+    if text[:1] != '{' or text[-1:] != '}':
+        raise ValueError('RawJSON document data must be a JSON object')
+
+    return text[1:-1].strip()
+
+
+def _select(data, fields):
+    """Returns the selected fields of a ``dict``, in the order of ``data``.
+
+    Args:
+        data (dict): Document data
+        fields (frozenset): The selected fields
+
+    Returns:
+        dict
+    """
+
+    return dict((k, v) for k, v in data.items() if k in fields)
+
+
+class _RawDocument(BaseDocument):
+    """An embedded resource given as :class:`flask_hal.encoder.RawJSON`,
+    spliced into the output verbatim like a frozen document. Sparse
+    fieldsets do not apply to its text.
+    """
+
+    def __init__(self, raw):
+        super(_RawDocument, self).__init__(data=raw)
+        self._json = raw.json
+
+    def to_dict(self):
+        return self.data.loads()
+
+    def _tokens(self, encoder, fieldset=None):
+        yield self._json
+
+    def _flat_json(self, encoder, fieldset=None):
+        return self._json
 
 
 class Document(BaseDocument):
     """Constructs a ``HAL`` document.
     """
 
-    def __init__(self, data=None, links=None, embedded=None, external_self=False):
+    def __init__(self, data=None, links=None, embedded=None, external_self=False,
+                 version=None, embed_timeout=None):
         """Initialises a new ``HAL`` Document instance. If no arguments are
         provided a minimal viable ``HAL`` Document is created.
 
@@ -116,12 +683,69 @@ class Document(BaseDocument):
             links (flask_hal.link.Collection): A collection of ``HAL`` links
             embedded: TBC
             external_self: use a fully-qualified link for self
+            version: Optional version key of the resource, such as a revision
+                number or modification time, used as the ``ETag`` so
+                conditional requests are answered without serializing
+            embed_timeout (float): Seconds allowed to load the lazy embedded
+                resources in the ``HAL_EMBED_WORKERS`` pool, overrides
+                ``HAL_EMBED_TIMEOUT``
 
         Raises:
             TypeError: If ``links`` is not a :class:`flask_hal.link.Collection`
         """
         super(Document, self).__init__(data, links, embedded)
-        self.links.append(link.Self(external=external_self))
+
+        # Frozen collections are shared, the self link goes in a new one
+        if isinstance(self.links, link._Frozen):
+            self.links = link.Collection._trusted(
+                list(self.links) + [link.Self(external=external_self)])
+        else:
+            self.links.append(link.Self(external=external_self))
+        self.version = version
+        self.embed_timeout = embed_timeout
+
+    def _resolve_embedded(self):
+        # The CURIE definitions of the application are emitted with the
+        # links of the top level document
+        embedded, links = super(Document, self)._resolve_embedded()
+
+        curies = link._curies()
+        if curies is not None:
+            links = curies.links + (links or [])
+
+        return embedded, links
+
+    def __call__(self, environ, start_response):
+        """Serves the document as a ``WSGI`` application through the
+        application's ``response_class``. Newer Flask versions only pass
+        callable view return values to ``force_type``, this lets
+        :class:`flask_hal.HALResponse` convert documents returned by views.
+
+        Args:
+            environ (dict): Request environment
+            start_response (callable): ``WSGI`` start response callable
+
+        Raises:
+            TypeError: If the response class of the application is not a
+                :class:`flask_hal.HALResponse`, which would serve the
+                document by calling it again
+
+        Returns:
+            iterable: The response body
+        """
+
+        # Imported here, flask_hal imports this module
+        from flask_hal import HALResponse
+
+        response_class = current_app.response_class
+        if not issubclass(response_class, HALResponse):
+            raise TypeError(
+                '{0} can not convert documents, use {1} as the response '
+                'class'.format(response_class, HALResponse))
+
+        response = response_class.force_type(self, environ)
+
+        return response(environ, start_response)
 
 
 class Embedded(BaseDocument):
@@ -162,8 +786,118 @@ class Embedded(BaseDocument):
                 },
                 "currentlyProcessing": 14
             }
+
+    ``data`` may also be any iterable of documents or plain values, such as
+    a generator or a database cursor. Items are consumed one at a time while
+    the embedded document is serialized, so a generator can only be
+    serialized once.
     """
 
+    def __init__(self, data=None, links=None, embedded=None, max_items=None):
+        """Initialises a new ``HAL`` Embedded instance.
+
+        Keyword Args:
+            data: Data for the document, a ``dict`` or an iterable of items
+            links (flask_hal.link.Collection): A collection of ``HAL`` links
+            embedded (dict): Embedded documents
+            max_items (int): Maximum number of items serialized from an
+                iterable ``data``, further items are not consumed
+
+        Raises:
+            TypeError: If ``links`` is not a :class:`flask_hal.link.Collection`
+        """
+
+        super(Embedded, self).__init__(data, links, embedded)
+        self.max_items = max_items
+
+    @classmethod
+    def from_rows(cls, rows, self_endpoint=None, link_specs=None, links=None,
+                  max_items=None):
+        """Builds an embedded list of documents from rows in one pass. The
+        links of every row are built in bulk with
+        :class:`flask_hal.link.LinkTemplate` and the item documents are
+        created without the type checks of :class:`.Embedded`, the output is
+        the same as building each item by hand.
+
+        Example:
+            >>> Embedded.from_rows(
+            ...     [{'id': 1, 'total': 30}, {'id': 2, 'total': 12}],
+            ...     self_endpoint='orders.detail',
+            ...     link_specs=[('customer', 'customers.detail')])
+            >>> Embedded.from_rows(
+            ...     {'id': [1, 2], 'total': [30, 12]},
+            ...     self_endpoint='orders.detail')
+
+        Args:
+            rows: A list of ``dict`` rows, or columnar data as a ``dict`` of
+                equally long sequences or array-like columns
+
+        Keyword Args:
+            self_endpoint (str): Endpoint of the ``self`` link of each item,
+                built from the values of the row
+            link_specs (list): Further links of each item, as
+                :class:`flask_hal.link.LinkTemplate` instances or
+                ``(rel, endpoint)`` tuples, built from the values of the row.
+                Links excluded by the sparse fieldset of the request are not
+                built
+            links (flask_hal.link.Collection): Links of the embedded list
+            max_items (int): Maximum number of items serialized
+
+        Returns:
+            flask_hal.document.Embedded: The embedded list
+        """
+
+        if isinstance(rows, Mapping):
+            rows = _columns_to_rows(rows)
+        elif not isinstance(rows, list):
+            rows = list(rows)
+
+        templates = []
+        if self_endpoint is not None:
+            templates.append(link.LinkTemplate('self', self_endpoint))
+        for spec in link_specs or ():
+            if not isinstance(spec, link.LinkTemplate):
+                spec = link.LinkTemplate(*spec)
+            templates.append(spec)
+
+        # Links no client selected are not built
+        fieldset = current_fieldset()
+        if fieldset is not None:
+            curies = link._curies()
+            templates = [
+                t for t in templates
+                if not fieldset.excludes_link(t.rel) or (
+                    curies is not None and not fieldset.excludes_link(curies.compact(t.rel)))
+            ]
+
+        # One list of links per row, in template order
+        columns = [template.links(rows, ignore_unknown=True) for template in templates]
+        trusted = link.Collection._trusted
+        new = object.__new__
+        items = []
+
+        for row, row_links in zip(rows, zip(*columns) if columns else itertools.repeat(())):
+            item = new(cls)
+            item.__dict__ = {
+                'data': row,
+                '_links': trusted(row_links),
+                '_embedded': {},
+                'max_items': None,
+            }
+            items.append(item)
+
+        return cls(data=items, links=links, max_items=max_items)
+
+    def _items(self):
+        """Returns an iterator over the items of ``data``, stopping at
+        ``max_items``.
+        """
+
+        if self.max_items is None:
+            return iter(self.data)
+
+        return itertools.islice(self.data, self.max_items)
+
     def to_dict(self):
         """Converts the ``Document`` instance into an appropriate data
         structure for HAL formatted documents.
@@ -171,14 +905,332 @@ class Embedded(BaseDocument):
         Returns:
             dict: The ``HAL`` document data structure
         """
-        if isinstance(self.data, (list, tuple, set)):
+        if _is_items(self.data):
             data = []
 
-            for item in self.data:
+            for item in self._items():
                 if isinstance(item, BaseDocument):
                     data.append(item.to_dict())
+                elif isinstance(item, RawJSON):
+                    data.append(item.loads())
                 else:
                     data.append(item)
             return data
 
         return super(Embedded, self).to_dict()
+
+    def _nested(self):
+        nested = super(Embedded, self)._nested()
+
+        # Iterable data is consumed once, keep the items for to_dict
+        if _is_items(self.data):
+            self.data = tuple(self._items())
+            nested.extend(item for item in self.data if isinstance(item, BaseDocument))
+
+        return nested
+
+    def _flat_json(self, encoder, fieldset=None):
+        if _is_items(self.data):
+            return None
+
+        return super(Embedded, self)._flat_json(encoder, fieldset)
+
+    def _tokens(self, encoder, fieldset=None):
+        """Generates the tokens of the embedded document. Iterable data is
+        encoded as a ``JSON`` array, runs of plain items are encoded in one
+        call of up to ``_ITEMS_BATCH`` items at a time.
+
+        Items share the selection of the embedded list, the selected fields
+        also apply to plain ``dict`` items.
+
+        Args:
+            encoder (flask_hal.encoder.Encoder): The encoder
+
+        Keyword Args:
+            fieldset (flask_hal.fieldset.Fieldset): Selected fields and links
+
+        Yields:
+            str or BaseDocument: Encoded chunks and nested documents
+        """
+
+        if not _is_items(self.data):
+            return super(Embedded, self)._tokens(encoder, fieldset)
+
+        data = self.data
+        if isinstance(data, (list, tuple)):
+            size = len(data)
+            if self.max_items is not None:
+                size = min(size, self.max_items)
+            parallel = _parallel(size)
+            if parallel is not None:
+                return self._parallel_tokens(encoder, fieldset, *parallel)
+
+        return self._item_tokens(encoder, fieldset)
+
+    def _item_tokens(self, encoder, fieldset=None):
+        """Generates the tokens of iterable data in this thread, see
+        :meth:`_tokens`.
+        """
+
+        dumps = encoder.dumps
+        item_separator = encoder.item_separator
+        separator = '['
+        batch = []
+
+        fields = None
+        if fieldset is not None:
+            fields = fieldset.fields
+
+        for item in self._items():
+            if isinstance(item, BaseDocument):
+                if batch:
+                    yield separator + dumps(batch)[1:-1]
+                    separator = item_separator
+                    batch = []
+                # Items without nested documents are encoded in place
+                flat = item._json if fieldset is None else None
+                if flat is None:
+                    flat = item._flat_json(encoder, fieldset)
+                if flat is None:
+                    yield separator
+                    yield item
+                else:
+                    yield separator + flat
+                separator = item_separator
+            else:
+                if fields is not None and isinstance(item, dict):
+                    item = _select(item, fields)
+                batch.append(item)
+                if len(batch) == _ITEMS_BATCH:
+                    yield separator + dumps(batch)[1:-1]
+                    separator = item_separator
+                    batch = []
+
+        if batch:
+            yield separator + dumps(batch)[1:-1]
+            separator = item_separator
+
+        # Empty array
+        if separator == '[':
+            yield '['
+
+        yield ']'
+
+    def _parallel_tokens(self, encoder, fieldset, executor, chunk_size, threads):
+        """Generates the tokens of a large list, encoded in chunks of
+        ``chunk_size`` items by ``executor``. Fragments are yielded in item
+        order, with at most two chunks per worker in flight. A chunk the
+        pool can not encode, for example with items which can not be
+        pickled for a worker process or a broken pool, is encoded in this
+        thread, so the
+        output is always the same as the serial output.
+
+        Worker processes encode chunks outside of the request context, see
+        :func:`_encode_detached`, given the CURIE definitions of the
+        application. Chunks with lazy embedded resources, which are loaded
+        for the selection of the request, are encoded in this thread.
+
+        Args:
+            encoder (flask_hal.encoder.Encoder): The encoder
+            fieldset (flask_hal.fieldset.Fieldset): Selected fields and links
+            executor (concurrent.futures.Executor): The pool
+            chunk_size (int): Items per chunk
+            threads (bool): Whether ``executor`` runs threads, chunks then
+                share the request or application context of the view
+
+        Yields:
+            str: Encoded chunks
+        """
+
+        data = self.data
+        if self.max_items is not None:
+            data = data[:self.max_items]
+
+        # Each chunk gets its own copy of the request context, or the
+        # application context outside of a request
+        bind = threads and has_request_context()
+        app = None
+        if threads and not bind:
+            app = current_app._get_current_object()
+        curies = None if threads else link._curies()
+        window = 2 * getattr(executor, '_max_workers', 1)
+        pending = deque()
+        separator = '['
+
+        for start in range(0, len(data), chunk_size):
+            chunk = data[start:start + chunk_size]
+            if bind:
+                future = _submit(
+                    executor, copy_current_request_context(_encode_chunk),
+                    chunk, encoder, fieldset)
+            elif threads:
+                future = _submit(executor, _encode_in_app, app, chunk, encoder, fieldset)
+            elif _has_lazy(chunk):
+                future = None
+            else:
+                future = _submit(
+                    executor, _encode_detached, chunk, encoder, fieldset, curies)
+            pending.append((chunk, future))
+            if len(pending) == window:
+                yield separator + _chunk_result(pending.popleft(), encoder, fieldset)
+                separator = encoder.item_separator
+
+        while pending:
+            yield separator + _chunk_result(pending.popleft(), encoder, fieldset)
+            separator = encoder.item_separator
+
+        # Empty array
+        if separator == '[':
+            yield '['
+
+        yield ']'
+
+
+class _Chunk(Embedded):
+    """A chunk of the items of a large embedded list, encoded by a worker
+    of the parallel serializer and never split again.
+    """
+
+    def _tokens(self, encoder, fieldset=None):
+        return self._item_tokens(encoder, fieldset)
+
+
+def _encode_chunk(items, encoder, fieldset):
+    """Encodes a chunk of the items of an embedded list, in a worker of the
+    parallel serializer.
+
+    Args:
+        items (list): The items
+        encoder (flask_hal.encoder.Encoder): The encoder
+        fieldset (flask_hal.fieldset.Fieldset): Selected fields and links
+
+    Returns:
+        str: The encoded items without the enclosing brackets
+    """
+
+    return ''.join(_walk(_Chunk(data=list(items)), encoder, fieldset))[1:-1]
+
+
+def _encode_in_app(app, items, encoder, fieldset):
+    """Encodes a chunk of the items of an embedded list in a thread of the
+    parallel serializer with the context of ``app``, for lists serialized
+    outside of a request.
+    """
+
+    with app.app_context():
+        return _encode_chunk(items, encoder, fieldset)
+
+
+def _encode_detached(items, encoder, fieldset, curies):
+    """Encodes a chunk of the items of an embedded list in a worker process
+    of the parallel serializer, in an empty context so the application and
+    request contexts a forked worker inherited are not used. Items needing
+    a context raise and are encoded by the parent instead.
+
+    Args:
+        items (list): The items
+        encoder (flask_hal.encoder.Encoder): The encoder
+        fieldset (flask_hal.fieldset.Fieldset): Selected fields and links
+        curies (flask_hal.link.Curies): The CURIE definitions of the
+            application, or ``None``
+
+    Returns:
+        str: The encoded items without the enclosing brackets
+    """
+
+    args = (curies, _encode_chunk, items, encoder, fieldset)
+    if Context is None:  # pragma: no cover
+        return link._with_curies(*args)
+
+    return Context().run(link._with_curies, *args)
+
+
+def _has_lazy(items):
+    """Returns whether the documents of ``items`` or their embedded
+    documents hold lazy embedded resources.
+
+    Args:
+        items (list): Embedded list items
+
+    Returns:
+        bool
+    """
+
+    stack = [item for item in items if isinstance(item, BaseDocument)]
+
+    while stack:
+        doc = stack.pop()
+
+        # Frozen documents are already encoded
+        if doc._json is not None:
+            continue
+
+        for value in doc.embedded.values():
+            if not isinstance(value, BaseDocument):
+                return True
+            stack.append(value)
+
+        if isinstance(doc.data, (list, tuple)):
+            stack.extend(
+                item for item in doc.data if isinstance(item, BaseDocument))
+
+    return False
+
+
+def _submit(executor, func, *args):
+    """Submits a chunk to the parallel serializer.
+
+    Returns:
+        concurrent.futures.Future: The future, or ``None`` if the pool
+            rejected the chunk, for example when it is broken
+    """
+
+    try:
+        return executor.submit(func, *args)
+    except Exception:
+        return None
+
+
+def _chunk_result(pending, encoder, fieldset):
+    """Returns the fragment of a chunk submitted to the parallel serializer,
+    encoded in this thread if it was not submitted or the pool failed to
+    encode it.
+    """
+
+    chunk, future = pending
+    if future is not None:
+        try:
+            return future.result()
+        except Exception:
+            pass
+
+    return _encode_chunk(chunk, encoder, fieldset)
+
+
+def _parallel(size):
+    """Returns how a list of ``size`` items is encoded in parallel by the
+    current application, see ``HAL_PARALLEL_THRESHOLD``.
+
+    Args:
+        size (int): Number of items serialized
+
+    Returns:
+        tuple: The pool, the chunk size and whether the pool runs threads,
+            or ``None`` to encode the list serially
+    """
+
+    if not has_app_context():
+        return None
+
+    state = current_app.extensions.get('hal')
+    if state is None or state.serializer is None:
+        return None
+
+    config = current_app.config
+    if size < config['HAL_PARALLEL_THRESHOLD']:
+        return None
+
+    return (
+        state.serializer,
+        max(config['HAL_PARALLEL_CHUNK_SIZE'], 1),
+        config['HAL_PARALLEL_EXECUTOR'] == 'thread')
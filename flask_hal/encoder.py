@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+flask_hal.encoder
+=================
+
+Pluggable ``JSON`` encoder backends used to serialize ``HAL`` documents.
+The backend is configured through :meth:`flask_hal.HAL.init_app`, the
+standard library :mod:`json` module is used when no application has been
+configured.
+
+Example:
+    >>> from flask_hal.encoder import create_encoder
+    >>> encoder = create_encoder('json', compact=True)
+    >>> encoder.dumps({'foo': 'bar'})
+    ... '{"foo":"bar"}'
+"""
+
+# Standard Libs
+import datetime
+import decimal
+import json
+import threading
+import uuid
+
+# Third Party Libs
+from flask import current_app, has_app_context
+
+
+try:
+    from _json import make_encoder as c_make_encoder
+    from _json import encode_basestring_ascii
+except ImportError:  # pragma: no cover
+    c_make_encoder = None
+
+
+try:
+    import simplejson
+except ImportError:  # pragma: no cover
+    simplejson = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def default_hook(obj):
+    """Default type hook for values the encoders do not support natively.
+    Dates and times are encoded in ISO 8601 format, ``Decimal`` and ``UUID``
+    values as strings.
+
+    Args:
+        obj: The value to encode
+
+    Raises:
+        TypeError: If ``obj`` is not a supported type
+
+    Returns:
+        A ``JSON`` serializable value
+    """
+
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+
+    raise TypeError('{0!r} is not JSON serializable'.format(obj))
+
+
+class RawJSON(object):
+    """Pre-encoded ``JSON`` text, such as a ``JSON`` column or the body of an
+    upstream service, spliced verbatim into the output of the encoders
+    rather than decoded and encoded again. It can be used anywhere in
+    document ``data``, as the ``data`` of a document when it encodes an
+    object, as an ``embedded`` value and as an embedded list item.
+
+    Example:
+        >>> Document(data={'id': 1, 'settings': RawJSON(row.settings)})
+        >>> Embedded(data=[RawJSON(text) for text in cached_orders])
+
+    The text is trusted, with ``HAL_VALIDATE_RAW_JSON`` enabled, for example
+    in debug mode, it is decoded once when the ``RawJSON`` is created.
+    """
+
+    __slots__ = ('json', )
+
+    def __init__(self, json, validate=None):
+        """Initialise a new ``RawJSON``.
+
+        Args:
+            json: The encoded ``JSON`` value, ``str`` or UTF-8 ``bytes``
+
+        Keyword Args:
+            validate (bool): Check that ``json`` is valid, defaults to the
+                ``HAL_VALIDATE_RAW_JSON`` configuration
+
+        Raises:
+            ValueError: If ``json`` is validated and is not valid ``JSON``
+        """
+
+        if isinstance(json, bytes):
+            json = json.decode('utf-8')
+
+        if validate is None:
+            validate = has_app_context() and current_app.config.get(
+                'HAL_VALIDATE_RAW_JSON', False)
+
+        self.json = json
+
+        if validate:
+            try:
+                self.loads()
+            except ValueError as e:
+                raise ValueError('Invalid raw JSON {0!r}: {1}'.format(json[:50], e))
+
+    def __repr__(self):
+        return 'RawJSON({0!r})'.format(self.json)
+
+    def loads(self):
+        """Returns the decoded value.
+
+        Returns:
+            The decoded ``JSON`` value
+        """
+
+        return json.loads(self.json)
+
+
+# Stands in for RawJSON values while encoding, random so it can not clash
+# with encoded data
+_RAW_MARKER = 'hal-raw-' + uuid.uuid4().hex
+_RAW_QUOTED = '"' + _RAW_MARKER + '"'
+
+# Set once a RawJSON value has been encoded, until then encoded values are
+# not searched for markers
+_raw_seen = False
+
+
+class _RawValues(threading.local):
+    """RawJSON texts seen by the type hook of an encoder in this thread.
+    """
+
+    values = None
+
+
+class Encoder(object):
+    """Encodes Python objects using the standard library :mod:`json` module.
+    Subclasses implement other backends by overriding :meth:`dumps`.
+    """
+
+    #: The backend name used by :func:`create_encoder`
+    name = 'json'
+
+    #: Whether the backend library can be imported
+    available = True
+
+    def __init__(self, compact=False, default=default_hook):
+        """Initialise a new ``Encoder``.
+
+        Keyword Args:
+            compact (bool): Omit whitespace after separators, defaults to False
+            default (callable): Type hook for unsupported values
+        """
+
+        self.compact = compact
+        self.default = default
+
+        if compact:
+            self.item_separator, self.key_separator = ',', ':'
+        else:
+            self.item_separator, self.key_separator = ', ', ': '
+
+        self._raw = _RawValues()
+
+        self._encoder = json.JSONEncoder(
+            separators=(self.item_separator, self.key_separator),
+            default=self._hook)
+
+        # JSONEncoder.encode builds a new C encoder per call, which dominates
+        # the cost of encoding small values, so build it once. Circular
+        # reference checks are skipped so the encoder can be shared between
+        # threads.
+        self._iterencode = None
+        if c_make_encoder is not None:
+            try:
+                self._iterencode = c_make_encoder(
+                    None, self._hook, encode_basestring_ascii, None,
+                    self.key_separator, self.item_separator, False, False, True)
+            except TypeError:  # pragma: no cover
+                pass
+
+    def __reduce__(self):
+        # The C encoder can not be pickled, rebuild the encoder instead so it
+        # can be sent to worker processes
+        return type(self), (self.compact, self.default)
+
+    def dumps(self, obj):
+        """Returns the ``JSON`` encoded representation of ``obj``.
+
+        Args:
+            obj: The value to encode
+
+        Returns:
+            str: The ``JSON`` encoded value
+        """
+
+        if self._iterencode is not None:
+            encoded = ''.join(self._iterencode(obj, 0))
+        else:
+            encoded = self._encoder.encode(obj)
+
+        if _raw_seen:
+            return self._splice(encoded)
+
+        return encoded
+
+    def _hook(self, obj):
+        """Type hook of the backends, encodes :class:`.RawJSON` values as a
+        marker replaced by :meth:`_splice` and other values with
+        ``default``.
+        """
+
+        if isinstance(obj, RawJSON):
+            global _raw_seen
+            _raw_seen = True
+            values = self._raw.values
+            if values is None:
+                self._raw.values = [obj.json]
+            else:
+                values.append(obj.json)
+            return _RAW_MARKER
+
+        if self.default is None:
+            raise TypeError('{0!r} is not JSON serializable'.format(obj))
+
+        return self.default(obj)
+
+    def _splice(self, encoded):
+        """Replaces the :class:`.RawJSON` markers of ``encoded`` with their
+        text.
+
+        Args:
+            encoded (str): The output of the backend
+
+        Returns:
+            str: The encoded value
+        """
+
+        values = self._raw.values
+        if not values:
+            return encoded
+
+        self._raw.values = None
+        parts = encoded.split(_RAW_QUOTED)
+
+        # Values left by a failed call precede the values of this call
+        values = values[len(values) - len(parts) + 1:]
+
+        chunks = [parts[0]]
+        for value, part in zip(values, parts[1:]):
+            chunks.append(value)
+            chunks.append(part)
+
+        return ''.join(chunks)
+
+
+class SimpleJSONEncoder(Encoder):
+    """Encodes Python objects using :mod:`simplejson` and its C speedups.
+    """
+
+    name = 'simplejson'
+    available = simplejson is not None
+
+    def __init__(self, compact=False, default=default_hook):
+        super(SimpleJSONEncoder, self).__init__(compact, default)
+
+        # Match the standard library output for Decimal and namedtuple values
+        self._iterencode = None
+        self._encoder = simplejson.JSONEncoder(
+            separators=(self.item_separator, self.key_separator),
+            default=self._hook,
+            use_decimal=False,
+            namedtuple_as_object=False)
+
+
+class OrjsonEncoder(Encoder):
+    """Encodes Python objects using :mod:`orjson`. ``orjson`` only produces
+    compact output so ``compact`` is always ``True``.
+    """
+
+    name = 'orjson'
+    available = orjson is not None
+
+    def __init__(self, compact=True, default=default_hook):
+        super(OrjsonEncoder, self).__init__(True, default)
+
+    def dumps(self, obj):
+        encoded = orjson.dumps(
+            obj,
+            default=self._hook,
+            option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+        if _raw_seen:
+            return self._splice(encoded)
+
+        return encoded
+
+
+#: Available encoder backends by name
+BACKENDS = {
+    Encoder.name: Encoder,
+    SimpleJSONEncoder.name: SimpleJSONEncoder,
+    OrjsonEncoder.name: OrjsonEncoder,
+}
+
+
+def create_encoder(backend='auto', compact=False, default=default_hook):
+    """Creates an encoder for the given backend. The ``auto`` backend picks
+    ``orjson`` for compact output when it is installed, otherwise the
+    standard library, whose C encoder is built once per encoder. The
+    ``simplejson`` backend is only used when it is configured.
+
+    Example:
+        >>> create_encoder('auto', compact=True).name
+        ... 'orjson'
+
+    Keyword Args:
+        backend (str): Backend name or an :class:`.Encoder` instance
+        compact (bool): Omit whitespace after separators, defaults to False
+        default (callable): Type hook for unsupported values
+
+    Raises:
+        ValueError: If the backend is unknown or cannot be imported
+
+    Returns:
+        flask_hal.encoder.Encoder: The encoder
+    """
+
+    if isinstance(backend, Encoder):
+        return backend
+
+    if default is None:
+        default = default_hook
+
+    if backend == 'auto':
+        if OrjsonEncoder.available and compact:
+            backend = OrjsonEncoder.name
+        else:
+            backend = Encoder.name
+
+    if backend not in BACKENDS:
+        raise ValueError('{0} is not a valid encoder backend'.format(backend))
+
+    if not BACKENDS[backend].available:
+        raise ValueError('{0} is not installed'.format(backend))
+
+    return BACKENDS[backend](compact=compact, default=default)
+
+
+#: Encoder used outside of a configured application
+DEFAULT_ENCODER = Encoder()
+
+
+def get_encoder():
+    """Returns the encoder configured for the current application, or the
+    standard library encoder outside of a configured application.
+
+    Returns:
+        flask_hal.encoder.Encoder: The encoder
+    """
+
+    if has_app_context():
+        state = current_app.extensions.get('hal')
+        if state is not None:
+            return state.encoder
+
+    return DEFAULT_ENCODER
+
+
+def dumps(obj):
+    """Returns the ``JSON`` encoded representation of ``obj`` using the
+    encoder of the current application.
+
+    Args:
+        obj: The value to encode
+
+    Returns:
+        str: The ``JSON`` encoded value
+    """
+
+    return get_encoder().dumps(obj)
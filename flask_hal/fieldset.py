@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+flask_hal.fieldset
+==================
+
+Sparse fieldsets: clients select the ``data`` fields and ``_links``
+relations they need through query parameters, and documents are pruned as
+they are serialized so excluded fields and links are never encoded. Clients
+also select the lazy embedded resources to load, see
+:func:`current_embeds`.
+
+Enabled with ``HAL_SPARSE_FIELDSETS``, the query parameters are:
+
+* ``fields=id,total``: fields of the top level document
+* ``fields[orders]=id,total``: fields of the documents embedded as
+  ``orders``, at any depth
+* ``links=next,customer``: link relations of every document
+* ``links[orders]=customer``: link relations of the documents embedded as
+  ``orders``
+
+The ``self`` link is always kept. Documents and embedded documents without
+a selection are serialized in full.
+
+Example:
+    >>> GET /orders?fields=count&fields[orders]=id&links[orders]=
+    ... {
+    ...     "count": 2,
+    ...     "_links": {"self": {"href": "/orders?..."}},
+    ...     "_embedded": {"orders": [
+    ...         {"id": 1, "_links": {"self": {"href": "/orders/1"}}},
+    ...         {"id": 2, "_links": {"self": {"href": "/orders/2"}}}
+    ...     ]}
+    ... }
+"""
+
+# Third Party Libs
+from flask import current_app, has_request_context, request
+
+
+class Fieldset(object):
+    """The fields and link relations selected for a document, and for the
+    documents it embeds by name.
+    """
+
+    def __init__(self, fields=None, links=None, embedded_fields=None,
+                 embedded_links=None):
+        """Initialise a new ``Fieldset``.
+
+        Keyword Args:
+            fields (iterable): ``data`` fields of the document, ``None`` for
+                all fields
+            links (iterable): Link relations of the document and of embedded
+                documents without their own selection, ``None`` for all
+                relations
+            embedded_fields (dict): Embedded name -> ``data`` fields
+            embedded_links (dict): Embedded name -> link relations
+        """
+
+        self.fields = None if fields is None else frozenset(fields)
+        self.links = None if links is None else frozenset(links) | frozenset(['self'])
+        self.embedded_fields = dict(
+            (k, frozenset(v)) for k, v in (embedded_fields or {}).items())
+        self.embedded_links = dict(
+            (k, frozenset(v) | frozenset(['self']))
+            for k, v in (embedded_links or {}).items())
+
+        # Embedded links default to the document wide selection
+        self._links_default = self.links
+
+        # name -> child Fieldset
+        self._children = {}
+
+    @classmethod
+    def from_args(cls, args):
+        """Parses the ``fields`` and ``links`` query parameters.
+
+        Args:
+            args (werkzeug.datastructures.MultiDict): Query parameters
+
+        Returns:
+            flask_hal.fieldset.Fieldset: The fieldset, or ``None`` when no
+                selection is made
+        """
+
+        fields = links = None
+        embedded_fields = {}
+        embedded_links = {}
+
+        for key, value in args.items(multi=True):
+            if key == 'fields':
+                fields = _split(value, fields)
+            elif key == 'links':
+                links = _split(value, links)
+            elif key.endswith(']'):
+                name, _, scope = key[:-1].partition('[')
+                if name == 'fields':
+                    embedded_fields[scope] = _split(value, embedded_fields.get(scope))
+                elif name == 'links':
+                    embedded_links[scope] = _split(value, embedded_links.get(scope))
+
+        if (fields is None and links is None and not embedded_fields and
+                not embedded_links):
+            return None
+
+        return cls(fields, links, embedded_fields, embedded_links)
+
+    @property
+    def key(self):
+        """A canonical string of the selection, for example to tag the
+        representation in an ``ETag``.
+        """
+
+        parts = []
+        if self.fields is not None:
+            parts.append('fields=' + ','.join(sorted(self.fields)))
+        if self._links_default is not None:
+            parts.append('links=' + ','.join(sorted(self._links_default)))
+        for name, value in sorted(self.embedded_fields.items()):
+            parts.append('fields[{0}]={1}'.format(name, ','.join(sorted(value))))
+        for name, value in sorted(self.embedded_links.items()):
+            parts.append('links[{0}]={1}'.format(name, ','.join(sorted(value))))
+
+        return '&'.join(parts)
+
+    def embedded(self, name):
+        """Returns the fieldset of the documents embedded as ``name``.
+
+        Args:
+            name (str): The embedded name
+
+        Returns:
+            flask_hal.fieldset.Fieldset
+        """
+
+        child = self._children.get(name)
+        if child is None:
+            child = Fieldset.__new__(Fieldset)
+            child.fields = self.embedded_fields.get(name)
+            child.links = self.embedded_links.get(name, self._links_default)
+            child.embedded_fields = self.embedded_fields
+            child.embedded_links = self.embedded_links
+            child._links_default = self._links_default
+            child._children = self._children
+            self._children[name] = child
+
+        return child
+
+    def excludes_link(self, rel):
+        """Returns whether links with the relation ``rel`` are excluded from
+        every document, so they do not need to be built.
+
+        Args:
+            rel (str): The link relation
+
+        Returns:
+            bool
+        """
+
+        selections = [self._links_default] + list(self.embedded_links.values())
+
+        return all(
+            selection is not None and rel not in selection
+            for selection in selections)
+
+
+def _split(value, selected):
+    values = frozenset(v.strip() for v in value.split(',') if v.strip())
+    if selected is not None:
+        values |= selected
+    return values
+
+
+def current_fieldset():
+    """Returns the fieldset of the current request when
+    ``HAL_SPARSE_FIELDSETS`` is enabled, parsed once per request.
+
+    Returns:
+        flask_hal.fieldset.Fieldset: The fieldset or ``None``
+    """
+
+    if not has_request_context():
+        return None
+
+    if not current_app.config.get('HAL_SPARSE_FIELDSETS', False):
+        return None
+
+    req = request._get_current_object()
+    try:
+        return req._hal_fieldset
+    except AttributeError:
+        fieldset = req._hal_fieldset = Fieldset.from_args(req.args)
+        return fieldset
+
+
+def current_embeds():
+    """Returns the names of the lazy embedded resources selected by the
+    client with the ``HAL_EMBED_PARAM`` query parameter of the current
+    request, for example ``?embed=orders,customer``. Parsed once per
+    request.
+
+    Returns:
+        frozenset: The selected names
+    """
+
+    if not has_request_context():
+        return frozenset()
+
+    req = request._get_current_object()
+    try:
+        return req._hal_embeds
+    except AttributeError:
+        pass
+
+    selected = frozenset()
+    param = current_app.config.get('HAL_EMBED_PARAM', 'embed')
+    if param:
+        value = req.args.get(param)
+        if value:
+            selected = _split(value, None)
+
+    req._hal_embeds = selected
+
+    return selected
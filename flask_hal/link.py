@@ -9,10 +9,26 @@ Implements the ``HAL`` Link specification.
 """
 
 # Standard Libs
-import json
+import re
+import weakref
 
 # Third Party Libs
-from flask import current_app, request
+from flask import current_app, has_app_context, request, url_for
+
+# First Party Libs
+from flask_hal import signals
+from flask_hal.encoder import get_encoder
+
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+try:
+    from urllib.parse import quote
+except ImportError:  # pragma: no cover
+    from urllib import quote
 
 
 VALID_LINK_ATTRS = [
@@ -25,6 +41,139 @@ VALID_LINK_ATTRS = [
     'hreflang'
 ]
 
+# Fixed attribute layout shared by every Link instance
+_LINK_ATTRS = tuple(VALID_LINK_ATTRS)
+_LINK_ATTRS_SET = frozenset(VALID_LINK_ATTRS)
+
+# Text types on both Python 2 and 3
+_STRING_TYPES = (str, type(u''))
+
+# Set once an application registers a CURIE, until then link relations are
+# not looked up for compaction
+_curies_registered = False
+
+# Link relations memoized per Curies table
+_CURIE_MEMO_SIZE = 4096
+
+# CURIE definitions of the chunk encoded by a parallel serializer process,
+# which has no application context, see :func:`_with_curies`
+_detached_curies = None
+
+
+class _Frozen(object):
+    """Mixin of the classes of frozen objects, which can not be changed once
+    :func:`_freeze` has switched their class.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{0} is frozen'.format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('{0} is frozen'.format(type(self).__name__))
+
+    def __copy__(self):
+        # Immutable, so the copy is the object itself
+        return self
+
+    def __reduce_ex__(self, protocol):
+        # Frozen classes are built at runtime, the object is pickled as an
+        # instance of its unfrozen class and frozen again when unpickled
+        cls = type(self)
+        state = dict(getattr(self, '__dict__', ()))
+        for base in cls.__mro__:
+            slots = vars(base).get('__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots, )
+            for name in slots:
+                if name not in ('__dict__', '__weakref__') and hasattr(self, name):
+                    state[name] = getattr(self, name)
+
+        items = list(self) if isinstance(self, list) else None
+
+        return _unpickle_frozen, (cls.__bases__[0], cls.__bases__[1], items, state)
+
+
+class _FrozenCollection(_Frozen):
+    """Mixin of frozen :class:`.Collection` classes, rejecting the list
+    methods which change the collection.
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('{0} is frozen'.format(type(self).__name__))
+
+    append = extend = insert = remove = pop = clear = _immutable
+    sort = reverse = __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+    def __copy__(self):
+        return Collection(*self)
+
+
+# (class, mixin) -> frozen class
+_FROZEN_CLASSES = {}
+
+# Attributes of the mixins which are not copied into frozen classes
+_FROZEN_SKIP = frozenset([
+    '__module__', '__doc__', '__qualname__', '__slots__', '__dict__', '__weakref__'])
+
+
+def _freeze(obj, mixin=_Frozen):
+    """Makes ``obj`` immutable by switching it to a subclass of its class
+    with ``mixin``, so objects which are not frozen pay nothing for it.
+
+    Args:
+        obj: The object to freeze
+
+    Keyword Args:
+        mixin (class): The frozen mixin
+
+    Returns:
+        The frozen object
+    """
+
+    cls = type(obj)
+    frozen = _FROZEN_CLASSES.get((cls, mixin))
+    if frozen is None:
+        # The mixin follows the class so the instance layout is unchanged,
+        # its methods are copied in to take precedence over the class
+        namespace = {'__module__': cls.__module__, '__doc__': cls.__doc__}
+        for base in reversed(mixin.__mro__[:-1]):
+            namespace.update(
+                (k, v) for k, v in vars(base).items() if k not in _FROZEN_SKIP)
+        namespace['__slots__'] = ()
+
+        frozen = _FROZEN_CLASSES[(cls, mixin)] = type(
+            cls.__name__, (cls, mixin), namespace)
+
+    obj.__class__ = frozen
+
+    return obj
+
+
+def _unpickle_frozen(cls, mixin, items, state):
+    """Rebuilds a frozen object pickled by :meth:`_Frozen.__reduce_ex__`.
+
+    Args:
+        cls (class): The unfrozen class
+        mixin (class): The frozen mixin
+        items (list): The items of a frozen ``list``, or ``None``
+        state (dict): The attributes of the object
+
+    Returns:
+        The frozen object
+    """
+
+    obj = cls.__new__(cls)
+    if items is not None:
+        list.extend(obj, items)
+    for name, value in state.items():
+        object.__setattr__(obj, name, value)
+
+    return _freeze(obj, mixin)
+
 
 class Collection(list):
     """Build a collection of ``HAL`` link objects.
@@ -45,8 +194,22 @@ class Collection(list):
         ...         }
         ...     }
         ... }
+
+    Links are indexed by their ``rel`` so they can be looked up by relation:
+
+        >>> l['foo']
+        ... [<flask_hal.link.Link object at 0x...>]
+
+    The index is kept up to date by the list methods, a link's ``rel`` should
+    not be changed once it has been added to a collection.
     """
 
+    # rel -> [links] index, None when it must be rebuilt
+    _index = None
+
+    # Encoded _links object of a frozen collection
+    _json = None
+
     def __init__(self, *args):
         """Initialise a new ``Collection`` object.
 
@@ -64,7 +227,219 @@ class Collection(list):
                 raise TypeError(
                     '{0} is not a valid flask_hal.link.Link instance'.format(link))
 
-            self.append(link)
+        # Added in bulk, the index is built on first use
+        super(Collection, self).__init__(args)
+
+    @classmethod
+    def _trusted(cls, links):
+        """Builds a collection from a list of links without checking their
+        types, for bulk builders which only create :class:`.Link` objects.
+        The index is built on first use.
+
+        Args:
+            links (list): The links
+
+        Returns:
+            flask_hal.link.Collection: The collection
+        """
+
+        collection = list.__new__(cls)
+        list.extend(collection, links)
+
+        return collection
+
+    @classmethod
+    def from_specs(cls, specs):
+        """Builds a collection in bulk from ``(rel, href)`` or ``(rel, href,
+        attrs)`` tuples, creating the links directly rather than through
+        :class:`.Link` keyword arguments and type checked collection
+        methods. The collection can be handed to documents as is.
+
+        Specs are only checked outside of applications and in debug or
+        testing mode, see :func:`_type_checks`, otherwise unknown attributes
+        are ignored as by :class:`.Link`.
+
+        Example:
+            >>> Document(links=Collection.from_specs([
+            ...     ('next', '/orders?page=3'),
+            ...     ('find', '/orders{?id}', {'templated': True}),
+            ... ]))
+
+        Args:
+            specs (iterable): ``(rel, href)`` tuples, optionally with a
+                ``dict`` of link attributes
+
+        Raises:
+            TypeError: If a checked spec is not valid
+
+        Returns:
+            flask_hal.link.Collection: The collection
+        """
+
+        if _type_checks():
+            specs = [_checked_spec(spec) for spec in specs]
+
+        new = object.__new__
+        known = _LINK_ATTRS_SET
+        links = []
+        append = links.append
+
+        for spec in specs:
+            link = new(Link)
+            if len(spec) == 2:
+                link.rel, link.href = spec
+                link._attrs = ()
+            else:
+                link.rel, link.href, attrs = spec
+                if not attrs:
+                    link._attrs = ()
+                elif len(attrs) == 1:
+                    # A single attribute needs no ordering
+                    pairs = tuple(attrs.items())
+                    link._attrs = pairs if pairs[0][0] in known else ()
+                else:
+                    link._attrs = tuple(
+                        (attr, attrs[attr]) for attr in _LINK_ATTRS if attr in attrs)
+            link._json = None
+            append(link)
+
+        return cls._trusted(links)
+
+    def __getstate__(self):
+        # Copies and pickles rebuild the index rather than sharing it
+        state = self.__dict__.copy()
+        state['_index'] = None
+        return state
+
+    def __getitem__(self, key):
+        """Returns the links for a ``rel`` when ``key`` is a string, otherwise
+        behaves as :meth:`list.__getitem__`.
+
+        Raises:
+            KeyError: If no link has the ``rel``
+        """
+
+        if isinstance(key, _STRING_TYPES):
+            return list(self._rels()[key])
+
+        return super(Collection, self).__getitem__(key)
+
+    def __contains__(self, item):
+        if isinstance(item, _STRING_TYPES):
+            return item in self._rels()
+
+        return super(Collection, self).__contains__(item)
+
+    def get(self, rel, default=None):
+        """Returns the links for a ``rel``.
+
+        Args:
+            rel (str): The link relation
+
+        Keyword Args:
+            default: Returned when no link has the ``rel``
+
+        Returns:
+            list: The links with the ``rel``
+        """
+
+        try:
+            return self[rel]
+        except KeyError:
+            return default
+
+    def rels(self):
+        """Returns the link relations in the order they first appear.
+
+        Returns:
+            list: The link relations
+        """
+
+        return list(self._rels())
+
+    def _rels(self):
+        """Returns the rel -> links index, rebuilding it when stale.
+
+        Returns:
+            dict
+        """
+
+        index = self._index
+        if index is None:
+            index = self._index = {}
+            for link in self:
+                group = index.get(link.rel)
+                if group is None:
+                    index[link.rel] = [link]
+                else:
+                    group.append(link)
+
+        return index
+
+    @staticmethod
+    def _add(index, link):
+        group = index.get(link.rel)
+        if group is None:
+            index[link.rel] = [link]
+        else:
+            group.append(link)
+
+    def _invalidate(self):
+        self._index = None
+
+    def append(self, link):
+        super(Collection, self).append(link)
+        if self._index is not None:
+            self._add(self._index, link)
+
+    def extend(self, links):
+        start = len(self)
+        super(Collection, self).extend(links)
+        index = self._index
+        if index is not None:
+            for i in range(start, len(self)):
+                self._add(index, list.__getitem__(self, i))
+
+    def __iadd__(self, links):
+        self.extend(links)
+        return self
+
+    def insert(self, i, link):
+        super(Collection, self).insert(i, link)
+        self._invalidate()
+
+    def remove(self, link):
+        super(Collection, self).remove(link)
+        self._invalidate()
+
+    def pop(self, i=-1):
+        link = super(Collection, self).pop(i)
+        self._invalidate()
+        return link
+
+    def __setitem__(self, i, link):
+        super(Collection, self).__setitem__(i, link)
+        self._invalidate()
+
+    def __delitem__(self, i):
+        super(Collection, self).__delitem__(i)
+        self._invalidate()
+
+    def __imul__(self, n):
+        super(Collection, self).__imul__(n)
+        self._invalidate()
+        return self
+
+    def sort(self, *args, **kwargs):
+        super(Collection, self).sort(*args, **kwargs)
+        self._invalidate()
+
+    def reverse(self):
+        super(Collection, self).reverse()
+        self._invalidate()
+
+    def clear(self):
+        del self[:]
 
     def to_dict(self):
         """Returns the Python ``dict`` representation of the ``Collection``
@@ -83,19 +458,60 @@ class Collection(list):
             dict
         """
 
+        return {
+            '_links': self._links()
+        }
+
+    def _links(self, rels=None):
+        """Returns the ``_links`` object of the collection, links sharing a
+        relation are put into an array.
+
+        Keyword Args:
+            rels (frozenset): Only include the links with these relations,
+                in full or compact form
+
+        Returns:
+            dict
+        """
+
         links = {}
 
-        for link in self:
-            if link.rel in links.keys():
-                if isinstance(links[link.rel], dict):
-                    links[link.rel] = [links[link.rel]]
-                links[link.rel].append(link.to_dict()[link.rel])
+        for name, group in self._groups(rels).items():
+            if len(group) == 1 and name != 'curies':
+                links[name] = group[0]._body()
             else:
-                links.update(link.to_dict())
+                links[name] = [link._body() for link in group]
 
-        return {
-            '_links': links
-        }
+        return links
+
+    def _groups(self, rels=None):
+        """Returns the links by serialized relation: the index when no
+        CURIEs apply, otherwise the links grouped by compact relation, so
+        links with the full and the compact form of a relation share an
+        array.
+
+        Keyword Args:
+            rels (frozenset): Only include the links with these relations,
+                in full or compact form
+
+        Returns:
+            dict: relation -> links
+        """
+
+        index = self._rels()
+        curies = _curies()
+        if curies is None and rels is None:
+            return index
+
+        groups = {}
+        for rel, group in index.items():
+            name = rel if curies is None else curies.compact(rel)
+            if rels is not None and not _selected(rel, name, rels):
+                continue
+            merged = groups.get(name)
+            groups[name] = group if merged is None else merged + group
+
+        return groups
 
     def to_json(self):
         """Returns the ``JSON`` representation of the instance.
@@ -117,7 +533,158 @@ class Collection(list):
             str: The ``JSON`` representation of the instance
         """
 
-        return json.dumps(self.to_dict())
+        encoder = get_encoder()
+
+        if self._json is not None:
+            return '{"_links"' + encoder.key_separator + self._json + '}'
+
+        return encoder.dumps(self.to_dict())
+
+    def freeze(self, encoder=None):
+        """Makes the collection and its links immutable and caches the
+        encoded ``_links`` object, which documents splice in directly when
+        they are serialized. Frozen collections can be shared between
+        threads and requests.
+
+        Keyword Args:
+            encoder (flask_hal.encoder.Encoder): Optional encoder, defaults to
+                the encoder of the current application
+
+        Returns:
+            flask_hal.link.Collection: The frozen collection
+        """
+
+        if isinstance(self, _Frozen):
+            return self
+
+        encoder = encoder or get_encoder()
+        for link in self:
+            link.freeze(encoder)
+
+        self._rels()
+        self._json = self._links_json(encoder)
+
+        return _freeze(self, _FrozenCollection)
+
+    def _links_json(self, encoder, rels=None):
+        """Returns the encoded ``_links`` object, built from the cached
+        fragments of the links when they are all frozen.
+
+        Args:
+            encoder (flask_hal.encoder.Encoder): The encoder
+
+        Keyword Args:
+            rels (frozenset): Only encode the links with these relations
+
+        Returns:
+            str: The encoded ``_links`` object
+        """
+
+        if rels is not None:
+            return encoder.dumps(self._links(rels))
+
+        if self._json is not None:
+            return self._json
+
+        dumps = encoder.dumps
+        for link in self:
+            if link._json is None:
+                return dumps(self._links())
+
+        item_separator = encoder.item_separator
+        key_separator = encoder.key_separator
+        members = []
+
+        for rel, group in self._groups().items():
+            if len(group) == 1 and rel != 'curies':
+                value = group[0]._json
+            else:
+                value = '[' + item_separator.join(l._json for l in group) + ']'
+            members.append(dumps(rel) + key_separator + value)
+
+        return '{' + item_separator.join(members) + '}'
+
+
+def _type_checks():
+    """Returns whether :meth:`Collection.from_specs` specs are checked:
+    outside of an application and in debug or testing mode. Production
+    applications trust them so collections with many links are built
+    without a check per spec.
+
+    Returns:
+        bool
+    """
+
+    if not has_app_context():
+        return True
+
+    app = current_app._get_current_object()
+
+    return app.debug or app.testing
+
+
+def _checked_spec(spec):
+    """Checks a :meth:`Collection.from_specs` spec.
+
+    Raises:
+        TypeError: If the spec is not a tuple of a ``rel`` and ``href``
+            string and an optional ``dict`` of known link attributes
+    """
+
+    if not isinstance(spec, (tuple, list)) or len(spec) not in (2, 3):
+        raise TypeError('{0!r} is not a (rel, href[, attrs]) link spec'.format(spec))
+
+    if not isinstance(spec[0], _STRING_TYPES) or not isinstance(spec[1], _STRING_TYPES):
+        raise TypeError('rel and href of link spec {0!r} must be strings'.format(spec))
+
+    if len(spec) == 3 and spec[2] is not None:
+        if not isinstance(spec[2], Mapping):
+            raise TypeError('attrs of link spec {0!r} must be a dict'.format(spec))
+        unknown = set(spec[2]) - _LINK_ATTRS_SET
+        if unknown:
+            raise TypeError('Unknown link attributes {0}'.format(', '.join(sorted(unknown))))
+
+    return spec
+
+
+def _selected(rel, name, rels):
+    """Returns whether a relation is selected by a sparse fieldset, by its
+    full or compact ``name``. CURIE definitions are always kept.
+    """
+
+    return rel in rels or name in rels or rel == 'curies'
+
+
+class _LinkAttribute(object):
+    """Descriptor for an optional :class:`.Link` attribute, stored in the
+    ``_attrs`` pairs of the link only when it is set.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, link, owner):
+        if link is None:
+            return self
+
+        for attr, value in link._attrs:
+            if attr == self.name:
+                return value
+
+        raise AttributeError(self.name)
+
+    def __set__(self, link, value):
+        attrs = dict(link._attrs)
+        attrs[self.name] = value
+        link._attrs = tuple(
+            (attr, attrs[attr]) for attr in _LINK_ATTRS if attr in attrs)
+
+    def __delete__(self, link):
+        if self.name not in dict(link._attrs):
+            raise AttributeError(self.name)
+
+        link._attrs = tuple(
+            (attr, value) for attr, value in link._attrs if attr != self.name)
 
 
 class Link(object):
@@ -132,8 +699,13 @@ class Link(object):
         >>> print l.to_json()
         ... '{"foo": {"href": "http://foo.com/bar", "name": "Foo"}}'
 
+    Links only store the attributes which are set, as ``(name, value)``
+    pairs in ``VALID_LINK_ATTRS`` order, unset attributes are not available
+    on the instance.
     """
 
+    __slots__ = ('rel', 'href', '_attrs', '_json')
+
     def __init__(self, rel, href, **kwargs):
         """Initialise a new ``Link`` object.
 
@@ -154,9 +726,14 @@ class Link(object):
         self.rel = rel
         self.href = href
 
-        for attr in VALID_LINK_ATTRS:
-            if attr in kwargs:
-                setattr(self, attr, kwargs.pop(attr))
+        if kwargs:
+            self._attrs = tuple(
+                (attr, kwargs[attr]) for attr in _LINK_ATTRS if attr in kwargs)
+        else:
+            self._attrs = ()
+
+        # Encoded link object of a frozen link
+        self._json = None
 
     def to_dict(self):
         """Returns the Python ``dict`` representation of the ``Link`` instance.
@@ -171,19 +748,28 @@ class Link(object):
             dict
         """
 
+        return {
+            self.rel: self._body()
+        }
+
+    def _body(self):
+        """Returns the link object without its ``rel``, only including the
+        attributes which are set.
+
+        Returns:
+            dict
+        """
+
         # Minimum viable link
         link = {
             'href': self.href
         }
 
         # Add extra attributes if they exist
-        for attr in VALID_LINK_ATTRS:
-            if hasattr(self, attr):
-                link[attr] = getattr(self, attr)
+        if self._attrs:
+            link.update(self._attrs)
 
-        return {
-            self.rel: link
-        }
+        return link
 
     def to_json(self):
         """Returns the ``JSON`` encoded representation of the ``Link`` object.
@@ -197,14 +783,241 @@ class Link(object):
         Returns:
             str: The ``JSON`` encoded object
         """
-        return json.dumps(self.to_dict())
+        encoder = get_encoder()
+
+        if self._json is not None:
+            return ('{' + encoder.dumps(self.rel) + encoder.key_separator +
+                    self._json + '}')
+
+        return encoder.dumps(self.to_dict())
+
+    def freeze(self, encoder=None):
+        """Makes the link immutable and caches its encoded link object. Frozen
+        links can be shared between threads and requests.
+
+        Keyword Args:
+            encoder (flask_hal.encoder.Encoder): Optional encoder, defaults to
+                the encoder of the current application
+
+        Returns:
+            flask_hal.link.Link: The frozen link
+        """
+
+        if isinstance(self, _Frozen):
+            return self
+
+        self._json = (encoder or get_encoder()).dumps(self._body())
+
+        return _freeze(self)
+
+    @property
+    def template(self):
+        """The compiled :class:`.URITemplate` of the ``href``, parsed once
+        per process for every link sharing the ``href``.
+        """
+
+        return compile_template(self.href)
+
+    def expand(self, variables=None, **kwargs):
+        """Returns a link to the expanded ``href`` of a templated link, with
+        the same relation and attributes but ``templated``.
+
+        Example:
+            >>> l = Link('orders', '/orders{?page}', templated=True)
+            >>> l.expand(page=2).to_json()
+            ... '{"orders": {"href": "/orders?page=2"}}'
+
+        Keyword Args:
+            variables (dict): The template variables
+            **kwargs: Further template variables
+
+        Raises:
+            ValueError: If the ``href`` is not a valid URI template
+
+        Returns:
+            flask_hal.link.Link: The expanded link
+        """
+
+        return self._expanded([self.template.expand(variables, **kwargs)])[0]
+
+    def expand_many(self, rows):
+        """Returns a link per set of variables, expanding the ``href``
+        template parsed once, for example to build the links of embedded
+        items from one templated link.
+
+        Args:
+            rows (iterable): ``dict`` of template variables per link
+
+        Raises:
+            ValueError: If the ``href`` is not a valid URI template
+
+        Returns:
+            list: The expanded links
+        """
+
+        return self._expanded(self.template.expand_many(rows))
+
+    def _expanded(self, hrefs):
+        rel = self.rel
+        attrs = dict(attr for attr in self._attrs if attr[0] != 'templated')
+
+        return [Link(rel, href, **attrs) for href in hrefs]
+
+
+for _attr in _LINK_ATTRS:
+    setattr(Link, _attr, _LinkAttribute(_attr))
+del _attr
+
+
+class Curies(object):
+    """The CURIE definitions of an application, registered with
+    :meth:`flask_hal.HAL.curie`. Link relations starting with the URI of a
+    definition are compacted to ``prefix:name`` form when collections are
+    serialized, and the definitions are emitted in the ``curies`` links of
+    top level documents.
+
+    The definitions are indexed by the fixed part of their ``href`` when
+    they are added, and each relation is looked up once and memoized, so
+    serializing a link costs one ``dict`` lookup for its relation.
+
+    Example:
+        >>> hal.curie('acme', 'https://docs.acme.com/rels/{rel}')
+        >>> Document(links=[Link('https://docs.acme.com/rels/orders', '/orders')])
+        ... {"_links": {"acme:orders": {"href": "/orders"}, "curies": [{
+        ...     "href": "https://docs.acme.com/rels/{rel}",
+        ...     "name": "acme", "templated": true}], ...}}
+    """
+
+    def __init__(self):
+        #: The ``curies`` links of the definitions
+        self.links = []
+
+        # (prefix, suffix, name) of the definitions, longest prefix first
+        self._table = []
+
+        # rel -> compact rel
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.links)
+
+    def add(self, name, href):
+        """Registers a CURIE definition.
+
+        Args:
+            name (str): The prefix of compact relations
+            href (str): The URI template of the relation documentation,
+                with a ``{rel}`` placeholder
+
+        Raises:
+            ValueError: If ``href`` has no ``{rel}`` placeholder
+        """
+
+        global _curies_registered
+
+        prefix, placeholder, suffix = href.partition('{rel}')
+        if not placeholder:
+            raise ValueError('CURIE href {0} has no {{rel}} placeholder'.format(href))
+
+        self.links.append(Link('curies', href, name=name, templated=True))
+        self._table.append((prefix, suffix, name))
+        self._table.sort(key=lambda definition: -len(definition[0]))
+        self._memo = {}
+
+        _curies_registered = True
+
+    def compact(self, rel):
+        """Returns the compact form of a link relation.
+
+        Args:
+            rel (str): The link relation
+
+        Returns:
+            str: The ``prefix:name`` relation, or ``rel`` when no definition
+                matches
+        """
+
+        try:
+            return self._memo[rel]
+        except KeyError:
+            pass
+
+        compact = rel
+        for prefix, suffix, name in self._table:
+            if (rel.startswith(prefix) and rel.endswith(suffix) and
+                    len(rel) > len(prefix) + len(suffix)):
+                compact = name + ':' + rel[len(prefix):len(rel) - len(suffix)]
+                break
+
+        if len(self._memo) < _CURIE_MEMO_SIZE:
+            self._memo[rel] = compact
+
+        return compact
+
+    def __getstate__(self):
+        # The memo is rebuilt by the receiving process
+        return {'links': self.links, '_table': self._table}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._memo = {}
+
+
+def _curies():
+    """Returns the CURIE definitions of the current application.
+
+    Returns:
+        flask_hal.link.Curies: The definitions, or ``None`` when there are
+            none
+    """
+
+    if not _curies_registered:
+        return None
+
+    if not has_app_context():
+        return _detached_curies
+
+    state = current_app.extensions.get('hal')
+    if state is None or not state.curies:
+        return None
+
+    return state.curies
+
+
+def _with_curies(curies, func, *args):
+    """Calls ``func`` with ``curies`` as the CURIE definitions used outside
+    of an application context, for the parallel serializer processes which
+    are given the definitions of the application with each chunk.
+
+    Args:
+        curies (flask_hal.link.Curies): The definitions, or ``None``
+        func (callable): The function called with ``args``
+
+    Returns:
+        The result of ``func``
+    """
+
+    global _curies_registered, _detached_curies
+
+    if curies is not None:
+        _curies_registered = True
+    _detached_curies = curies
+    try:
+        return func(*args)
+    finally:
+        _detached_curies = None
 
 
 class Self(Link):
     """A class to create the required ``self`` link  from the current
     request URL.
+
+    The URL is computed once per request and cached on the request object,
+    so every ``Self`` link built during a request shares it.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         """Initialises a new ``Self`` link instance. Accepts the same
         Keyword Arguments as :class:`.Link`.
@@ -216,9 +1029,541 @@ class Self(Link):
             :class:`.Link`
         """
 
-        url = request.url
-        external = kwargs.get('external', False)
-        if not external and current_app.config['SERVER_NAME'] is None:
-            url = request.url.replace(request.host_url, '/')
+        if signals.instrumented:
+            start = signals._clock()
+            url = _self_url(kwargs.get('external', False))
+            signals.record('links', signals._clock() - start)
+        else:
+            url = _self_url(kwargs.get('external', False))
 
         return super(Self, self).__init__('self', url, **kwargs)
+
+
+def _self_url(external=False):
+    """Returns the URL of the current request for a ``self`` link. Both the
+    relative and the external forms are computed on first use and cached on
+    the request, a new request starts with an empty cache.
+
+    Keyword Args:
+        external (bool): Return the fully-qualified URL, defaults to False
+
+    Returns:
+        str: The ``self`` URL
+    """
+
+    req = request._get_current_object()
+
+    try:
+        relative, url = req._hal_self_urls
+    except AttributeError:
+        url = req.url
+        relative = url
+        if current_app.config['SERVER_NAME'] is None:
+            relative = url.replace(req.host_url, '/')
+        req._hal_self_urls = (relative, url)
+
+    return url if external else relative
+
+
+class LinkTemplate(object):
+    """Builds ``HAL`` links to an endpoint for many sets of values. The
+    Werkzeug rules of the endpoint are looked up once per application and
+    built directly with their converters, rather than running a full
+    :func:`flask.url_for` lookup per link.
+
+    Example:
+        >>> from flask_hal.link import Collection, LinkTemplate
+        >>> orders = LinkTemplate('item', 'orders.detail')
+        >>> Collection(*orders.links([{'id': 1}, {'id': 2}]))
+        >>> orders.hrefs([{'id': 1}, {'id': 2}])
+        ... ['/orders/1', '/orders/2']
+
+    URL default functions registered on the application are applied as
+    :func:`flask.url_for` would. Rules bound to a subdomain or host fall back
+    to :func:`flask.url_for`. Building links requires a request context.
+    """
+
+    def __init__(self, rel, endpoint, external=False, **kwargs):
+        """Initialise a new ``LinkTemplate``.
+
+        Args:
+            rel (str): The ``rel`` of the built links
+            endpoint (str): The endpoint the links point to, relative
+                endpoints (``.detail``) are resolved against the blueprint of
+                the current request
+
+        Keyword Args:
+            external (bool): Build fully-qualified URLs, defaults to False
+            **kwargs: :class:`.Link` attributes added to every built link
+        """
+
+        self.rel = rel
+        self.endpoint = endpoint
+        self.external = external
+        self.attrs = dict(
+            (k, v) for k, v in kwargs.items() if k in _LINK_ATTRS_SET)
+
+        # url_map -> {endpoint: rules}
+        self._rules = weakref.WeakKeyDictionary()
+
+    def _compiled(self, endpoint):
+        """Returns the rules of ``endpoint`` for the current application,
+        looking them up once per URL map.
+
+        Returns:
+            tuple: The Werkzeug rules, empty when URLs must be built through
+                :func:`flask.url_for`, and the names of their arguments
+        """
+
+        url_map = current_app.url_map
+        endpoints = self._rules.get(url_map)
+        if endpoints is None:
+            endpoints = self._rules[url_map] = {}
+
+        compiled = endpoints.get(endpoint)
+        if compiled is None:
+            try:
+                rules = tuple(url_map.iter_rules(endpoint))
+            except KeyError:
+                rules = ()
+
+            arguments = frozenset().union(*(rule.arguments for rule in rules))
+            if url_map.host_matching or any(
+                    rule.subdomain or rule.websocket for rule in rules):
+                rules = ()
+
+            compiled = endpoints[endpoint] = (rules, arguments)
+
+        return compiled
+
+    def hrefs(self, values, ignore_unknown=False):
+        """Builds the URLs to the endpoint for each set of values.
+
+        Example:
+            >>> orders.hrefs([{'id': 1}, {'id': 2}])
+            ... ['/orders/1', '/orders/2']
+
+        Args:
+            values (iterable): ``dict`` of URL values per URL
+
+        Keyword Args:
+            ignore_unknown (bool): Drop values which are not rule arguments
+                instead of appending them as query arguments, useful when
+                building from database rows. Defaults to False
+
+        Raises:
+            werkzeug.routing.BuildError: If a URL cannot be built
+
+        Returns:
+            list: The URLs
+        """
+
+        if signals.instrumented:
+            start = signals._clock()
+            hrefs = self._hrefs(values, ignore_unknown)
+            signals.record('links', signals._clock() - start)
+            return hrefs
+
+        return self._hrefs(values, ignore_unknown)
+
+    def _hrefs(self, values, ignore_unknown):
+        endpoint = self.endpoint
+        if endpoint[:1] == '.':
+            blueprint = request.blueprint
+            if blueprint is not None:
+                endpoint = blueprint + endpoint
+            else:
+                endpoint = endpoint[1:]
+
+        rules, arguments = self._compiled(endpoint)
+        if self.external:
+            root = request.url_root.rstrip('/') + '/'
+        else:
+            root = request.script_root.rstrip('/') + '/'
+
+        append_unknown = not ignore_unknown
+        inject_defaults = bool(current_app.url_default_functions)
+        hrefs = []
+
+        for item in values:
+            if ignore_unknown:
+                # Only copy the rule arguments of wide rows
+                item = dict(
+                    (k, item[k]) for k in arguments
+                    if item.get(k) is not None)
+            else:
+                item = dict((k, v) for k, v in item.items() if v is not None)
+            if inject_defaults:
+                current_app.inject_url_defaults(endpoint, item)
+
+            for rule in rules:
+                if rule.suitable_for(item):
+                    built = rule.build(item, append_unknown)
+                    if built is not None:
+                        hrefs.append(root + built[1].lstrip('/'))
+                        break
+            else:
+                if ignore_unknown:
+                    item = dict(
+                        (k, v) for k, v in item.items() if k in arguments)
+                hrefs.append(
+                    url_for(endpoint, _external=self.external, **item))
+
+        return hrefs
+
+    def href(self, **values):
+        """Builds the URL to the endpoint for one set of values.
+
+        Returns:
+            str: The URL
+        """
+
+        return self.hrefs([values])[0]
+
+    def links(self, values, ignore_unknown=False):
+        """Builds a :class:`.Link` to the endpoint for each set of values.
+
+        Example:
+            >>> Collection(*orders.links([{'id': 1}, {'id': 2}]))
+            >>> [
+            ...     Embedded(data=row, links=[link])
+            ...     for row, link in zip(rows, orders.links(rows, True))
+            ... ]
+
+        Args:
+            values (iterable): ``dict`` of URL values per link
+
+        Keyword Args:
+            ignore_unknown (bool): See :meth:`hrefs`
+
+        Returns:
+            list: The links
+        """
+
+        rel = self.rel
+        attrs = self.attrs
+
+        return [
+            Link(rel, href, **attrs)
+            for href in self.hrefs(values, ignore_unknown)
+        ]
+
+    def link(self, **values):
+        """Builds a :class:`.Link` to the endpoint for one set of values.
+
+        Returns:
+            flask_hal.link.Link: The link
+        """
+
+        return self.links([values])[0]
+
+
+# RFC 6570 operator -> (first, separator, named, if empty, allow reserved)
+_TEMPLATE_OPERATORS = {
+    '': ('', ',', False, '', False),
+    '+': ('', ',', False, '', True),
+    '#': ('#', ',', False, '', True),
+    '.': ('.', '.', False, '', False),
+    '/': ('/', '/', False, '', False),
+    ';': (';', ';', True, '', False),
+    '?': ('?', '&', True, '=', False),
+    '&': ('&', '&', True, '=', False),
+}
+
+# Operators reserved for future extensions of RFC 6570
+_TEMPLATE_RESERVED_OPERATORS = frozenset('=,!@|')
+
+# Characters kept as is by reserved expansion, unreserved characters are
+# always kept
+_RESERVED = ":/?#[]@!$&'()*+,;="
+_UNRESERVED = '-._~'
+
+_EXPRESSION = re.compile(r'\{([^{}]*)\}')
+_VARNAME = re.compile(
+    r'^(?:[A-Za-z0-9_]|%[0-9A-Fa-f]{2})+(?:\.(?:[A-Za-z0-9_]|%[0-9A-Fa-f]{2})+)*$')
+_PCT_ENCODED = re.compile(r'%[0-9A-Fa-f]{2}')
+
+# template -> URITemplate
+_URI_TEMPLATES = {}
+_URI_TEMPLATE_CACHE_SIZE = 1024
+
+
+class URITemplate(object):
+    """An `RFC 6570 <https://tools.ietf.org/html/rfc6570>`_ URI template,
+    up to level 4, parsed once into an expansion function per expression.
+    Use :func:`compile_template` to share compiled templates.
+
+    Example:
+        >>> orders = compile_template('/orders{/id}{?fields*}')
+        >>> orders.expand(id=1, fields={'embed': 'customer'})
+        ... '/orders/1?embed=customer'
+        >>> orders.expand_many([{'id': 1}, {'id': 2}])
+        ... ['/orders/1', '/orders/2']
+
+    Variables which are ``None``, empty lists and empty ``dict`` objects
+    are undefined and left out. Other scalar values are converted with
+    ``str``.
+    """
+
+    def __init__(self, template):
+        """Parses a URI template.
+
+        Args:
+            template (str): The URI template
+
+        Raises:
+            ValueError: If ``template`` is not a valid URI template
+        """
+
+        self.template = template
+
+        #: The variable names in template order
+        self.variables = []
+
+        expanders = []
+        pattern = []
+        position = 0
+
+        for match in _EXPRESSION.finditer(template):
+            pattern.append(_literal(template[position:match.start()]))
+            pattern.append('{' + str(len(expanders)) + '}')
+            expanders.append(self._compile(match.group(1)))
+            position = match.end()
+
+        pattern.append(_literal(template[position:]))
+
+        self._format = ''.join(pattern).format
+        self._expanders = tuple(expanders)
+
+    def __repr__(self):
+        return 'URITemplate({0!r})'.format(self.template)
+
+    def _compile(self, expression):
+        """Returns the expansion function of an expression.
+
+        Args:
+            expression (str): The expression without braces
+
+        Raises:
+            ValueError: If the expression is invalid
+
+        Returns:
+            callable: Called with the variables, returns the expansion
+        """
+
+        operator = expression[:1]
+        if operator in _TEMPLATE_RESERVED_OPERATORS:
+            raise ValueError('Unsupported URI template operator {0!r} in {1}'.format(
+                operator, self.template))
+        if operator not in _TEMPLATE_OPERATORS:
+            operator = ''
+
+        varspecs = []
+        for varspec in expression[len(operator):].split(','):
+            explode = varspec.endswith('*')
+            if explode:
+                varspec = varspec[:-1]
+            name, _, prefix = varspec.partition(':')
+            if not _VARNAME.match(name) or (
+                    prefix and not (prefix.isdigit() and 0 < int(prefix) < 10000)):
+                raise ValueError('Invalid URI template expression {{{0}}} in {1}'.format(
+                    expression, self.template))
+            varspecs.append((name, explode, int(prefix) if prefix else None))
+            self.variables.append(name)
+
+        first, separator, named, if_empty, reserved = _TEMPLATE_OPERATORS[operator]
+        quote_value = _quote_reserved if reserved else _quote_unreserved
+
+        def expand(variables):
+            parts = []
+
+            for name, explode, prefix in varspecs:
+                value = variables.get(name)
+                if value is None:
+                    continue
+
+                if isinstance(value, Mapping):
+                    items = [(quote_value(_text(k)), quote_value(_text(v)))
+                             for k, v in value.items()]
+                    if not items:
+                        continue
+                    if explode:
+                        parts.extend(
+                            k + '=' + v if v or not named else k + if_empty
+                            for k, v in items)
+                        continue
+                    value = ','.join(k + ',' + v for k, v in items)
+                elif isinstance(value, (list, tuple)):
+                    if not value:
+                        continue
+                    items = [quote_value(_text(v)) for v in value]
+                    if explode:
+                        if named:
+                            parts.extend(
+                                name + '=' + v if v else name + if_empty for v in items)
+                        else:
+                            parts.extend(items)
+                        continue
+                    value = ','.join(items)
+                else:
+                    value = _text(value)
+                    if prefix is not None:
+                        value = value[:prefix]
+                    value = quote_value(value)
+
+                if named:
+                    parts.append(name + '=' + value if value else name + if_empty)
+                else:
+                    parts.append(value)
+
+            if not parts:
+                return ''
+
+            return first + separator.join(parts)
+
+        # A lone simple variable holding a string or number, the most common
+        # expression, skips the generic expansion
+        if len(varspecs) == 1 and not operator and varspecs[0][1:] == (False, None):
+            name = varspecs[0][0]
+
+            def expand_simple(variables):
+                value = variables.get(name)
+                if value.__class__ is int:
+                    return str(value)
+                if value.__class__ is str:
+                    return _quote_unreserved(value)
+                return expand(variables)
+
+            return expand_simple
+
+        return expand
+
+    def expand(self, variables=None, **kwargs):
+        """Expands the template.
+
+        Keyword Args:
+            variables (dict): The variables
+            **kwargs: Further variables
+
+        Returns:
+            str: The URI reference
+        """
+
+        if kwargs:
+            variables = dict(variables or (), **kwargs)
+        elif variables is None:
+            variables = {}
+
+        return self._format(*[expand(variables) for expand in self._expanders])
+
+    def expand_many(self, rows):
+        """Expands the template once per set of variables.
+
+        Args:
+            rows (iterable): ``dict`` of variables per URI reference
+
+        Returns:
+            list: The URI references
+        """
+
+        fmt = self._format
+        expanders = self._expanders
+
+        if len(expanders) == 1:
+            expand = expanders[0]
+            return [fmt(expand(row)) for row in rows]
+
+        return [fmt(*[expand(row) for expand in expanders]) for row in rows]
+
+    def link(self, rel, **kwargs):
+        """Returns a templated :class:`.Link` to the template, which expands
+        it without parsing it again.
+
+        Args:
+            rel (str): The link relation
+
+        Keyword Args:
+            **kwargs: Further :class:`.Link` attributes
+
+        Returns:
+            flask_hal.link.Link: The link
+        """
+
+        kwargs['templated'] = True
+
+        return Link(rel, self.template, **kwargs)
+
+
+def compile_template(template):
+    """Returns the compiled :class:`.URITemplate` of ``template``, parsed
+    once and cached for the process.
+
+    Args:
+        template (str): The URI template
+
+    Raises:
+        ValueError: If ``template`` is not a valid URI template
+
+    Returns:
+        flask_hal.link.URITemplate: The compiled template
+    """
+
+    try:
+        return _URI_TEMPLATES[template]
+    except KeyError:
+        pass
+
+    compiled = URITemplate(template)
+    if len(_URI_TEMPLATES) >= _URI_TEMPLATE_CACHE_SIZE:
+        _URI_TEMPLATES.clear()
+    _URI_TEMPLATES[template] = compiled
+
+    return compiled
+
+
+def _literal(text):
+    """Returns the literal text of a template as a format pattern, with
+    characters not allowed in URIs percent encoded.
+
+    Raises:
+        ValueError: If the text has an unmatched brace
+    """
+
+    if '{' in text or '}' in text:
+        raise ValueError('Unmatched brace in URI template literal {0!r}'.format(text))
+
+    return _quote_reserved(text)
+
+
+def _text(value):
+    if isinstance(value, _STRING_TYPES):
+        return value
+
+    return str(value)
+
+
+def _quote(text, safe):
+    if not isinstance(text, str):  # pragma: no cover
+        text = text.encode('utf-8')
+
+    return quote(text, safe)
+
+
+def _quote_unreserved(text):
+    return _quote(text, _UNRESERVED)
+
+
+def _quote_reserved(text):
+    # Percent encoded triplets are kept as they are
+    if '%' not in text:
+        return _quote(text, _RESERVED + _UNRESERVED)
+
+    chunks = []
+    position = 0
+    for match in _PCT_ENCODED.finditer(text):
+        chunks.append(_quote(text[position:match.start()], _RESERVED + _UNRESERVED))
+        chunks.append(match.group())
+        position = match.end()
+    chunks.append(_quote(text[position:], _RESERVED + _UNRESERVED))
+
+    return ''.join(chunks)
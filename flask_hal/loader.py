@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+flask_hal.loader
+================
+
+Batch loading of embedded resources. Documents embed placeholders which
+declare the key of a resource, and the keys of each loader found across
+the whole document are loaded in one bulk call before the document is
+serialized, rather than with one query per embedded item.
+
+Example:
+    >>> def load_customers(ids):
+    ...     return dict(
+    ...         (c.id, Embedded(data=c.to_dict()))
+    ...         for c in Customer.query.filter(Customer.id.in_(ids)))
+    >>> customers = BatchLoader(load_customers, name='customers')
+
+    >>> @app.route('/orders')
+    >>> def orders():
+    ...     return Document(embedded={'orders': Embedded(data=[
+    ...         Embedded(
+    ...             data=order.to_dict(),
+    ...             embedded={'customer': customers.defer(order.customer_id)})
+    ...         for order in Order.query.all()
+    ...     ])})
+
+Loaded values are memoized per request, so a key is loaded at most once
+per request however often it is embedded.
+"""
+
+# Standard Libs
+import threading
+from collections import deque
+
+# Third Party Libs
+from flask import has_request_context, request
+
+# First Party Libs
+from flask_hal.document import BaseDocument, _is_selected, _loaded
+from flask_hal.fieldset import current_embeds
+
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+
+class BatchLoader(object):
+    """Loads resources by key in batches, memoizing the loaded values for
+    the current request.
+    """
+
+    def __init__(self, batch, name=None):
+        """Initialise a new ``BatchLoader``.
+
+        Args:
+            batch (callable): Called with a list of unique keys, returns a
+                ``dict`` of key -> value or a list of values in key order.
+                Missing keys load as ``None``
+
+        Keyword Args:
+            name (str): Optional name of the loader, for example for stats
+        """
+
+        self.batch = batch
+        self.name = name
+
+        self.batches = 0
+        self.keys = 0
+        self.hits = 0
+        self.max_batch_size = 0
+        self._lock = threading.Lock()
+
+    def defer(self, key, link=None, default=True):
+        """Returns a placeholder for the resource with ``key``, to be used
+        as an ``embedded`` value or as an item of an embedded list.
+
+        Keyword Args:
+            link: A :class:`flask_hal.link.Link` or ``href`` emitted instead
+                of the resource when it is not selected, see
+                :class:`flask_hal.document.Lazy`
+            default (bool): Load the resource when the client selects no
+                embedded resources, defaults to True
+
+        Returns:
+            flask_hal.loader.Deferred: The placeholder
+        """
+
+        if has_request_context():
+            request._get_current_object()._hal_deferred = True
+
+        return Deferred(self, key, link, default)
+
+    def load(self, key):
+        """Loads one resource.
+
+        Args:
+            key: The resource key
+
+        Returns:
+            The loaded value
+        """
+
+        return self.load_many([key])[0]
+
+    def load_many(self, keys):
+        """Loads the resources of ``keys`` in one batch call, keys loaded
+        earlier in the request are not loaded again.
+
+        Args:
+            keys (list): The resource keys, may repeat
+
+        Returns:
+            list: The loaded values in key order
+        """
+
+        memo = _memo(self)
+        missing = []
+        seen = set()
+        for key in keys:
+            if key not in memo and key not in seen:
+                seen.add(key)
+                missing.append(key)
+
+        if missing:
+            values = self.batch(missing)
+            if isinstance(values, Mapping):
+                for key in missing:
+                    memo[key] = values.get(key)
+            else:
+                memo.update(zip(missing, values))
+
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            if missing:
+                self.batches += 1
+                self.keys += len(missing)
+                self.max_batch_size = max(self.max_batch_size, len(missing))
+
+        return [memo.get(key) for key in keys]
+
+    def stats(self):
+        """Returns the counters of the loader for export to monitoring.
+
+        Returns:
+            dict: ``batches`` calls, ``keys`` loaded, memoized ``hits``,
+                ``max_batch_size`` and ``mean_batch_size``
+        """
+
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'keys': self.keys,
+                'hits': self.hits,
+                'max_batch_size': self.max_batch_size,
+                'mean_batch_size': (
+                    self.keys / float(self.batches) if self.batches else 0.0),
+            }
+
+
+def _memo(loader):
+    """Returns the loaded values of ``loader`` for the current request.
+
+    Args:
+        loader (flask_hal.loader.BatchLoader): The loader
+
+    Returns:
+        dict: key -> value
+    """
+
+    if not has_request_context():
+        return {}
+
+    req = request._get_current_object()
+    try:
+        memos = req._hal_batch_memo
+    except AttributeError:
+        memos = req._hal_batch_memo = {}
+
+    memo = memos.get(loader)
+    if memo is None:
+        memo = memos[loader] = {}
+
+    return memo
+
+
+class Deferred(object):
+    """Placeholder for a resource loaded by a :class:`.BatchLoader`. It
+    also follows the loader protocol of :class:`flask_hal.document.Lazy`, so
+    a placeholder which was not batch loaded is loaded on its own.
+    """
+
+    __slots__ = ('loader', 'key', 'link', 'default')
+
+    def __init__(self, loader, key, link=None, default=True):
+        self.loader = loader
+        self.key = key
+        self.link = link
+        self.default = default
+
+    def load(self):
+        return self.loader.load(self.key)
+
+
+def resolve(document):
+    """Loads the placeholders of ``document`` and its embedded documents,
+    with one batch call per loader and round. Loaded documents holding
+    placeholders of their own are loaded in further rounds. Embedded
+    placeholders which are not selected are left to emit their link.
+
+    Args:
+        document (flask_hal.document.BaseDocument): The document
+
+    Returns:
+        flask_hal.document.BaseDocument: The document
+    """
+
+    selected = current_embeds()
+
+    while True:
+        pending = _scan(document, selected)
+        if not pending:
+            return document
+
+        for loader, slots in pending.items():
+            values = loader.load_many([key for key, _ in slots])
+            for (_, setter), value in zip(slots, values):
+                setter(value)
+
+
+def has_pending():
+    """Returns whether placeholders were created during the current
+    request.
+
+    Returns:
+        bool
+    """
+
+    return has_request_context() and getattr(
+        request._get_current_object(), '_hal_deferred', False)
+
+
+def _scan(document, selected):
+    """Finds the placeholders of ``document`` and its embedded documents.
+
+    Args:
+        document (flask_hal.document.BaseDocument): The document
+        selected (frozenset): The embedded names selected by the client
+
+    Returns:
+        dict: loader -> list of ``(key, setter)``
+    """
+
+    pending = {}
+
+    # Breadth first, so keys are batched in document order
+    queue = deque([document])
+
+    while queue:
+        doc = queue.popleft()
+
+        # Frozen documents are already encoded
+        if doc._json is not None:
+            continue
+
+        data = doc.data
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if isinstance(value, Deferred):
+                    pending.setdefault(value.loader, []).append(
+                        (value.key, _setter(data, key)))
+        elif isinstance(data, (list, tuple)):
+            for i, item in enumerate(data):
+                if isinstance(item, BaseDocument):
+                    queue.append(item)
+                elif isinstance(item, Deferred):
+                    if not isinstance(data, list):
+                        data = doc.data = list(data)
+                    pending.setdefault(item.loader, []).append(
+                        (item.key, _setter(data, i)))
+
+        for name, value in doc.embedded.items():
+            if isinstance(value, BaseDocument):
+                queue.append(value)
+            elif isinstance(value, Deferred) and _is_selected(name, value, selected):
+                pending.setdefault(value.loader, []).append(
+                    (value.key, _embedded_setter(doc.embedded, name)))
+
+    return pending
+
+
+def _setter(container, key):
+    def setter(value):
+        container[key] = value
+    return setter
+
+
+def _embedded_setter(embedded, name):
+    def setter(value):
+        if value is None:
+            del embedded[name]
+        else:
+            embedded[name] = _loaded(value)
+    return setter
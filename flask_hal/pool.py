@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+flask_hal.pool
+==============
+
+Loads the lazy embedded resources of a document in parallel in a thread
+pool owned by the :class:`flask_hal.HAL` extension, enabled with
+``HAL_EMBED_WORKERS``. Independent slow resources, such as calls to other
+services, then take as long as the slowest of them rather than their sum.
+
+Loaders run with a copy of the application and request context, so
+:class:`flask_hal.link.Self` and :func:`flask.url_for` work in them.
+
+Example:
+    >>> app.config['HAL_EMBED_WORKERS'] = 8
+    >>> app.config['HAL_EMBED_TIMEOUT'] = 0.5
+    >>> Document(embedded={
+    ...     'recommendations': Lazy(recommendations.fetch, link='/recommendations'),
+    ...     'stock': Lazy(stock.fetch, link='/stock'),
+    ... })
+
+Resources which are not loaded within the timeout budget of the document
+fall back to their link. Their loaders keep running in the pool, their
+results are discarded.
+"""
+
+# Standard Libs
+import functools
+import multiprocessing
+
+# Third Party Libs
+from flask import (
+    copy_current_request_context,
+    current_app,
+    has_app_context,
+    has_request_context
+)
+
+# First Party Libs
+from flask_hal import loader
+from flask_hal.document import BaseDocument, _Fallback, _is_selected, _loaded
+from flask_hal.fieldset import current_embeds
+
+
+try:
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+except ImportError:  # pragma: no cover
+    ProcessPoolExecutor = ThreadPoolExecutor = wait = None
+
+try:
+    from time import monotonic as _clock
+except ImportError:  # pragma: no cover
+    from time import time as _clock
+
+
+def create_pool(workers):
+    """Returns a thread pool of ``workers`` threads, or ``None`` when
+    ``workers`` is 0 or ``concurrent.futures`` is not installed.
+
+    Args:
+        workers (int): Number of threads
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor
+    """
+
+    if not workers or ThreadPoolExecutor is None:
+        return None
+
+    return ThreadPoolExecutor(workers)
+
+
+def create_serializer(kind, workers=None, enabled=True, start_method=None):
+    """Returns the pool encoding chunks of large embedded lists, see
+    :meth:`flask_hal.document.Embedded._parallel_tokens`. Processes encode
+    chunks in parallel outside of the request context, threads only
+    overlap with encoders releasing the GIL, but share the request context
+    with the view.
+
+    Args:
+        kind (str): ``process`` or ``thread``
+
+    Keyword Args:
+        workers (int): Number of workers, defaults to the number of CPUs
+        enabled (bool): Whether parallel serialization is enabled
+        start_method (str): ``multiprocessing`` start method of the worker
+            processes, such as ``fork`` or ``spawn``, defaults to the
+            platform default
+
+    Returns:
+        concurrent.futures.Executor: The pool, or ``None`` when not enabled
+            or ``concurrent.futures`` is not installed
+
+    Raises:
+        ValueError: If ``kind`` is unknown
+    """
+
+    if kind not in ('process', 'thread'):
+        raise ValueError('Unknown HAL_PARALLEL_EXECUTOR: {0!r}'.format(kind))
+
+    if not enabled or ThreadPoolExecutor is None:
+        return None
+
+    workers = workers or multiprocessing.cpu_count()
+    if kind == 'process':
+        if start_method is None:
+            return ProcessPoolExecutor(workers)
+        return ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context(start_method))
+
+    return ThreadPoolExecutor(workers)
+
+
+def resolve(document, pool, timeout=None):
+    """Loads the selected lazy embedded resources of ``document`` and its
+    embedded documents in ``pool``. Loaded documents holding lazy resources
+    of their own are loaded in further rounds within the same budget, batch
+    loader placeholders are loaded in batches between rounds.
+
+    Args:
+        document (flask_hal.document.BaseDocument): The document
+        pool (concurrent.futures.Executor): The pool
+
+    Keyword Args:
+        timeout (float): Seconds allowed for all rounds, ``None`` to wait
+            for every loader
+
+    Returns:
+        flask_hal.document.BaseDocument: The document
+    """
+
+    deadline = None if timeout is None else _clock() + timeout
+    selected = current_embeds()
+
+    while True:
+        if loader.has_pending():
+            loader.resolve(document)
+
+        pending = _scan(document, selected)
+        if not pending:
+            return document
+
+        remaining = None
+        if deadline is not None:
+            remaining = max(deadline - _clock(), 0)
+
+        # A single resource without a budget is loaded in this thread
+        if len(pending) == 1 and remaining is None:
+            embedded, name, lazy = pending[0]
+            _set(embedded, name, _load(lazy))
+            continue
+
+        futures = {}
+        if remaining != 0:
+            for slot in pending:
+                futures[pool.submit(_bind(_load), slot[2])] = slot
+
+        done, _ = wait(futures, timeout=remaining) if futures else ((), ())
+
+        for future in done:
+            embedded, name, _ = futures[future]
+            _set(embedded, name, future.result())
+
+        for embedded, name, lazy in pending:
+            if name in embedded and embedded[name] is lazy:
+                embedded[name] = _Fallback(getattr(lazy, 'link', None))
+
+
+def _scan(document, selected):
+    """Finds the selected lazy embedded resources of ``document`` and its
+    embedded documents, except batch loader placeholders.
+
+    Args:
+        document (flask_hal.document.BaseDocument): The document
+        selected (frozenset): The embedded names selected by the client
+
+    Returns:
+        list: ``(embedded, name, lazy)`` tuples
+    """
+
+    pending = []
+    stack = [document]
+
+    while stack:
+        doc = stack.pop()
+
+        # Frozen documents are already encoded
+        if doc._json is not None:
+            continue
+
+        if isinstance(doc.data, (list, tuple)):
+            stack.extend(
+                item for item in doc.data if isinstance(item, BaseDocument))
+
+        embedded = doc.embedded
+        for name, value in embedded.items():
+            if isinstance(value, BaseDocument):
+                stack.append(value)
+            elif (not isinstance(value, loader.Deferred) and
+                    _is_selected(name, value, selected)):
+                pending.append((embedded, name, value))
+
+    return pending
+
+
+def _load(lazy):
+    return _loaded(getattr(lazy, 'load', lazy)())
+
+
+def _set(embedded, name, value):
+    if value is None:
+        del embedded[name]
+    else:
+        embedded[name] = value
+
+
+def _bind(func):
+    """Returns ``func`` bound to a copy of the current request context, or
+    to the current application outside of a request.
+    """
+
+    if has_request_context():
+        return copy_current_request_context(func)
+
+    if has_app_context():
+        app = current_app._get_current_object()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with app.app_context():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return func
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+flask_hal.signals
+=================
+
+Instrumentation of ``HAL`` responses. With ``HAL_INSTRUMENTATION`` enabled
+:data:`document_serialized` is sent for each document response with the
+time spent building links, serializing and compressing the document, and
+with ``HAL_SERVER_TIMING`` the timings are added to the response as a
+``Server-Timing`` header.
+
+Example:
+    >>> from flask_hal.signals import document_serialized
+    >>> def log_timings(app, document, timings, **extra):
+    ...     app.logger.info('%s %r', timings, extra)
+    >>> document_serialized.connect(log_timings, app)
+
+Timings are only recorded once an application has enabled instrumentation
+in :meth:`flask_hal.HAL.init_app`, until then the cost is a flag check.
+
+Link building is timed for :class:`flask_hal.link.Self`,
+:class:`flask_hal.link.LinkTemplate` and URLs built with :func:`url_for`,
+not for links built otherwise nor for the rest of the construction of a
+document by the view. Headers of streamed responses are sent before the
+body is serialized, so their ``Server-Timing`` header has no
+``hal-serialize`` or ``hal-compress`` phase, :data:`document_serialized`
+is sent with all the phases once the stream is complete.
+"""
+
+# Third Party Libs
+from flask import has_request_context, request
+from flask import url_for as _url_for
+from flask.signals import Namespace
+
+
+try:
+    from time import perf_counter
+except ImportError:  # pragma: no cover
+    from time import time as perf_counter
+
+
+# Clock of the recorded timings, shared with the modules recording them
+_clock = perf_counter
+
+
+_signals = Namespace()
+
+#: Sent when a document response has been serialized, with the application
+#: as sender and the ``document``, the ``timings`` in seconds per phase, the
+#: number of ``links`` and ``embedded`` documents, the number of ``bytes``
+#: sent and whether the response was ``streamed``.
+document_serialized = _signals.signal('hal-document-serialized')
+
+# Set by HAL.init_app when an application enables instrumentation
+instrumented = False
+
+
+def record(phase, seconds):
+    """Adds ``seconds`` to the time spent in ``phase`` during the current
+    request.
+
+    Args:
+        phase (str): ``links``, ``serialize`` or ``compress``
+        seconds (float): The elapsed time
+    """
+
+    if not has_request_context():
+        return
+
+    req = request._get_current_object()
+    try:
+        timings = req._hal_timings
+    except AttributeError:
+        timings = req._hal_timings = {}
+
+    timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+def url_for(endpoint, **values):
+    """Builds a URL with :func:`flask.url_for`, timed as link building when
+    instrumentation is enabled.
+
+    Example:
+        >>> Link('customer', signals.url_for('customers.detail', id=1))
+
+    Args:
+        endpoint (str): The endpoint
+        **values: The arguments of :func:`flask.url_for`
+
+    Returns:
+        str: The URL
+    """
+
+    if not instrumented:
+        return _url_for(endpoint, **values)
+
+    start = _clock()
+    url = _url_for(endpoint, **values)
+    record('links', _clock() - start)
+
+    return url
+
+
+def timings():
+    """Returns the timings recorded during the current request.
+
+    Returns:
+        dict: Seconds per phase
+    """
+
+    if not has_request_context():
+        return {}
+
+    return dict(getattr(request._get_current_object(), '_hal_timings', {}))
+
+
+def server_timing(timings):
+    """Formats timings as a ``Server-Timing`` header value.
+
+    Args:
+        timings (dict): Seconds per phase
+
+    Returns:
+        str: The header value, durations in milliseconds
+    """
+
+    return ', '.join(
+        'hal-{0};dur={1:.3f}'.format(phase, seconds * 1000)
+        for phase, seconds in sorted(timings.items()))
+
+
+def count(document):
+    """Counts the links and embedded documents of ``document``. Embedded
+    items from iterables other than lists and tuples, which are consumed
+    when serialized, are not counted.
+
+    Args:
+        document (flask_hal.document.BaseDocument): The document
+
+    Returns:
+        tuple: The number of links and of embedded documents
+    """
+
+    # First Party Libs
+    from flask_hal.document import BaseDocument
+
+    links = 0
+    embedded = -1
+    stack = [document]
+
+    while stack:
+        doc = stack.pop()
+        links += len(doc.links)
+        embedded += 1
+        stack.extend(
+            value for value in doc.embedded.values()
+            if isinstance(value, BaseDocument))
+        if isinstance(doc.data, (list, tuple)):
+            stack.extend(
+                item for item in doc.data if isinstance(item, BaseDocument))
+
+    return links, embedded
@@ -38,6 +38,12 @@ setup(
     install_requires=[
         'flask',
     ],
+    extras_require={
+        'orjson': ['orjson'],
+        'simplejson': ['simplejson'],
+        # HAL_EMBED_WORKERS on Python 2
+        'futures': ['futures'],
+    },
     tests_require=[
         'pytest',
         'pytest_cov',
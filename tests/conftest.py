@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+tests.conftest
+==============
+
+Test collection configuration.
+"""
+
+# Standard Libs
+import sys
+
+
+# flask_hal.aio uses async generators
+collect_ignore = []
+if sys.version_info < (3, 6):
+    collect_ignore.append('test_aio.py')
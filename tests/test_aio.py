@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+tests.test_aio
+==============
+
+Unittests for the :module:`flask_hal.aio` module.
+"""
+
+# Standard Libs
+import asyncio
+import json
+import time
+
+# Third Party Libs
+import pytest
+from flask import Flask
+
+# First Party Libs
+from flask_hal import HAL, aio
+from flask_hal.document import Document, Embedded
+
+
+async def value(result, delay=0):
+    await asyncio.sleep(delay)
+    return result
+
+
+async def stream(items, delay=0):
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+
+
+class TestResolve(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        HAL(self.app)
+
+    def test_awaitables_are_resolved_in_place(self):
+        with self.app.test_request_context('/orders/1'):
+            d = Document(
+                data={'id': 1, 'total': value(30)},
+                embedded={
+                    'customer': value(Embedded(data=value({'name': 'Dave'}))),
+                    'items': Embedded(data=[value({'id': 2}), Embedded(data=value({'id': 3}))]),
+                })
+
+            assert aio.resolve(d) is d
+            assert json.loads(d.to_json()) == {
+                'id': 1,
+                'total': 30,
+                '_links': {'self': {'href': '/orders/1'}},
+                '_embedded': {
+                    'customer': {'name': 'Dave'},
+                    'items': [{'id': 2}, {'id': 3}],
+                },
+            }
+
+    def test_awaitables_are_resolved_concurrently(self):
+        with self.app.test_request_context('/'):
+            d = Document(
+                data={'a': value(1, 0.2), 'b': value(2, 0.2)},
+                embedded={'c': value(Embedded(data={'c': 3}), 0.2)})
+
+            start = time.time()
+            aio.resolve(d)
+
+        assert time.time() - start < 0.5
+
+    def test_async_iterables_are_embedded(self):
+        with self.app.test_request_context('/'):
+            d = Document(
+                data={'ids': stream([1, 2])},
+                embedded={
+                    'items': Embedded(data=stream([{'id': 1}, Embedded(data=value({'id': 2}))])),
+                    'tags': stream(['a', 'b']),
+                })
+
+            aio.resolve(d)
+
+            assert json.loads(d.to_json())['_embedded'] == {
+                'items': [{'id': 1}, {'id': 2}],
+                'tags': ['a', 'b'],
+            }
+            assert d.data['ids'] == [1, 2]
+
+    def test_async_iterable_errors_are_raised(self):
+
+        async def failing():
+            yield 1
+            raise ValueError('backend failed')
+
+        with self.app.test_request_context('/'):
+            d = Document(embedded={'items': Embedded(data=failing())})
+            aio.resolve(d)
+
+            with pytest.raises(ValueError):
+                d.to_json()
+
+    def test_async_iterables_are_consumed_with_the_serializer(self):
+        self.app.config['HAL_ASYNC_BUFFER_SIZE'] = 2
+        read = []
+
+        async def counted():
+            for i in range(10):
+                read.append(i)
+                yield i
+
+        with self.app.test_request_context('/'):
+            d = Document(embedded={'items': Embedded(data=counted())})
+            aio.resolve(d)
+            items = iter(d.embedded['items'].data)
+
+            time.sleep(0.1)
+            assert len(read) == 2
+
+            assert next(items) == 0
+            time.sleep(0.1)
+            assert len(read) == 3
+
+            assert list(items) == list(range(1, 10))
+            assert len(read) == 10
+
+    def test_document_without_awaitables_is_unchanged(self):
+        with self.app.test_request_context('/'):
+            d = Document(data={'foo': 'bar'})
+            expected = d.to_json()
+
+            assert aio.resolve(d).to_json() == expected
+
+
+class TestResponse(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.app.config['HAL_ASYNC'] = True
+        HAL(self.app)
+
+        @self.app.route('/orders')
+        def orders():
+            return Document(
+                data={'count': value(2)},
+                embedded={'orders': Embedded(data=stream([{'id': 1}, {'id': 2}], 0.05))})
+
+    def test_resolved_before_serializing(self):
+        r = self.app.test_client().get('/orders')
+
+        assert json.loads(r.get_data(as_text=True)) == {
+            'count': 2,
+            '_links': {'self': {'href': '/orders'}},
+            '_embedded': {'orders': [{'id': 1}, {'id': 2}]},
+        }
+
+    def test_async_iterables_are_streamed(self):
+        self.app.config['HAL_STREAMING'] = True
+        self.app.config['HAL_STREAMING_BUFFER_SIZE'] = 1
+
+        r = self.app.test_client().get('/orders', buffered=False)
+        chunks = list(r.response)
+        r.close()
+
+        assert len(chunks) > 1
+        assert json.loads(b''.join(chunks))['_embedded']['orders'] == [
+            {'id': 1}, {'id': 2}]
+
+    def test_closing_response_stops_consuming(self):
+        self.app.config['HAL_STREAMING'] = True
+        self.app.config['HAL_STREAMING_BUFFER_SIZE'] = 1
+        closed = []
+
+        async def endless():
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+                    yield {'id': 1}
+            finally:
+                closed.append(True)
+
+        @self.app.route('/endless')
+        def view():
+            return Document(embedded={'orders': Embedded(data=endless())})
+
+        r = self.app.test_client().get('/endless', buffered=False)
+        chunks = iter(r.response)
+        next(chunks)
+        r.close()
+        time.sleep(0.1)
+
+        assert closed == [True]
+
+    def test_async_view(self):
+        pytest.importorskip('asgiref')
+
+        @self.app.route('/async')
+        async def view():
+            return Document(data={'foo': value('bar')})
+
+        r = self.app.test_client().get('/async')
+
+        assert json.loads(r.get_data(as_text=True))['foo'] == 'bar'
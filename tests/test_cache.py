@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+tests.test_cache
+================
+
+Unittests for the :module:`flask_hal.cache` module.
+"""
+
+# First Party Libs
+from flask_hal.cache import ResponseCache
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(object):
+
+    def test_get_and_set(self):
+        cache = ResponseCache()
+        cache.set('foo', b'{}')
+
+        assert cache.get('foo') == b'{}'
+        assert cache.get('bar') is None
+        assert cache.stats() == {
+            'hits': 1,
+            'misses': 1,
+            'evictions': 0,
+            'entries': 1,
+            'size': 2,
+        }
+
+    def test_entry_expires_after_ttl(self):
+        clock = Clock()
+        cache = ResponseCache(ttl=10, clock=clock)
+        cache.set('foo', b'{}')
+        cache.set('bar', b'{}', ttl=20)
+
+        clock.now = 15
+
+        assert cache.get('foo') is None
+        assert cache.get('bar') == b'{}'
+        assert cache.size == 2
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_size=6)
+        cache.set('foo', b'aa')
+        cache.set('bar', b'bb')
+        cache.set('baz', b'cc')
+
+        cache.get('foo')
+        cache.set('qux', b'dd')
+
+        assert cache.get('bar') is None
+        assert cache.get('foo') == b'aa'
+        assert cache.stats()['evictions'] == 1
+        assert cache.size == 6
+
+    def test_replacing_entry_updates_size(self):
+        cache = ResponseCache()
+        cache.set('foo', b'aaaa')
+        cache.set('foo', b'aa')
+
+        assert cache.size == 2
+        assert len(cache) == 1
+
+    def test_body_larger_than_cache_is_not_cached(self):
+        cache = ResponseCache(max_size=2)
+        cache.set('foo', b'aaa')
+
+        assert cache.get('foo') is None
+
+    def test_get_entry_returns_etag(self):
+        cache = ResponseCache()
+        cache.set('foo', b'{}', etag='abc')
+
+        assert cache.get_entry('foo') == (b'{}', 'abc')
+
+    def test_delete_and_clear(self):
+        cache = ResponseCache()
+        cache.set('foo', b'{}')
+        cache.set('bar', b'{}')
+        cache.delete('foo')
+
+        assert cache.get('foo') is None
+        assert cache.size == 2
+
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.size == 0
@@ -1,10 +1,20 @@
+# Standard Libs
+import copy
+import functools
+import json
+import multiprocessing
+import pickle
+import sys
+
 # Third Party Libs
 import flask
 import pytest
 
 # First Party Libs
-from flask_hal import link
-from flask_hal.document import Document, Embedded
+from flask_hal import HAL, link
+from flask_hal.document import Document, Embedded, Lazy
+from flask_hal.encoder import RawJSON
+from flask_hal.fieldset import Fieldset
 
 
 def test_document_should_have_link_self():
@@ -196,3 +206,535 @@ def test_data_in_embedded_can_be_array_of_documents():
             }
         }
         assert expected == document.to_dict()
+
+
+def test_iter_json_matches_to_json():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        document = Document(
+            embedded={
+                'orders': Embedded(
+                    embedded={'details': Embedded(
+                        data={'details': {}}
+                    )},
+                    links=link.Collection(
+                        link.Link('foo', 'www.foo.com'),
+                        link.Link('foo', 'www.boo.com')
+                    ),
+                    data={'total': 30},
+                ),
+                'items': Embedded(
+                    data=[
+                        Embedded(data={'id': 1}),
+                        {'id': 2}
+                    ]
+                ),
+                'empty': Embedded(data=[])
+            },
+            data={'currentlyProcessing': 14}
+        )
+        assert document.to_json() == ''.join(document.iter_json())
+
+
+def test_iter_json_empty_embedded_document():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        document = Embedded()
+        assert '{}' == ''.join(document.iter_json())
+
+
+def test_data_in_embedded_can_be_generator():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        consumed = []
+
+        def rows():
+            for i in range(3):
+                consumed.append(i)
+                yield Embedded(data={'id': i}) if i % 2 else {'id': i}
+
+        document = Document(embedded={'order': Embedded(data=rows())})
+        chunks = document.iter_json()
+        first = next(chunks)
+
+        assert consumed == []
+
+        expected = {
+            '_links': {'self': {'href': '/entity/231'}},
+            '_embedded': {'order': [{'id': 0}, {'id': 1}, {'id': 2}]}
+        }
+        assert expected == json.loads(first + ''.join(chunks))
+        assert consumed == [0, 1, 2]
+
+
+def test_embedded_max_items_stops_consuming_data():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        rows = iter([{'id': i} for i in range(5)])
+        embedded = Embedded(data=rows, max_items=2)
+
+        assert [{'id': 0}, {'id': 1}] == embedded.to_dict()
+        assert {'id': 2} == next(rows)
+
+        embedded = Embedded(data=range(5), max_items=3)
+        assert '[0, 1, 2]' == ''.join(embedded.iter_json())
+
+
+def test_to_json_does_not_recurse_on_deep_documents():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        depth = sys.getrecursionlimit() * 2
+        node = Embedded(data={'depth': depth})
+        for level in range(depth - 1, -1, -1):
+            node = Embedded(data={'depth': level}, embedded={'child': node})
+        document = Document(embedded={'child': node})
+
+        encoded = document.to_json()
+
+        assert encoded.startswith(
+            '{"_links": {"self": {"href": "/entity/231"}}, '
+            '"_embedded": {"child": {"depth": 0, "_embedded": {"child": {"depth": 1, ')
+        assert encoded.endswith('{"depth": %d}' % depth + '}}' * (depth + 1))
+
+
+def test_to_json_skips_data_keys_overridden_by_links():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        document = Document(data={'_links': 'foo', '_embedded': 'bar', 'id': 1})
+
+        assert json.loads(document.to_json()) == document.to_dict()
+
+
+def test_frozen_document_is_spliced_into_parents():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        author = Embedded(
+            data={'name': 'Dave'},
+            links=link.Collection(link.Link('profile', '/dave', title='Dave')),
+            embedded={'avatar': Embedded(data={'url': '/dave.png'})})
+        expected = author.to_json()
+
+        assert author.freeze() is author
+        assert isinstance(author, Embedded)
+        assert author.to_json() == expected
+
+        author.data['name'] = 'Hal'
+        document = Document(
+            embedded={
+                'author': author,
+                'authors': Embedded(data=[author, author])
+            })
+
+        assert json.loads(document.to_json())['_embedded'] == {
+            'author': json.loads(expected),
+            'authors': [json.loads(expected)] * 2
+        }
+        assert document.to_json() == ''.join(document.iter_json())
+
+
+def test_frozen_document_is_immutable():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        document = Document(data={'id': 1}).freeze()
+
+        with pytest.raises(AttributeError):
+            document.data = {}
+
+        with pytest.raises(AttributeError):
+            document.embedded = {}
+
+        with pytest.raises(TypeError):
+            document.links.append(link.Link('foo', '/foo'))
+
+        with pytest.raises(AttributeError):
+            document.links[0].href = '/foo'
+
+
+def test_frozen_links_are_shared_with_documents():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        links = link.Collection(link.Link('up', '/up')).freeze()
+        document = Document(links=links)
+
+        assert document.links is not links
+        assert document.links.rels() == ['up', 'self']
+        assert len(links) == 1
+
+
+def test_frozen_document_pickles_and_copies():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        author = Embedded(
+            data={'name': 'Dave'},
+            links=link.Collection(link.Link('profile', '/dave')),
+            embedded={'avatar': Embedded(data={'url': '/dave.png'})}).freeze()
+        restored = pickle.loads(pickle.dumps(author))
+
+        assert type(author).__module__ == 'flask_hal.document'
+        assert type(author).__doc__ == Embedded.__doc__
+        assert isinstance(restored, link._Frozen)
+        assert restored.to_json() == author.to_json()
+        assert copy.copy(author) is author
+        assert copy.copy(author.links[0]) is author.links[0]
+
+        with pytest.raises(AttributeError):
+            restored.data = {}
+
+
+def test_freeze_deep_document():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        document = Embedded(data={'id': 0})
+        for i in range(2000):
+            document = Embedded(data={'id': i}, embedded={'child': document})
+        expected = document.to_json()
+
+        assert document.freeze().to_json() == expected
+
+
+def test_freeze_consumes_iterable_data_once():
+    app = flask.Flask(__name__)
+    with app.test_request_context('/entity/231'):
+        embedded = Embedded(data=(Embedded(data={'id': i}) for i in range(2)))
+        embedded.freeze()
+
+        assert embedded.to_json() == '[{"id": 0}, {"id": 1}]'
+        assert embedded.to_dict() == [{'id': 0}, {'id': 1}]
+        assert isinstance(embedded.data[0], Embedded)
+        assert embedded.data[0].to_json() == '{"id": 0}'
+
+
+def test_embedded_from_rows_matches_hand_built():
+    app = flask.Flask(__name__)
+    app.add_url_rule('/orders/<int:id>', 'order')
+    app.add_url_rule('/customers/<int:customer>', 'customer')
+
+    rows = [{'id': 1, 'customer': 7, 'total': 30}, {'id': 2, 'customer': 8, 'total': 12}]
+
+    with app.test_request_context('/orders'):
+        hand_built = Embedded(data=[
+            Embedded(data=row, links=[
+                link.Link('self', flask.url_for('order', id=row['id'])),
+                link.Link('customer', flask.url_for('customer', customer=row['customer']),
+                          title='Customer'),
+            ])
+            for row in rows
+        ])
+        bulk = Embedded.from_rows(
+            rows, self_endpoint='order', link_specs=[
+                link.LinkTemplate('customer', 'customer', title='Customer')])
+
+        assert bulk.to_json() == hand_built.to_json()
+        assert bulk.to_dict() == hand_built.to_dict()
+        assert bulk.data[0].links['customer'][0].href == '/customers/7'
+
+
+def test_embedded_from_columns():
+    app = flask.Flask(__name__)
+    app.add_url_rule('/orders/<int:id>', 'order')
+
+    class Column(list):
+
+        def tolist(self):
+            return list(self)
+
+    with app.test_request_context('/orders'):
+        bulk = Embedded.from_rows(
+            {'id': Column([1, 2]), 'total': [30, 12]},
+            link_specs=[('self', 'order')], max_items=1)
+
+        assert json.loads(bulk.to_json()) == [
+            {'id': 1, 'total': 30, '_links': {'self': {'href': '/orders/1'}}},
+        ]
+
+
+def test_embedded_from_rows_without_links():
+    bulk = Embedded.from_rows(iter([{'id': 1}]))
+
+    assert bulk.to_dict() == [{'id': 1}]
+    assert isinstance(bulk.data[0].links, link.Collection)
+
+
+class TestLazy(object):
+
+    def setup_method(self):
+        self.app = flask.Flask(__name__)
+        self.loaded = []
+
+    def loader(self, name, value):
+        def load():
+            self.loaded.append(name)
+            return value
+        return load
+
+    def document(self):
+        return Document(
+            data={'id': 1},
+            embedded={
+                'customer': Lazy(
+                    self.loader('customer', Embedded(data={'name': 'Dave'})),
+                    link='/customers/7'),
+                'items': self.loader('items', [{'id': 2}]),
+                'notes': Lazy(self.loader('notes', {'text': 'fragile'}), default=True),
+                'shipping': Embedded(data={'method': 'post'}),
+            })
+
+    def test_not_selected_emits_link(self):
+        with self.app.test_request_context('/orders/1'):
+            d = json.loads(self.document().to_json())
+
+        assert self.loaded == ['notes']
+        assert d['_links']['customer'] == {'href': '/customers/7'}
+        assert d['_embedded'] == {
+            'shipping': {'method': 'post'},
+            'notes': {'text': 'fragile'},
+        }
+
+    def test_selected_by_client(self):
+        with self.app.test_request_context('/orders/1?embed=customer,items'):
+            document = self.document()
+            d = json.loads(document.to_json())
+
+            assert document.to_dict() == d
+
+        assert 'customer' not in d['_links']
+        assert d['_embedded']['customer'] == {'name': 'Dave'}
+        assert d['_embedded']['items'] == [{'id': 2}]
+        assert 'notes' not in d['_embedded']
+        assert sorted(set(self.loaded)) == ['customer', 'items']
+
+    def test_loader_objects(self):
+
+        class Loader(object):
+            link = link.Link('author', '/authors/1', title='Author')
+            default = False
+
+            def load(self):
+                return Embedded(data={'name': 'Dave'})
+
+        with self.app.test_request_context('/'):
+            d = Embedded(embedded={'author': Loader()})
+
+            assert d.to_dict() == {
+                '_links': {'author': {'href': '/authors/1', 'title': 'Author'}}}
+
+    def test_embed_param_can_be_disabled(self):
+        self.app.config['HAL_EMBED_PARAM'] = None
+
+        with self.app.test_request_context('/orders/1?embed=customer'):
+            d = json.loads(self.document().to_json())
+
+        assert 'customer' not in d['_embedded']
+
+
+class TestParallel(object):
+
+    def setup_method(self):
+        self.app = flask.Flask(__name__)
+        self.app.config['HAL_PARALLEL_THRESHOLD'] = 10
+        self.app.config['HAL_PARALLEL_CHUNK_SIZE'] = 3
+        self.app.config['HAL_PARALLEL_WORKERS'] = 2
+        self.app.add_url_rule('/orders/<int:id>', 'order')
+
+    def teardown_method(self):
+        state = self.app.extensions.get('hal')
+        if state is not None and state.serializer is not None:
+            state.serializer.shutdown()
+
+    def init(self, executor):
+        self.app.config['HAL_PARALLEL_EXECUTOR'] = executor
+        self.hal = HAL(self.app)
+
+    def document(self, size=25):
+        return Document(data={'total': size}, embedded={
+            'orders': Embedded.from_rows(
+                [{'id': i, 'status': 'new'} for i in range(size)],
+                self_endpoint='order'),
+            'lines': Embedded(data=[{'line': i} for i in range(size)]),
+        })
+
+    def serial(self, document, **kwargs):
+        threshold = self.app.config['HAL_PARALLEL_THRESHOLD']
+        self.app.config['HAL_PARALLEL_THRESHOLD'] = sys.maxsize
+        try:
+            return ''.join(document.iter_json(**kwargs))
+        finally:
+            self.app.config['HAL_PARALLEL_THRESHOLD'] = threshold
+
+    @pytest.mark.parametrize('executor', ['process', 'thread'])
+    def test_same_output_as_serial(self, executor):
+        self.init(executor)
+
+        with self.app.test_request_context('/'):
+            document = self.document()
+            encoded = document.to_json()
+
+            assert encoded == self.serial(document)
+
+        assert len(json.loads(encoded)['_embedded']['orders']) == 25
+
+    def test_fieldset_and_max_items(self):
+        self.init('thread')
+        fieldset = Fieldset(embedded_fields={'orders': ['id']})
+
+        with self.app.test_request_context('/'):
+            document = self.document()
+            document.embedded['lines'].max_items = 11
+            encoded = ''.join(document.iter_json(fieldset=fieldset))
+
+            assert encoded == self.serial(document, fieldset=fieldset)
+
+        d = json.loads(encoded)
+        assert d['_embedded']['orders'][4] == {
+            'id': 4, '_links': {'self': {'href': '/orders/4'}}}
+        assert len(d['_embedded']['lines']) == 11
+
+    def test_below_threshold_is_serial(self):
+        self.init('thread')
+        submitted = []
+        serializer = self.app.extensions['hal'].serializer
+        submit = serializer.submit
+        serializer.submit = lambda *args: submitted.append(args) or submit(*args)
+
+        with self.app.test_request_context('/'):
+            self.document(size=9).to_json()
+            assert submitted == []
+
+            self.document(size=10).to_json()
+            assert len(submitted) == 8
+
+    def test_unpicklable_items_are_encoded_serially(self):
+        self.init('process')
+
+        with self.app.test_request_context('/'):
+            document = Embedded(data=[
+                Embedded(data={'id': i}, embedded={'lazy': Lazy(lambda: {'ok': True})})
+                for i in range(12)
+            ])
+
+            assert json.loads(document.to_json())[0] == {'id': 0}
+
+    @pytest.mark.parametrize('start_method', ['fork', 'spawn'])
+    def test_curies_and_embeds_of_each_request(self, start_method):
+        if start_method not in multiprocessing.get_all_start_methods():
+            pytest.skip('{0} is not supported'.format(start_method))
+        self.app.config['HAL_PARALLEL_START_METHOD'] = start_method
+        self.init('process')
+        self.hal.curie('acme', 'https://docs.acme.com/rels/{rel}')
+
+        @self.app.route('/orders')
+        def orders():
+            return Document(embedded={'orders': Embedded(data=[
+                Embedded(
+                    data={'id': i},
+                    links=[link.Link('https://docs.acme.com/rels/customer', '/customers/1')],
+                    embedded={'customer': Lazy(
+                        functools.partial(dict, name='Dave'), link='/customers/1')}
+                    if i >= 20 else {})
+                for i in range(25)
+            ])})
+
+        client = self.app.test_client()
+
+        for url in ['/orders?embed=customer', '/orders', '/orders?embed=customer']:
+            with self.app.test_request_context(url):
+                expected = self.serial(orders())
+
+            assert client.get(url).get_data(as_text=True) == expected
+
+        d = json.loads(expected)['_embedded']['orders']
+        assert d[0]['_links'] == {'acme:customer': {'href': '/customers/1'}}
+        assert d[20]['_embedded'] == {'customer': {'name': 'Dave'}}
+
+    @pytest.mark.parametrize('executor', ['process', 'thread'])
+    def test_curies_in_application_context(self, executor):
+        self.init(executor)
+        self.hal.curie('acme', 'https://docs.acme.com/rels/{rel}')
+
+        with self.app.app_context():
+            document = Embedded(data=[
+                Embedded(data={'id': i}, links=[
+                    link.Link('https://docs.acme.com/rels/customer', '/customers/1')])
+                for i in range(12)
+            ])
+            encoded = document.to_json()
+
+            assert encoded == self.serial(document)
+
+        assert json.loads(encoded)[11]['_links'] == {
+            'acme:customer': {'href': '/customers/1'}}
+
+    def test_disabled_by_default(self):
+        app = flask.Flask(__name__)
+        HAL(app)
+
+        assert app.extensions['hal'].serializer is None
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError):
+            self.init('fiber')
+
+
+class TestRawJSON(object):
+
+    def setup_method(self):
+        self.app = flask.Flask(__name__)
+        HAL(self.app)
+
+    def document(self):
+        return Document(
+            data={'id': 1, 'settings': RawJSON('{"theme":"dark"}')},
+            embedded={
+                'customer': RawJSON('{"name":"Dave"}'),
+                'items': Embedded(data=[RawJSON('{"id":2}'), {'id': 3}]),
+                'notes': Lazy(lambda: RawJSON(b'["fragile"]'), default=True),
+            })
+
+    def test_spliced_into_json(self):
+        with self.app.test_request_context('/orders/1'):
+            document = self.document()
+            encoded = document.to_json()
+
+            assert ''.join(document.iter_json()) == encoded
+            assert '{"theme":"dark"}' in encoded
+            assert json.loads(encoded) == document.to_dict() == {
+                'id': 1,
+                'settings': {'theme': 'dark'},
+                '_links': {'self': {'href': '/orders/1'}},
+                '_embedded': {
+                    'customer': {'name': 'Dave'},
+                    'items': [{'id': 2}, {'id': 3}],
+                    'notes': ['fragile'],
+                },
+            }
+
+    def test_given_embedded_dict_is_not_changed(self):
+        raw = RawJSON('{"name":"Dave"}')
+        embedded = {'customer': raw}
+
+        with self.app.test_request_context('/orders/1'):
+            first = Document(embedded=embedded)
+            second = Document(embedded=embedded)
+
+            assert first.to_dict() == second.to_dict()
+
+        assert embedded == {'customer': raw}
+
+    def test_document_data(self):
+        with self.app.test_request_context('/orders/1'):
+            document = Document(data=RawJSON(' {"id": 1} '))
+
+            assert json.loads(document.to_json()) == document.to_dict() == {
+                'id': 1, '_links': {'self': {'href': '/orders/1'}}}
+
+            with pytest.raises(ValueError):
+                Document(data=RawJSON('[1]')).to_json()
+
+    def test_response(self):
+        self.app.add_url_rule('/orders/1', 'order', self.document)
+
+        r = self.app.test_client().get('/orders/1')
+
+        assert r.mimetype == 'application/hal+json'
+        assert json.loads(r.get_data(as_text=True))['_embedded']['customer'] == {
+            'name': 'Dave'}
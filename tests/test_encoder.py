@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+tests.test_encoder
+==================
+
+Unittests for the :module:`flask_hal.encoder` module.
+"""
+
+# Standard Libs
+import datetime
+import decimal
+import json
+import uuid
+
+# Third Party Libs
+import pytest
+from flask import Flask
+
+# First Party Libs
+from flask_hal import HAL, encoder
+from flask_hal.document import Document
+from flask_hal.link import Link
+
+
+class TestEncoder(object):
+
+    def test_matches_json_dumps(self):
+        data = {'foo': [1, 2.5, None, True], 'bar': {'baz': u'\xe9'}}
+
+        assert encoder.Encoder().dumps(data) == json.dumps(data)
+
+    def test_compact(self):
+        e = encoder.Encoder(compact=True)
+
+        assert e.dumps({'foo': [1, 2]}) == '{"foo":[1,2]}'
+
+    def test_default_hook(self):
+        e = encoder.Encoder()
+        value = uuid.UUID('b0a1e4a6-1c07-4c55-9a55-98b7e7e1e2a0')
+
+        assert e.dumps({
+            'date': datetime.date(2015, 10, 8),
+            'at': datetime.datetime(2015, 10, 8, 12, 30),
+            'price': decimal.Decimal('9.99'),
+            'id': value,
+        }) == json.dumps({
+            'date': '2015-10-08',
+            'at': '2015-10-08T12:30:00',
+            'price': '9.99',
+            'id': str(value),
+        })
+
+    def test_default_hook_raises_type_error(self):
+        with pytest.raises(TypeError):
+            encoder.Encoder().dumps({'foo': object()})
+
+    def test_custom_default_hook(self):
+        e = encoder.Encoder(default=lambda obj: 'custom')
+
+        assert e.dumps([object()]) == '["custom"]'
+
+
+class TestCreateEncoder(object):
+
+    def test_returns_encoder_instance(self):
+        e = encoder.Encoder()
+
+        assert encoder.create_encoder(e) is e
+
+    def test_named_backend(self):
+        assert encoder.create_encoder('json').name == 'json'
+
+    def test_invalid_backend(self):
+        with pytest.raises(ValueError):
+            encoder.create_encoder('foo')
+
+    @pytest.mark.skipif(not encoder.OrjsonEncoder.available,
+                        reason='orjson is not installed')
+    def test_auto_prefers_orjson_when_compact(self):
+        e = encoder.create_encoder('auto', compact=True)
+
+        assert e.name == 'orjson'
+        assert e.dumps({'foo': [1, 2]}) == '{"foo":[1,2]}'
+
+    def test_auto_keeps_default_separators(self):
+        e = encoder.create_encoder('auto')
+
+        assert e.name == encoder.Encoder.name
+        assert e.dumps({'foo': [1, 2]}) == json.dumps({'foo': [1, 2]})
+
+
+class TestGetEncoder(object):
+
+    def test_default_outside_application(self):
+        assert encoder.get_encoder() is encoder.DEFAULT_ENCODER
+
+    def test_configured_encoder(self):
+        app = Flask(__name__)
+        e = encoder.Encoder(compact=True)
+        HAL(app, encoder=e)
+
+        with app.test_request_context('/foo'):
+            assert encoder.get_encoder() is e
+            assert Link('foo', '/foo').to_json() == '{"foo":{"href":"/foo"}}'
+
+            d = Document(data={'at': datetime.date(2015, 10, 8)})
+            expected = '{"at":"2015-10-08","_links":{"self":{"href":"/foo"}}}'
+            assert d.to_json() == expected
+            assert ''.join(d.iter_json()) == expected
+
+    def test_configured_from_app_config(self):
+        app = Flask(__name__)
+        app.config['HAL_JSON_ENCODER'] = 'json'
+        app.config['HAL_JSON_COMPACT'] = True
+        HAL(app)
+
+        with app.app_context():
+            assert encoder.get_encoder().dumps([1, 2]) == '[1,2]'
+
+
+class TestRawJSON(object):
+
+    @pytest.mark.parametrize('backend', [
+        name for name, cls in sorted(encoder.BACKENDS.items()) if cls.available])
+    def test_spliced_verbatim(self, backend):
+        e = encoder.create_encoder(backend, compact=True)
+        raw = encoder.RawJSON('{"b": [1,  2]}')
+
+        assert e.dumps({'a': raw, 'c': [raw, encoder.RawJSON(b'null')]}) == (
+            '{"a":{"b": [1,  2]},"c":[{"b": [1,  2]},null]}')
+        assert e.dumps({'a': 1}) == '{"a":1}'
+
+    def test_failed_call_does_not_leak_values(self):
+        e = encoder.Encoder()
+
+        with pytest.raises(TypeError):
+            e.dumps([encoder.RawJSON('1'), object()])
+
+        assert e.dumps([encoder.RawJSON('2')]) == '[2]'
+
+    def test_validation(self):
+        app = Flask(__name__)
+        HAL(app)
+
+        with app.app_context():
+            assert encoder.RawJSON('{').json == '{'
+
+            app.config['HAL_VALIDATE_RAW_JSON'] = True
+            with pytest.raises(ValueError):
+                encoder.RawJSON('{')
+            assert encoder.RawJSON('{"a": 1}').loads() == {'a': 1}
+
+        with pytest.raises(ValueError):
+            encoder.RawJSON('[1,', validate=True)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+tests.test_fieldset
+===================
+
+Unittests for the :module:`flask_hal.fieldset` module.
+"""
+
+# Standard Libs
+import json
+
+# Third Party Libs
+from flask import Flask
+from werkzeug.datastructures import MultiDict
+
+# First Party Libs
+from flask_hal import HAL
+from flask_hal.document import Document, Embedded
+from flask_hal.fieldset import Fieldset, current_fieldset
+from flask_hal.link import Collection, Link, LinkTemplate
+
+
+class TestFieldset(object):
+
+    def test_from_args(self):
+        f = Fieldset.from_args(MultiDict([
+            ('fields', 'id, total'),
+            ('fields[orders]', 'id'),
+            ('fields[orders]', 'name'),
+            ('links', 'next'),
+            ('links[orders]', ''),
+            ('page', '2'),
+        ]))
+
+        assert f.fields == frozenset(['id', 'total'])
+        assert f.links == frozenset(['next', 'self'])
+        assert f.embedded('orders').fields == frozenset(['id', 'name'])
+        assert f.embedded('orders').links == frozenset(['self'])
+        assert f.embedded('customer').fields is None
+        assert f.embedded('customer').links == frozenset(['next', 'self'])
+
+    def test_from_args_without_selection(self):
+        assert Fieldset.from_args(MultiDict([('page', '2')])) is None
+
+    def test_key_is_canonical(self):
+        a = Fieldset.from_args(MultiDict([('fields', 'b,a'), ('links[x]', 'c')]))
+        b = Fieldset.from_args(MultiDict([('links[x]', 'c'), ('fields', 'a,b')]))
+
+        assert a.key == b.key
+
+    def test_excludes_link(self):
+        f = Fieldset(links=['next'], embedded_links={'orders': ['customer']})
+
+        assert f.excludes_link('prev')
+        assert not f.excludes_link('customer')
+        assert not f.excludes_link('self')
+        assert not Fieldset(fields=['id']).excludes_link('prev')
+
+
+class TestSparseDocuments(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.app.config['HAL_SPARSE_FIELDSETS'] = True
+        HAL(self.app)
+        self.app.add_url_rule('/orders/<int:id>', 'order')
+
+        @self.app.route('/orders')
+        def orders():
+            return Document(
+                data={'count': 2, 'total': 42},
+                links=[Link('next', '/orders?page=2')],
+                embedded={
+                    'orders': Embedded(data=[
+                        Embedded(
+                            data={'id': 1, 'total': 30},
+                            links=[Link('self', '/orders/1'), Link('customer', '/c/1')]),
+                        {'id': 2, 'total': 12},
+                    ]),
+                    'summary': Embedded(data={'count': 2, 'total': 42}),
+                })
+
+    def get(self, query):
+        r = self.app.test_client().get('/orders' + query)
+        return json.loads(r.get_data(as_text=True))
+
+    def test_disabled_by_default(self):
+        self.app.config['HAL_SPARSE_FIELDSETS'] = False
+
+        assert self.get('?fields=count')['total'] == 42
+
+    def test_prunes_fields(self):
+        d = self.get('?fields=count&fields[orders]=id')
+
+        assert d['count'] == 2
+        assert 'total' not in d
+        assert d['_embedded']['orders'] == [
+            {'id': 1, '_links': {
+                'self': {'href': '/orders/1'}, 'customer': {'href': '/c/1'}}},
+            {'id': 2},
+        ]
+        assert d['_embedded']['summary'] == {'count': 2, 'total': 42}
+
+    def test_prunes_links(self):
+        d = self.get('?links=&links[orders]=customer')
+
+        assert list(d['_links']) == ['self']
+        assert d['_embedded']['orders'][0]['_links'] == {
+            'self': {'href': '/orders/1'}, 'customer': {'href': '/c/1'}}
+
+        d = self.get('?links=')
+        assert d['_embedded']['orders'][0]['_links'] == {'self': {'href': '/orders/1'}}
+
+    def test_frozen_documents_are_pruned(self):
+        with self.app.test_request_context('/orders?fields[author]=name'):
+            author = Embedded(
+                data={'name': 'Dave', 'email': 'dave@example.com'},
+                links=Collection(Link('self', '/authors/1'))).freeze()
+            d = Document(embedded={'author': author})
+
+            pruned = json.loads(d.to_json(current_fieldset()))
+            full = json.loads(d.to_json())
+
+        assert pruned['_embedded']['author'] == {
+            'name': 'Dave', '_links': {'self': {'href': '/authors/1'}}}
+        assert full['_embedded']['author']['email'] == 'dave@example.com'
+
+    def test_streamed(self):
+        self.app.config['HAL_STREAMING'] = True
+        self.app.config['HAL_STREAMING_BUFFER_SIZE'] = 1
+
+        assert self.get('?fields=count')['count'] == 2
+        assert 'total' not in self.get('?fields=count')
+
+    def test_from_rows_skips_excluded_links(self):
+        rows = [{'id': 1}, {'id': 2}]
+        customer = LinkTemplate('customer', 'missing')
+
+        with self.app.test_request_context('/orders?links=next'):
+            e = Embedded.from_rows(rows, self_endpoint='order', link_specs=[customer])
+
+            assert [l.rel for l in e.data[0].links] == ['self']
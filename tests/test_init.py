@@ -9,10 +9,13 @@ Tests for the init module.
 """
 
 # Standard Libs
+import gzip
 import json
+import zlib
 
 # Third Party Libs
-from flask import Flask, Response
+import pytest
+from flask import Flask, Response, request
 
 # First Party Libs
 from flask_hal import HAL, HALResponse, document
@@ -35,6 +38,37 @@ class TestHAL(object):
 
 class TestHalResponse(object):
 
+    def test_view_can_return_document(self):
+        app = Flask(__name__)
+        HAL(app)
+
+        @app.route('/foo')
+        def foo():
+            return document.Document(data={'foo': 'bar'})
+
+        r = app.test_client().get('/foo')
+
+        assert r.status_code == 200
+        assert r.headers['Content-Type'] == 'application/hal+json'
+        assert json.loads(r.data.decode('utf-8')) == {
+            'foo': 'bar',
+            '_links': {'self': {'href': '/foo'}}
+        }
+
+    @pytest.mark.parametrize('init', [False, True])
+    def test_other_response_class_can_not_return_document(self, init):
+        app = Flask(__name__)
+        app.testing = True
+        if init:
+            HAL(app, Response)
+
+        @app.route('/foo')
+        def foo():
+            return document.Document()
+
+        with pytest.raises(TypeError):
+            app.test_client().get('/foo')
+
     def test_returns_document_with_hal_document(self):
         app = Flask(__name__)
         with app.test_request_context():
@@ -59,3 +93,315 @@ class TestHalResponse(object):
         assert isinstance(r, Response)
         assert r.headers['Content-Type'] == 'text/html; charset=utf-8'
         assert r.data.decode("utf-8") == 'foo'
+
+    def test_streams_document_when_enabled(self):
+        app = Flask(__name__)
+        HAL(app)
+        app.config['HAL_STREAMING'] = True
+        app.config['HAL_STREAMING_BUFFER_SIZE'] = 16
+        with app.test_request_context('/foo'):
+            d = document.Document(data={'foo': 'bar' * 10})
+            r = HALResponse.force_type(d, {})
+            expected = d.to_json()
+
+        assert r.is_streamed
+        assert r.headers['Content-Type'] == 'application/hal+json'
+        assert r.get_data(as_text=True) == expected
+
+
+class TestConditionalGet(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.app.config['HAL_ETAG'] = 'strong'
+        HAL(self.app)
+
+        @self.app.route('/foo')
+        def foo():
+            return document.Document(data={'foo': 'bar'})
+
+        @self.app.route('/versioned')
+        def versioned():
+            d = document.Document(data={'foo': 'bar'}, version=3)
+            d.to_json = self.fail_to_json
+            return d
+
+    def fail_to_json(self):
+        raise AssertionError('document should not be serialized')
+
+    def test_disabled_by_default(self):
+        app = Flask(__name__)
+        HAL(app)
+
+        @app.route('/foo')
+        def foo():
+            return document.Document()
+
+        r = app.test_client().get('/foo')
+
+        assert 'ETag' not in r.headers
+
+    def test_etag_from_body(self):
+        client = self.app.test_client()
+        r = client.get('/foo')
+
+        assert r.status_code == 200
+        assert r.headers['ETag']
+
+        r = client.get('/foo', headers={'If-None-Match': r.headers['ETag']})
+
+        assert r.status_code == 304
+        assert r.data == b''
+
+    def test_weak_etag(self):
+        self.app.config['HAL_ETAG'] = 'weak'
+        client = self.app.test_client()
+        r = client.get('/foo')
+
+        assert r.headers['ETag'].startswith('W/')
+        assert client.get('/foo', headers={
+            'If-None-Match': r.headers['ETag']}).status_code == 304
+
+    def test_version_key_skips_serialization(self):
+        with self.app.test_request_context('/versioned'):
+            d = document.Document(data={'foo': 'bar'}, version=3)
+            etag = HALResponse.force_type(d, {'REQUEST_METHOD': 'GET'}).headers['ETag']
+
+        r = self.app.test_client().get('/versioned', headers={'If-None-Match': etag})
+
+        assert r.status_code == 304
+        assert r.data == b''
+
+    def test_non_matching_etag(self):
+        r = self.app.test_client().get('/foo', headers={'If-None-Match': '"bar"'})
+
+        assert r.status_code == 200
+        assert json.loads(r.data.decode('utf-8'))['foo'] == 'bar'
+
+
+class TestCached(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.hal = HAL(self.app)
+        self.calls = []
+
+        @self.app.route('/orders/<int:id>')
+        @self.hal.cached(lambda id: (id, 1) if id else None)
+        def order(id):
+            self.calls.append(id)
+            return document.Document(data={'id': id})
+
+        @self.app.route('/carts/<int:id>', methods=['GET', 'POST'])
+        @self.hal.cached(lambda id: id)
+        def cart(id):
+            self.calls.append(request.method)
+            return document.Document(data={'method': request.method})
+
+        @self.app.route('/releases/<int:id>')
+        @self.hal.cached(lambda id: 'v1')
+        def release(id):
+            return document.Document(data={'id': id})
+
+        @self.app.route('/plain')
+        @self.hal.cached(lambda: 'plain')
+        def plain():
+            return Response('foo')
+
+    def test_hit_skips_view(self):
+        client = self.app.test_client()
+        first = client.get('/orders/1')
+        second = client.get('/orders/1')
+
+        assert self.calls == [1]
+        assert first.data == second.data
+        assert second.headers['Content-Type'] == 'application/hal+json'
+        assert json.loads(second.data.decode('utf-8')) == {
+            'id': 1,
+            '_links': {'self': {'href': '/orders/1'}}
+        }
+
+        with self.app.app_context():
+            assert self.hal.cache.stats()['hits'] == 1
+            assert self.hal.cache.stats()['misses'] == 1
+
+    def test_key_is_scoped_to_query_string(self):
+        client = self.app.test_client()
+        client.get('/orders/1')
+        r = client.get('/orders/1?page=2')
+
+        assert self.calls == [1, 1]
+        assert json.loads(r.data.decode('utf-8'))['_links']['self']['href'] == \
+            '/orders/1?page=2'
+
+    def test_key_is_scoped_to_path(self):
+        client = self.app.test_client()
+        client.get('/releases/1')
+        r = client.get('/releases/2')
+
+        assert json.loads(r.data.decode('utf-8'))['id'] == 2
+
+    def test_none_key_skips_cache(self):
+        client = self.app.test_client()
+        client.get('/orders/0')
+        client.get('/orders/0')
+
+        assert self.calls == [0, 0]
+
+    def test_non_document_is_not_cached(self):
+        r = self.app.test_client().get('/plain')
+
+        assert r.data == b'foo'
+
+        with self.app.app_context():
+            assert len(self.hal.cache) == 0
+
+    def test_only_get_and_head_are_cached(self):
+        client = self.app.test_client()
+        client.get('/carts/1')
+        r = client.post('/carts/1')
+        client.head('/carts/1')
+
+        assert self.calls == ['GET', 'POST']
+        assert json.loads(r.data.decode('utf-8'))['method'] == 'POST'
+
+    def test_cached_response_is_conditional(self):
+        self.app.config['HAL_ETAG'] = 'strong'
+        client = self.app.test_client()
+        etag = client.get('/orders/1').headers['ETag']
+        r = client.get('/orders/1', headers={'If-None-Match': etag})
+
+        assert r.status_code == 304
+        assert self.calls == [1]
+
+
+class TestCompression(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.app.config['HAL_COMPRESS'] = True
+        self.app.config['HAL_COMPRESS_MIN_SIZE'] = 100
+        HAL(self.app)
+        self.size = 50
+
+        @self.app.route('/items')
+        def items():
+            return document.Document(
+                data={'items': [{'id': i} for i in range(self.size)]})
+
+    def expected(self):
+        return {
+            'items': [{'id': i} for i in range(self.size)],
+            '_links': {'self': {'href': '/items'}}
+        }
+
+    def test_gzip(self):
+        r = self.app.test_client().get('/items', headers={'Accept-Encoding': 'gzip'})
+
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert r.headers['Vary'] == 'Accept-Encoding'
+        assert int(r.headers['Content-Length']) == len(r.data)
+        assert json.loads(gzip.decompress(r.data).decode('utf-8')) == self.expected()
+
+    def test_deflate(self):
+        r = self.app.test_client().get('/items', headers={
+            'Accept-Encoding': 'gzip;q=0.5, deflate'})
+
+        assert r.headers['Content-Encoding'] == 'deflate'
+        assert json.loads(zlib.decompress(r.data).decode('utf-8')) == self.expected()
+
+    def test_not_accepted(self):
+        r = self.app.test_client().get('/items', headers={'Accept-Encoding': 'br'})
+
+        assert 'Content-Encoding' not in r.headers
+        assert r.headers['Vary'] == 'Accept-Encoding'
+        assert json.loads(r.data.decode('utf-8')) == self.expected()
+
+    def test_below_min_size(self):
+        self.size = 1
+        r = self.app.test_client().get('/items', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in r.headers
+        assert json.loads(r.data.decode('utf-8')) == self.expected()
+
+    def test_disabled(self):
+        self.app.config['HAL_COMPRESS'] = False
+        r = self.app.test_client().get('/items', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in r.headers
+        assert 'Vary' not in r.headers
+
+    def test_streamed(self):
+        self.app.config['HAL_STREAMING'] = True
+        self.app.config['HAL_STREAMING_BUFFER_SIZE'] = 16
+        self.size = 500
+        r = self.app.test_client().get('/items', headers={'Accept-Encoding': 'gzip'})
+
+        assert r.is_streamed
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in r.headers
+        assert json.loads(gzip.decompress(r.data).decode('utf-8')) == self.expected()
+
+    def test_streamed_below_min_size(self):
+        self.app.config['HAL_STREAMING'] = True
+        self.size = 1
+        r = self.app.test_client().get('/items', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in r.headers
+        assert json.loads(r.data.decode('utf-8')) == self.expected()
+
+    def test_etag_differs_per_encoding(self):
+        self.app.config['HAL_ETAG'] = 'strong'
+        client = self.app.test_client()
+        plain = client.get('/items').headers['ETag']
+        gzipped = client.get('/items', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+        assert plain != gzipped
+
+        r = client.get('/items', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': gzipped})
+
+        assert r.status_code == 304
+        assert r.headers['Vary'] == 'Accept-Encoding'
+
+    def test_version_key_not_modified_varies(self):
+        self.app.config['HAL_ETAG'] = 'strong'
+
+        @self.app.route('/versioned')
+        def versioned():
+            return document.Document(
+                data={'items': [{'id': i} for i in range(self.size)]}, version=3)
+
+        client = self.app.test_client()
+        r = client.get('/versioned', headers={'Accept-Encoding': 'gzip'})
+
+        assert r.headers['Content-Encoding'] == 'gzip'
+
+        r = client.get('/versioned', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': r.headers['ETag']})
+
+        assert r.status_code == 304
+        assert r.headers['Vary'] == 'Accept-Encoding'
+
+    @pytest.mark.parametrize('url, streaming', [
+        ('/items', False), ('/versioned', False), ('/versioned', True)])
+    def test_uncompressed_etag_has_no_variant(self, url, streaming):
+        self.app.config['HAL_ETAG'] = 'strong'
+        self.app.config['HAL_STREAMING'] = streaming
+        self.size = 1
+
+        @self.app.route('/versioned')
+        def versioned():
+            return document.Document(data={'id': 1}, version=3)
+
+        client = self.app.test_client()
+        plain = client.get(url).headers['ETag']
+        r = client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in r.headers
+        assert r.headers['ETag'] == plain
+
+        r = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': plain})
+
+        assert r.status_code == 304
+        assert r.headers['ETag'] == plain
@@ -9,14 +9,25 @@ Unittests for the :module:`flask_hal.link` module.
 """
 
 # Standard Libs
+import copy
 import json
 
 # Third Party Libs
 import pytest
-from flask import Flask
+from flask import Blueprint, Flask, Request, url_for
+from werkzeug.routing import BuildError
 
 # First Party Libs
-from flask_hal.link import Collection, Link, Self
+from flask_hal import HAL, encoder
+from flask_hal.document import Document, Embedded
+from flask_hal.link import (
+    Collection,
+    Link,
+    LinkTemplate,
+    Self,
+    URITemplate,
+    compile_template
+)
 
 
 class TestCollection(object):
@@ -106,6 +117,94 @@ class TestCollection(object):
 
         assert c.to_json() == expected
 
+    def test_getitem_by_rel(self):
+        foo = Link('foo', '/foo')
+        bar = Link('bar', '/bar')
+        foo2 = Link('foo', '/foo/2')
+        c = Collection(foo, bar, foo2)
+
+        assert c['foo'] == [foo, foo2]
+        assert c['bar'] == [bar]
+        assert c[1] is bar
+        assert 'foo' in c
+        assert 'baz' not in c
+        assert c.get('baz') is None
+        assert c.rels() == ['foo', 'bar']
+
+        with pytest.raises(KeyError):
+            c['baz']
+
+    def test_index_follows_list_mutations(self):
+        foo = Link('foo', '/foo')
+        bar = Link('bar', '/bar')
+        baz = Link('foo', '/baz')
+        c = Collection(foo)
+
+        c.append(bar)
+        c.extend(link for link in [baz])
+        assert c['foo'] == [foo, baz]
+
+        c.insert(0, Link('foo', '/first'))
+        assert [l.href for l in c['foo']] == ['/first', '/foo', '/baz']
+
+        c.remove(foo)
+        del c[0]
+        assert c['foo'] == [baz]
+
+        c.pop()
+        assert 'foo' not in c
+
+        c += [foo]
+        c[0] = Link('qux', '/qux')
+        assert c.rels() == ['qux', 'foo']
+
+        c.clear()
+        assert c.to_dict() == {'_links': {}}
+
+    def test_freeze(self):
+        c = Collection(
+            Link('foo', '/foo', title='Foo'),
+            Link('foo', '/bar'),
+            Link('bar', '/bar'))
+        expected = c.to_json()
+
+        assert c.freeze() is c
+        assert isinstance(c, Collection)
+        assert c.to_json() == expected
+        assert c.to_dict() == json.loads(expected)
+        assert c['foo'][0].to_json() == '{"foo": {"href": "/foo", "title": "Foo"}}'
+
+        for mutate in (
+                lambda: c.append(Link('baz', '/baz')),
+                lambda: c.extend([]),
+                lambda: c.pop(),
+                lambda: c.sort(),
+                lambda: c.__setitem__(0, Link('baz', '/baz')),
+                lambda: c.__delitem__(0)):
+            with pytest.raises(TypeError):
+                mutate()
+
+        copied = copy.copy(c)
+        copied.append(Link('baz', '/baz'))
+
+        assert len(c) == 3
+
+    def test_collection_splices_frozen_links(self):
+        shared = Link('up', '/up').freeze()
+        c = Collection(shared, Link('foo', '/foo'))
+        d = Collection(shared, Link('up', '/other').freeze())
+
+        assert c.to_dict()['_links']['up'] == {'href': '/up'}
+        assert json.loads(d._links_json(encoder.DEFAULT_ENCODER)) == d.to_dict()['_links']
+
+    def test_copy_does_not_share_index(self):
+        c = Collection(Link('foo', '/foo'))
+        d = copy.copy(c)
+        d.append(Link('foo', '/bar'))
+
+        assert len(c['foo']) == 1
+        assert len(d['foo']) == 2
+
 
 class TestLink(object):
 
@@ -139,6 +238,46 @@ class TestLink(object):
 
         assert l.to_json() == expected
 
+    def test_freeze(self):
+        l = Link('foo', '/foo', name='foo').freeze()
+
+        assert isinstance(l, Link)
+        assert l.to_json() == json.dumps({'foo': {'href': '/foo', 'name': 'foo'}})
+
+        with pytest.raises(AttributeError):
+            l.href = '/bar'
+
+        with pytest.raises(AttributeError):
+            l.title = 'Foo'
+
+        with pytest.raises(AttributeError):
+            del l.name
+
+    def test_has_no_instance_dict(self):
+        l = Link('foo', '/foo', name='foo')
+
+        assert not hasattr(l, '__dict__')
+        assert not hasattr(l, 'title')
+
+    def test_to_dict_attribute_order_is_fixed(self):
+        l = Link('foo', '/foo', templated=True, title='Foo', name='foo')
+
+        assert list(l.to_dict()['foo']) == ['href', 'name', 'title', 'templated']
+
+    def test_to_dict_includes_attributes_set_after_init(self):
+        l = Link('foo', '/foo', templated=True)
+        l.title = 'Foo'
+        l.name = 'foo'
+
+        assert list(l.to_dict()['foo']) == ['href', 'name', 'title', 'templated']
+
+        del l.templated
+
+        assert l.to_dict() == {'foo': {'href': '/foo', 'name': 'foo', 'title': 'Foo'}}
+
+        with pytest.raises(AttributeError):
+            del l.templated
+
 
 class TestSelf(object):
 
@@ -203,3 +342,332 @@ class TestSelf(object):
             }
 
             assert l.to_dict() == expected
+
+
+class TestLinkTemplate(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+
+        @self.app.route('/orders/<int:id>')
+        def order(id):
+            pass
+
+        @self.app.route('/orders/<int:id>/<kind>')
+        def order_kind(id, kind):
+            pass
+
+        @self.app.route('/', subdomain='api')
+        def sub():
+            pass
+
+        self.bp = Blueprint('bp', __name__)
+
+        @self.bp.route('/items/<name>')
+        def item(name):
+            pass
+
+        self.app.register_blueprint(self.bp, url_prefix='/bp')
+
+    def test_hrefs_match_url_for(self):
+        t = LinkTemplate('item', 'order')
+
+        with self.app.test_request_context('/', base_url='http://localhost/app'):
+            values = [{'id': 1}, {'id': 2, 'q': 'x'}, {'id': 3, 'q': None}]
+
+            assert t.hrefs(values) == [url_for('order', **v) for v in values]
+
+    def test_external(self):
+        t = LinkTemplate('item', 'order', external=True)
+
+        with self.app.test_request_context('/'):
+            assert t.href(id=1) == url_for('order', id=1, _external=True)
+
+    def test_ignore_unknown(self):
+        t = LinkTemplate('item', 'order_kind')
+
+        with self.app.test_request_context('/'):
+            rows = [{'id': 1, 'kind': 'a', 'total': 30}]
+
+            assert t.hrefs(rows, ignore_unknown=True) == ['/orders/1/a']
+            assert t.hrefs(rows) == ['/orders/1/a?total=30']
+
+    def test_links(self):
+        t = LinkTemplate('item', 'order', title='Order', foo='bar')
+
+        with self.app.test_request_context('/'):
+            c = Collection(*t.links([{'id': 1}, {'id': 2}]))
+
+            assert c.to_dict() == {
+                '_links': {
+                    'item': [
+                        {'href': '/orders/1', 'title': 'Order'},
+                        {'href': '/orders/2', 'title': 'Order'},
+                    ]
+                }
+            }
+            assert t.link(id=3).href == '/orders/3'
+
+    def test_relative_blueprint_endpoint(self):
+        t = LinkTemplate('item', '.item')
+
+        with self.app.test_request_context('/bp/items/foo'):
+            assert t.href(name='bar') == '/bp/items/bar'
+
+    def test_url_defaults_are_applied(self):
+        @self.app.url_defaults
+        def add_kind(endpoint, values):
+            values.setdefault('kind', 'default')
+
+        t = LinkTemplate('item', 'order_kind')
+
+        with self.app.test_request_context('/'):
+            assert t.href(id=1) == '/orders/1/default'
+
+    def test_subdomain_falls_back_to_url_for(self):
+        self.app.config['SERVER_NAME'] = 'example.com'
+        t = LinkTemplate('item', 'sub')
+
+        with self.app.test_request_context('/'):
+            assert t.href() == url_for('sub')
+
+    def test_unknown_endpoint_raises_build_error(self):
+        t = LinkTemplate('item', 'foo')
+
+        with self.app.test_request_context('/'):
+            with pytest.raises(BuildError):
+                t.href(id=1)
+
+
+class TestSelfURLCache(object):
+
+    def test_url_is_computed_once_per_request(self, monkeypatch):
+        app = Flask(__name__)
+        calls = []
+        url = Request.url
+
+        def counting_url(req):
+            calls.append(req)
+            return url.__get__(req)
+
+        monkeypatch.setattr(Request, 'url', property(counting_url))
+
+        with app.test_request_context('/foo'):
+            links = [Self() for _ in range(10)]
+            external = Self(external=True)
+
+        assert len(calls) == 1
+        assert set(l.href for l in links) == set(['/foo'])
+        assert external.href == 'http://localhost/foo'
+
+    def test_cache_is_per_request(self):
+        app = Flask(__name__)
+
+        with app.test_request_context('/foo'):
+            assert Self().href == '/foo'
+
+        with app.test_request_context('/bar'):
+            assert Self().href == '/bar'
+
+
+class TestCuries(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.hal = HAL(self.app)
+        self.hal.curie('acme', 'https://docs.acme.com/rels/{rel}')
+        self.hal.curie('v2', 'https://docs.acme.com/rels/v2/{rel}.html')
+
+    def test_compact(self):
+        curies = self.hal.curies
+
+        assert curies.compact('https://docs.acme.com/rels/orders') == 'acme:orders'
+        assert curies.compact('https://docs.acme.com/rels/v2/orders.html') == 'v2:orders'
+        assert curies.compact('https://docs.acme.com/rels/') == 'https://docs.acme.com/rels/'
+        assert curies.compact('self') == 'self'
+        assert curies._memo['self'] == 'self'
+
+    def test_href_needs_placeholder(self):
+        with pytest.raises(ValueError):
+            self.hal.curie('acme', 'https://docs.acme.com/rels/')
+
+    def test_collection_rels_compacted(self):
+        links = Collection(
+            Link('https://docs.acme.com/rels/orders', '/orders'),
+            Link('https://docs.acme.com/rels/orders', '/orders?page=2'),
+            Link('next', '/next'))
+
+        with self.app.app_context():
+            expected = {
+                'acme:orders': [{'href': '/orders'}, {'href': '/orders?page=2'}],
+                'next': {'href': '/next'},
+            }
+            assert links.to_dict() == {'_links': expected}
+            assert json.loads(links._links_json(encoder.get_encoder())) == expected
+            assert links._links(frozenset(['acme:orders'])) == {
+                'acme:orders': expected['acme:orders']}
+
+            frozen = Collection(Link('https://docs.acme.com/rels/items', '/i')).freeze()
+            assert json.loads(frozen.to_json()) == {'_links': {'acme:items': {'href': '/i'}}}
+
+        assert 'https://docs.acme.com/rels/orders' in links
+        assert links.to_dict()['_links']['https://docs.acme.com/rels/orders']
+
+    def test_full_and_compact_rels_are_merged(self):
+        links = Collection(
+            Link('https://docs.acme.com/rels/orders', '/a'),
+            Link('acme:orders', '/b'))
+        expected = {'acme:orders': [{'href': '/a'}, {'href': '/b'}]}
+
+        with self.app.app_context():
+            e = encoder.get_encoder()
+
+            assert links._links() == expected
+            assert json.loads(links._links_json(e)) == expected
+            for link in links:
+                link.freeze(e)
+            assert json.loads(links._links_json(e)) == expected
+            assert json.loads(links.freeze(e).to_json()) == {'_links': expected}
+
+    def test_document_emits_curies(self):
+        with self.app.test_request_context('/orders'):
+            d = Document(
+                links=[Link('https://docs.acme.com/rels/orders', '/orders')],
+                embedded={'order': Embedded(
+                    links=[Link('https://docs.acme.com/rels/v2/customer.html', '/c')])})
+            encoded = json.loads(d.to_json())
+
+            assert encoded == d.to_dict()
+
+        assert encoded['_links']['curies'] == [
+            {'name': 'acme', 'href': 'https://docs.acme.com/rels/{rel}', 'templated': True},
+            {'name': 'v2', 'href': 'https://docs.acme.com/rels/v2/{rel}.html',
+             'templated': True},
+        ]
+        assert encoded['_links']['acme:orders'] == {'href': '/orders'}
+        assert encoded['_embedded']['order'] == {'_links': {'v2:customer': {'href': '/c'}}}
+
+    def test_other_applications_not_compacted(self):
+        app = Flask(__name__)
+        HAL(app)
+
+        with app.test_request_context('/orders'):
+            d = Document(links=[Link('https://docs.acme.com/rels/orders', '/orders')])
+
+            assert 'curies' not in d.to_dict()['_links']
+            assert 'https://docs.acme.com/rels/orders' in d.to_dict()['_links']
+
+
+class TestURITemplate(object):
+
+    variables = {
+        'var': 'value',
+        'hello': 'Hello World!',
+        'half': '50%',
+        'empty': '',
+        'path': '/foo/bar',
+        'x': 1024,
+        'y': 768,
+        'list': ['red', 'green', 'blue'],
+        'keys': {'semi': ';', 'dot': '.', 'comma': ','},
+    }
+
+    @pytest.mark.parametrize('template, expected', [
+        ('{var}', 'value'),
+        ('{hello}', 'Hello%20World%21'),
+        ('{half}', '50%25'),
+        ('O{empty}X', 'OX'),
+        ('O{undef}X', 'OX'),
+        ('{x,y}', '1024,768'),
+        ('{var:3}', 'val'),
+        ('{+path}/here', '/foo/bar/here'),
+        ('{+hello}', 'Hello%20World!'),
+        ('{#path:6}/here', '#/foo/b/here'),
+        ('X{.list*}', 'X.red.green.blue'),
+        ('{/list*,path:4}', '/red/green/blue/%2Ffoo'),
+        ('{;x,y,empty}', ';x=1024;y=768;empty'),
+        ('{?x,y,empty}', '?x=1024&y=768&empty='),
+        ('{?keys*}', '?semi=%3B&dot=.&comma=%2C'),
+        ('{&list*}', '&list=red&list=green&list=blue'),
+        ('{keys}', 'semi,%3B,dot,.,comma,%2C'),
+    ])
+    def test_expand(self, template, expected):
+        assert URITemplate(template).expand(self.variables) == expected
+
+    @pytest.mark.parametrize('template', ['{', '/{a', '}', '{=a}', '{a b}', '{a:0}'])
+    def test_invalid(self, template):
+        with pytest.raises(ValueError):
+            URITemplate(template)
+
+    def test_expand_many(self):
+        template = compile_template('/orders/{id}{?fields}')
+
+        assert template.expand_many([{'id': 1}, {'id': 'a/b', 'fields': 'total'}]) == [
+            '/orders/1', '/orders/a%2Fb?fields=total']
+        assert template.variables == ['id', 'fields']
+        assert template.expand({'id': 1}, fields='x') == '/orders/1?fields=x'
+
+    def test_compiled_once(self):
+        assert compile_template('/orders{/id}') is compile_template('/orders{/id}')
+
+    def test_link(self):
+        link = compile_template('/orders{/id}').link('order', title='Order')
+
+        assert link.to_dict() == {
+            'order': {'href': '/orders{/id}', 'templated': True, 'title': 'Order'}}
+        assert link.template is compile_template('/orders{/id}')
+        assert link.expand(id=1).to_dict() == {
+            'order': {'href': '/orders/1', 'title': 'Order'}}
+        assert [l.href for l in link.expand_many([{'id': 1}, {}])] == ['/orders/1', '/orders']
+
+
+class TestFromSpecs(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+
+    def test_builds_links(self):
+        links = Collection.from_specs([
+            ('next', '/orders?page=3'),
+            ('find', '/orders{?id}', {'templated': True, 'title': 'Find'}),
+            ('item', '/orders/1', {'name': 'first'}),
+            ('item', '/orders/2', None),
+        ])
+
+        assert links.to_dict() == Collection(
+            Link('next', '/orders?page=3'),
+            Link('find', '/orders{?id}', title='Find', templated=True),
+            Link('item', '/orders/1', name='first'),
+            Link('item', '/orders/2')).to_dict()
+        assert links['find'][0]._attrs == (('title', 'Find'), ('templated', True))
+        assert len(links['item']) == 2
+
+    @pytest.mark.parametrize('spec', [
+        'next', ('next', ), ('next', 1), ('next', '/next', ['title']),
+        ('next', '/next', {'colour': 'red'}),
+    ])
+    def test_checked_outside_application(self, spec):
+        with pytest.raises(TypeError):
+            Collection.from_specs([spec])
+
+    def test_checked_in_testing_mode(self):
+        self.app.testing = True
+
+        with self.app.app_context():
+            with pytest.raises(TypeError):
+                Collection.from_specs([('next', '/next', {'colour': 'red'})])
+            with pytest.raises(TypeError):
+                Document(links=['next'])
+
+    def test_trusted_in_production(self):
+        with self.app.test_request_context('/orders'):
+            links = Collection.from_specs([('next', '/next', {'colour': 'red'})])
+            assert links.to_dict() == {'_links': {'next': {'href': '/next'}}}
+
+            with pytest.raises(TypeError):
+                Collection('next')
+            with pytest.raises(TypeError):
+                Document(links=['next'])
+
+            handed = Collection.from_specs([('next', '/next')])
+            assert Document(links=handed).links is handed
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+tests.test_loader
+=================
+
+Unittests for the :module:`flask_hal.loader` module.
+"""
+
+# Standard Libs
+import json
+
+# Third Party Libs
+from flask import Flask
+
+# First Party Libs
+from flask_hal import HAL, loader
+from flask_hal.document import Document, Embedded
+
+
+class TestBatchLoader(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        HAL(self.app)
+        self.calls = []
+
+        def load_customers(ids):
+            self.calls.append(list(ids))
+            return dict(
+                (i, Embedded(
+                    data={'id': i},
+                    embedded={'region': self.regions.defer(i % 2)}))
+                for i in ids if i != 404)
+
+        def load_regions(ids):
+            self.calls.append(list(ids))
+            return [{'region': i} for i in ids]
+
+        self.customers = loader.BatchLoader(load_customers, name='customers')
+        self.regions = loader.BatchLoader(load_regions, name='regions')
+
+        @self.app.route('/orders')
+        def orders():
+            return Document(embedded={'orders': Embedded(data=[
+                Embedded(
+                    data={'id': i},
+                    embedded={'customer': self.customers.defer(customer)})
+                for i, customer in enumerate([1, 2, 1, 404])
+            ])})
+
+    def test_loads_once_per_loader_and_round(self):
+        r = self.app.test_client().get('/orders')
+        orders = json.loads(r.get_data(as_text=True))['_embedded']['orders']
+
+        assert self.calls == [[1, 2, 404], [1, 0]]
+        assert orders[0]['_embedded']['customer'] == {
+            'id': 1, '_embedded': {'region': {'region': 1}}}
+        assert orders[1]['_embedded']['customer']['id'] == 2
+        assert orders[1]['_embedded']['customer']['_embedded']['region'] == {'region': 0}
+        assert '_embedded' not in orders[3]
+
+    def test_stats(self):
+        self.app.test_client().get('/orders')
+
+        assert self.customers.stats() == {
+            'batches': 1,
+            'keys': 3,
+            'hits': 1,
+            'max_batch_size': 3,
+            'mean_batch_size': 3.0,
+        }
+        assert self.regions.stats()['hits'] == 1
+
+    def test_memoized_per_request(self):
+        with self.app.test_request_context('/'):
+            assert self.regions.load_many([1, 2]) == [{'region': 1}, {'region': 2}]
+            assert self.regions.load(2) == {'region': 2}
+
+        with self.app.test_request_context('/'):
+            self.regions.load(2)
+
+        assert self.calls == [[1, 2], [2]]
+
+    def test_placeholders_in_lists_and_data(self):
+        with self.app.test_request_context('/'):
+            d = Embedded(data=[self.regions.defer(1), self.regions.defer(2)])
+            loader.resolve(d)
+
+            assert d.to_dict() == [{'region': 1}, {'region': 2}]
+
+            d = Document(data={'region': self.regions.defer(3)})
+            loader.resolve(d)
+
+            assert d.data == {'region': {'region': 3}}
+
+    def test_not_selected_placeholder_emits_link(self):
+        with self.app.test_request_context('/?embed=other'):
+            d = Embedded(embedded={
+                'customer': self.customers.defer(1, link='/customers/1')})
+            loader.resolve(d)
+
+            assert self.calls == []
+            assert d.to_dict() == {'_links': {'customer': {'href': '/customers/1'}}}
+
+    def test_unresolved_placeholder_loads_on_its_own(self):
+        with self.app.test_request_context('/'):
+            d = Embedded(embedded={'region': self.regions.defer(1)})
+
+            assert d.to_dict() == {'_embedded': {'region': {'region': 1}}}
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+tests.test_pool
+===============
+
+Unittests for the :module:`flask_hal.pool` module.
+"""
+
+# Standard Libs
+import json
+import threading
+import time
+
+# Third Party Libs
+import pytest
+from flask import Flask, url_for
+
+# First Party Libs
+from flask_hal import HAL, loader, pool
+from flask_hal.document import Document, Embedded, Lazy
+from flask_hal.link import Self
+
+
+pytestmark = pytest.mark.skipif(
+    pool.ThreadPoolExecutor is None, reason='concurrent.futures is not installed')
+
+
+def slow(value, delay):
+    def load():
+        time.sleep(delay)
+        return value
+    return load
+
+
+class TestResolve(object):
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.app.config['HAL_EMBED_WORKERS'] = 4
+        HAL(self.app)
+        self.app.add_url_rule('/customers/<int:id>', 'customer')
+
+    def get(self, path, view):
+        self.app.add_url_rule(path, 'view', view)
+        r = self.app.test_client().get(path)
+        return json.loads(r.get_data(as_text=True))
+
+    def test_disabled_by_default(self):
+        app = Flask(__name__)
+        HAL(app)
+
+        assert app.extensions['hal'].pool is None
+
+    def test_loads_in_parallel(self):
+        def view():
+            return Document(embedded={
+                'a': Lazy(slow({'a': 1}, 0.2), default=True),
+                'b': Lazy(slow({'b': 2}, 0.2), default=True),
+                'c': Lazy(slow({'c': 3}, 0.2), default=True),
+            })
+
+        start = time.time()
+        d = self.get('/orders/1', view)
+
+        assert time.time() - start < 0.5
+        assert d['_embedded'] == {'a': {'a': 1}, 'b': {'b': 2}, 'c': {'c': 3}}
+
+    def test_loaders_have_request_context(self):
+        threads = []
+
+        def load():
+            threads.append(threading.current_thread())
+            return Embedded(
+                data={'customer': url_for('customer', id=7)},
+                links=[Self()],
+                embedded={'nested': Lazy(lambda: {'ok': True}, default=True)})
+
+        def view():
+            return Document(embedded={
+                'customer': Lazy(load, default=True),
+                'other': Lazy(lambda: {'other': True}, default=True),
+            })
+
+        d = self.get('/orders/1', view)
+
+        assert threads[0] is not threading.current_thread()
+        assert d['_embedded']['customer'] == {
+            'customer': '/customers/7',
+            '_links': {'self': {'href': '/orders/1'}},
+            '_embedded': {'nested': {'ok': True}},
+        }
+
+    def test_timeout_falls_back_to_link(self):
+        self.app.config['HAL_EMBED_TIMEOUT'] = 0.1
+
+        def view():
+            return Document(embedded={
+                'fast': Lazy(slow({'fast': True}, 0), default=True),
+                'slow': Lazy(slow({'slow': True}, 0.5), link='/slow', default=True),
+            })
+
+        start = time.time()
+        d = self.get('/orders/1', view)
+
+        assert time.time() - start < 0.4
+        assert d['_embedded'] == {'fast': {'fast': True}}
+        assert d['_links']['slow'] == {'href': '/slow'}
+
+    def test_document_timeout_overrides_config(self):
+        self.app.config['HAL_EMBED_TIMEOUT'] = 10
+
+        def view():
+            return Document(
+                embedded={'slow': Lazy(slow({}, 0.5), link='/slow', default=True)},
+                embed_timeout=0.05)
+
+        d = self.get('/orders/1', view)
+
+        assert d['_links']['slow'] == {'href': '/slow'}
+
+    def test_deferred_are_batched(self):
+        calls = []
+
+        def batch(keys):
+            calls.append(keys)
+            return [{'id': key} for key in keys]
+
+        customers = loader.BatchLoader(batch)
+
+        def view():
+            return Document(embedded={
+                'a': Lazy(lambda: Embedded(embedded={'c': customers.defer(1)}), default=True),
+                'b': Lazy(lambda: Embedded(embedded={'c': customers.defer(2)}), default=True),
+            })
+
+        d = self.get('/orders/1', view)
+
+        assert calls == [[1, 2]] or calls == [[2, 1]]
+        assert d['_embedded']['a']['_embedded']['c'] == {'id': 1}
+
+    def test_errors_are_raised(self):
+        def fail():
+            raise ValueError('backend failed')
+
+        with self.app.test_request_context('/'):
+            d = Document(embedded={
+                'a': Lazy(fail, default=True),
+                'b': Lazy(dict, default=True),
+            })
+
+            with pytest.raises(ValueError):
+                pool.resolve(d, self.app.extensions['hal'].pool)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+tests.test_signals
+==================
+
+Unittests for the :module:`flask_hal.signals` module.
+"""
+
+# Third Party Libs
+import pytest
+from flask import Flask
+
+# First Party Libs
+from flask_hal import HAL, signals
+from flask_hal.document import Document, Embedded
+from flask_hal.link import Link, LinkTemplate
+
+
+class TestInstrumentation(object):
+
+    @pytest.fixture(autouse=True)
+    def reset(self, monkeypatch):
+        monkeypatch.setattr(signals, 'instrumented', False)
+
+    def make_app(self, **config):
+        app = Flask(__name__)
+        app.config.update(config)
+        HAL(app)
+
+        @app.route('/orders/<int:id>')
+        def order(id):
+            items = LinkTemplate('self', 'order').links([{'id': 1}])
+            return Document(
+                data={'id': id},
+                links=[Link('customer', '/customers/1')],
+                embedded={'items': Embedded(data=[
+                    Embedded(data={'id': 1}, links=items),
+                    Embedded(data={'id': 2}),
+                ])})
+
+        return app
+
+    def connect(self, app):
+        sent = []
+
+        def receiver(sender, **extra):
+            sent.append((sender, extra))
+
+        signals.document_serialized.connect(receiver, app, weak=False)
+
+        return sent
+
+    def test_disabled_by_default(self):
+        app = self.make_app()
+        sent = self.connect(app)
+
+        r = app.test_client().get('/orders/1')
+
+        assert not signals.instrumented
+        assert sent == []
+        assert 'Server-Timing' not in r.headers
+
+    def test_document_serialized_is_sent(self):
+        app = self.make_app(HAL_INSTRUMENTATION=True)
+        sent = self.connect(app)
+
+        r = app.test_client().get('/orders/1')
+
+        assert len(sent) == 1
+        sender, extra = sent[0]
+        assert sender is app
+        assert isinstance(extra['document'], Document)
+        assert set(extra['timings']) == set(['links', 'serialize'])
+        assert extra['links'] == 3
+        assert extra['embedded'] == 3
+        assert extra['bytes'] == len(r.get_data())
+        assert extra['streamed'] is False
+        assert 'Server-Timing' not in r.headers
+
+    def test_server_timing(self):
+        app = self.make_app(HAL_SERVER_TIMING=True, HAL_COMPRESS=True, HAL_COMPRESS_MIN_SIZE=1)
+        sent = self.connect(app)
+
+        r = app.test_client().get('/orders/1', headers={'Accept-Encoding': 'gzip'})
+
+        assert sent == []
+        phases = [p.split(';')[0] for p in r.headers['Server-Timing'].split(', ')]
+        assert phases == ['hal-compress', 'hal-links', 'hal-serialize']
+
+    def test_streamed(self):
+        app = self.make_app(HAL_INSTRUMENTATION=True, HAL_STREAMING=True)
+        sent = self.connect(app)
+
+        r = app.test_client().get('/orders/1')
+        body = r.get_data()
+
+        assert len(sent) == 1
+        assert sent[0][1]['streamed'] is True
+        assert sent[0][1]['bytes'] == len(body)
+        assert 'serialize' in sent[0][1]['timings']
+
+    def test_streamed_server_timing(self):
+        app = self.make_app(HAL_SERVER_TIMING=True, HAL_STREAMING=True)
+
+        r = app.test_client().get('/orders/1')
+
+        assert r.headers['Server-Timing'].startswith('hal-links;')
+        assert 'hal-serialize' not in r.headers['Server-Timing']
+
+    def test_url_for_is_timed(self):
+        app = self.make_app(HAL_INSTRUMENTATION=True)
+
+        with app.test_request_context('/'):
+            assert signals.url_for('order', id=2) == '/orders/2'
+            assert set(signals.timings()) == set(['links'])
+
+
+def test_url_for_without_instrumentation(monkeypatch):
+    monkeypatch.setattr(signals, 'instrumented', False)
+    app = Flask(__name__)
+    app.add_url_rule('/orders/<int:id>', 'order')
+
+    with app.test_request_context('/'):
+        assert signals.url_for('order', id=2) == '/orders/2'
+        assert signals.timings() == {}
+
+
+def test_server_timing_format():
+    value = signals.server_timing({'serialize': 0.0015, 'links': 0.0002})
+
+    assert value == 'hal-links;dur=0.200, hal-serialize;dur=1.500'
+
+
+def test_count():
+    d = Embedded(
+        links=[Link('foo', '/foo')],
+        embedded={'bar': Embedded(data=[Embedded(links=[Link('baz', '/baz')]), {'x': 1}])})
+
+    assert signals.count(d) == (2, 2)